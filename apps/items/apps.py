@@ -4,4 +4,8 @@ from django.apps import AppConfig
 class ItemsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.items'
-    label = 'items'
\ No newline at end of file
+    label = 'items'
+
+    def ready(self):
+        # 注册信号处理（统计表增量维护）
+        from . import signals  # noqa: F401
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""物品批量操作
+
+- 批量存放：先校验全部行，再一次预留一段连续的物品编号，在单个事务中 bulk_create
+- 批量移动/删除：按ID列表或房间、分类选出物品，执行单条 UPDATE、按ID分批 DELETE
+批量操作不会触发 save()/delete() 和信号，因此统计、搜索索引、拼音索引和数据版本号在这里统一更新。
+"""
+
+from django.db import IntegrityError, transaction
+
+from . import media, pinyin, search, stats, versions
+from .forms import BulkItemRowForm
+from .models import Category, Item, ItemCodeSequence, NameSpelling, Room, clean_room_name, normalize_room, parse_bigint
+
+# 单次批量存放的最大物品数
+BULK_DEPOSIT_LIMIT = 200
+
+# 按ID列表批量移动/删除时的最大物品数
+BULK_ITEM_LIMIT = 1000
+
+# 批量删除时每条 DELETE 的物品数（受数据库单条语句参数个数限制）
+DELETE_BATCH_SIZE = 500
+
+
+def _resolve_category(value, by_id, by_name):
+    """按分类ID或名称查找用户的分类，未指定时返回 (None, None)，找不到时返回错误信息"""
+    if value in (None, ''):
+        return None, None
+    category = by_id.get(str(value)) or by_name.get(str(value))
+    if category is None:
+        return None, '分类不存在'
+    return category, None
+
+
+def validate_rows(user, rows, files=None):
+    """校验批量存放的物品数据
+
+    rows 为字典列表（name、location、category），files 为 {行号: 上传图片}。
+    返回 (未保存的物品列表, 错误列表)，错误列表元素为 {'index': 行号, 'errors': {...}}。
+    """
+    files = files or {}
+    categories = list(Category.objects.filter(user=user))
+    by_id = {str(category.pk): category for category in categories}
+    by_name = {category.name: category for category in categories}
+
+    items = []
+    errors = []
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors.append({'index': index, 'errors': {'__all__': ['数据格式错误']}})
+            continue
+        image = files.get(index)
+        form = BulkItemRowForm(data=row, files={'image': image} if image else None)
+        row_errors = {} if form.is_valid() else {field: list(messages) for field, messages in form.errors.items()}
+        category, category_error = _resolve_category(row.get('category'), by_id, by_name)
+        if category_error:
+            row_errors['category'] = [category_error]
+        if row_errors:
+            errors.append({'index': index, 'errors': row_errors})
+            continue
+        item = form.save(commit=False)
+        item.user = user
+        item.category = category
+        items.append(item)
+    return items, errors
+
+
+def _insert(items):
+    """预留编号并批量插入，编号被序列之外的写入占用时校正序列后重试"""
+    for attempt in range(Item.CODE_RETRY_LIMIT):
+        for item, code in zip(items, ItemCodeSequence.reserve(len(items))):
+            item.item_code = code
+        try:
+            with transaction.atomic():
+                return Item.objects.bulk_create(items)
+        except IntegrityError:
+            if attempt == Item.CODE_RETRY_LIMIT - 1:
+                raise
+            ItemCodeSequence.sync()
+
+
+def create_items(user, items):
+    """在单个事务中批量创建物品，并统一更新统计、搜索索引和拼音索引"""
+    if not items:
+        return []
+
+    # 同步房间键，并为每个房间只查找/创建一次 Room
+    rooms = {}
+    for item in items:
+        item.room_key = normalize_room(item.location)
+        if item.room_key and item.room_key not in rooms:
+            rooms[item.room_key] = Room.ensure_root(user.pk, item.location)
+        item.room = rooms.get(item.room_key)
+
+    with transaction.atomic():
+        items = _insert(items)
+        media.retain_files([item.image.name for item in items if item.image])
+        stats.apply_items_delta(
+            user.pk, [(item.room_key, item.category_id, clean_room_name(item.location), 1) for item in items]
+        )
+        versions.bump(user.pk)
+
+    search.index_items(items)
+    media.create_thumbnails_later([item.image.name for item in items if item.image])
+    for room in rooms.values():
+        pinyin.register_name(user.pk, NameSpelling.KIND_ROOM, room.name)
+    return items
+
+
+def select_items(user, data):
+    """按批量操作参数选出用户的物品，返回查询集
+
+    data 中按以下优先级指定范围（其一即可），参数无效时抛出 ValueError：
+    - ids：物品ID列表
+    - code_from/code_to：物品编号范围（含两端，可只指定一端）
+    - room_id：位置ID（含全部子容器）
+    - room：房间名称
+    - category：分类名称（"未分类" 表示没有分类的物品）
+    """
+    items = Item.objects.filter(user=user)
+    if data.get('ids'):
+        ids = data['ids']
+        if not isinstance(ids, list):
+            raise ValueError('ids参数无效')
+        ids = [parse_bigint(item_id, 'ids参数无效') for item_id in ids]
+        if len(ids) > BULK_ITEM_LIMIT:
+            raise ValueError(f'单次最多操作{BULK_ITEM_LIMIT}个物品')
+        return items.filter(id__in=ids)
+    if data.get('code_from') or data.get('code_to'):
+        if data.get('code_from'):
+            items = items.filter(item_code__gte=parse_bigint(data['code_from'], '物品编号范围无效'))
+        if data.get('code_to'):
+            items = items.filter(item_code__lte=parse_bigint(data['code_to'], '物品编号范围无效'))
+        return items
+    if data.get('room_id'):
+        room = Room.objects.filter(id=parse_bigint(data['room_id'], '位置不存在'), user=user).first()
+        if room is None:
+            raise ValueError('位置不存在')
+        return room.items_within()
+    if data.get('room'):
+        return items.filter(room_key=normalize_room(data['room']))
+    if data.get('category'):
+        if data['category'] == '未分类':
+            return items.filter(category__isnull=True)
+        category = Category.objects.filter(user=user, name=data['category']).first()
+        return items.filter(category=category) if category else items.none()
+    raise ValueError('请指定要操作的物品')
+
+
+def resolve_destination(user, location='', room=None):
+    """移动目标的 (物品 location, Room)：指定 room 时 location 为其所在房间的名称，否则按名称获取或创建房间"""
+    if room is None and clean_room_name(location):
+        room = Room.ensure_root(user.pk, location)
+    if room is not None:
+        location = room.name if room.parent_id is None else room.ancestors().first().name
+    return clean_room_name(location), room
+
+
+def move_items(user, items, location='', room=None):
+    """将查询集中的物品移动到 room（或名为 location 的房间），单条 UPDATE
+
+    返回移动的物品数；统计按移动前的分组计数更新一次。
+    """
+    location, room = resolve_destination(user, location, room)
+
+    items = items.order_by()
+    with transaction.atomic():
+        item_ids = list(items.values_list('id', flat=True))
+        if not item_ids:
+            return 0
+        groups = stats.group_counts(items)
+        items.update(location=location, room_key=normalize_room(location), room=room)
+        stats.apply_items_delta(user.pk, groups, sign=-1)
+        stats.apply_items_delta(user.pk, [(normalize_room(location), category_id, location, count)
+                                          for _, category_id, _, count in groups])
+        versions.bump(user.pk)
+
+    search.reindex_item_ids(item_ids)
+    if location:
+        pinyin.register_name(user.pk, NameSpelling.KIND_ROOM, location)
+    return len(item_ids)
+
+
+def delete_items(user, items):
+    """删除查询集中的物品，按ID分批 DELETE
+
+    不经过逐个物品的 delete() 和信号：统计按分组计数更新一次，
+    图片文件的引用计数统一减少，归零的文件在事务提交后由后台删除。返回删除的物品数。
+    """
+    items = items.order_by()
+    with transaction.atomic():
+        item_ids = list(items.values_list('id', flat=True))
+        if not item_ids:
+            return 0
+        groups = stats.group_counts(items)
+        images = list(items.exclude(image='').exclude(image__isnull=True).values_list('image', flat=True))
+        # 没有其他表引用物品，_raw_delete 直接执行 DELETE，不逐个发送删除信号
+        for start in range(0, len(item_ids), DELETE_BATCH_SIZE):
+            Item.objects.filter(pk__in=item_ids[start:start + DELETE_BATCH_SIZE])._raw_delete(items.db)
+        stats.apply_items_delta(user.pk, groups, sign=-1)
+        media.release_files(images)
+        versions.bump(user.pk)
+
+    search.remove_items(item_ids)
+    return len(item_ids)
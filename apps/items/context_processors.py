@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""物品应用的模板上下文处理器"""
+
+from . import navigation as nav_cache
+
+
+def navigation(request):
+    """为已登录用户提供侧边栏导航（main_navs、sub_navs、active_sub_tag）"""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return nav_cache.resolve_navigation(user.pk, request.path, request.GET.get('sub_tag', ''))
@@ -2,6 +2,9 @@
 """物品应用表单"""
 
 from django import forms
+from django.core.files.uploadedfile import UploadedFile
+
+from . import uploads
 from .models import Item
 
 
@@ -24,6 +27,16 @@ class ItemForm(forms.ModelForm):
             'category': forms.Select(attrs={'class': 'form-control'}),
         }
     
+    def clean_image(self):
+        """新上传的图片在保存前缩小并去除元数据（见 uploads.py）"""
+        image = self.cleaned_data.get('image')
+        if isinstance(image, UploadedFile):
+            try:
+                image = uploads.process_image(image)
+            except ValueError as e:
+                raise forms.ValidationError(str(e)) from e
+        return image
+    
     def clean(self):
         """验证表单数据"""
         cleaned_data = super().clean()
@@ -34,3 +47,10 @@ class ItemForm(forms.ModelForm):
             raise forms.ValidationError('请输入物品名称')
         
         return cleaned_data
+
+
+class BulkItemRowForm(ItemForm):
+    """批量存放时单个物品的表单（分类在批量处理中按用户统一解析）"""
+    
+    class Meta(ItemForm.Meta):
+        fields = ['name', 'image', 'location']
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""物品标签（二维码 + 物品编号）的服务端渲染
+
+二维码内容为 {"category": "item", "code": 物品编号}，与扫码页面（associate_item_storage.html）约定一致。
+标签只由物品编号决定，二维码矩阵和渲染结果按 (编号, 格式, 标签模板版本) 缓存；
+批量打印的标签页（见 sheets.py）复用缓存的二维码矩阵。
+修改标签样式时递增 LABEL_TEMPLATE_VERSION，旧缓存和带旧版本号的 URL 自然失效。
+"""
+
+import io
+import json
+
+import segno
+from django.core.cache import cache
+from django.urls import reverse
+from PIL import Image, ImageDraw, ImageFont
+
+# 标签模板版本，修改下面的样式参数或布局时递增
+LABEL_TEMPLATE_VERSION = 1
+
+# 输出格式：名称 -> MIME 类型
+LABEL_FORMATS = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
+
+# 二维码纠错等级、四周留白（模块数）
+QR_ERROR = 'm'
+QR_BORDER = 2
+
+# PNG 中每个二维码模块的像素数
+PNG_SCALE = 8
+
+# 编号文字区域高度、字号（相对二维码边长）
+TEXT_HEIGHT_RATIO = 0.22
+FONT_SIZE_RATIO = 0.16
+
+# 编号文字最大宽度（相对二维码边长）
+TEXT_WIDTH_RATIO = 0.94
+
+
+def qr_data(item_code):
+    """物品编号对应的二维码内容"""
+    return json.dumps({'category': 'item', 'code': item_code}, separators=(',', ':'))
+
+
+def _matrix(item_code):
+    """二维码模块矩阵（含留白），每行为 0/1 序列"""
+    qr = segno.make(qr_data(item_code), error=QR_ERROR, micro=False)
+    return [list(row) for row in qr.matrix_iter(border=QR_BORDER)]
+
+
+def _runs(matrix):
+    """每行连续的深色模块合并为 (x, y, 长度)，绘制时每段只需一个矩形"""
+    runs = []
+    size = len(matrix)
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < size:
+            if not row[x]:
+                x += 1
+                continue
+            start = x
+            while x < size and row[x]:
+                x += 1
+            runs.append((start, y, x - start))
+    return runs
+
+
+def qr_runs(item_code):
+    """二维码的 (模块数, 深色矩形段列表)，按编号和模板版本缓存，供单个标签和批量标签页共用"""
+    key = cache_key(item_code, 'runs')
+    result = cache.get(key)
+    if result is None:
+        matrix = _matrix(item_code)
+        result = (len(matrix), _runs(matrix))
+        cache.set(key, result, None)
+    return result
+
+
+def svg_path(runs):
+    """深色矩形段转换为 SVG 路径数据（单位为模块）"""
+    return ''.join(f'M{x} {y}h{length}v1h{-length}z' for x, y, length in runs)
+
+
+def fit_font_size(text, width, max_size):
+    """按字符平均宽度约 0.6 倍字号估算，使 text 不超出 width 的字号"""
+    return min(max_size, width / (len(text) * 0.6))
+
+
+def _render_svg(item_code):
+    size, runs = qr_runs(item_code)
+    text_height = size * TEXT_HEIGHT_RATIO
+    text = f'#{item_code}'
+    # 编号较长时缩小字号
+    font_size = fit_font_size(text, size * TEXT_WIDTH_RATIO, size * FONT_SIZE_RATIO)
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {size} {size + text_height:g}" '
+        f'shape-rendering="crispEdges">'
+        f'<rect width="100%" height="100%" fill="#fff"/>'
+        f'<path fill="#000" d="{svg_path(runs)}"/>'
+        f'<text x="{size / 2:g}" y="{size + text_height * 0.6:g}" text-anchor="middle" '
+        f'font-family="sans-serif" font-weight="bold" font-size="{font_size:.2f}">{text}</text>'
+        f'</svg>'
+    ).encode()
+
+
+def _font(size):
+    try:
+        return ImageFont.load_default(size=size)
+    except (TypeError, OSError):
+        # Pillow 未编译 FreeType 时只有固定大小的位图字体
+        return ImageFont.load_default()
+
+
+def _render_png(item_code):
+    modules, runs = qr_runs(item_code)
+    qr = Image.new('L', (modules, modules), 255)
+    qr_draw = ImageDraw.Draw(qr)
+    for x, y, length in runs:
+        qr_draw.line([(x, y), (x + length - 1, y)], fill=0)
+    size = modules * PNG_SCALE
+    text_height = int(size * TEXT_HEIGHT_RATIO)
+    label = Image.new('L', (size, size + text_height), 255)
+    label.paste(qr.resize((size, size), Image.NEAREST))
+    draw = ImageDraw.Draw(label)
+    text = f'#{item_code}'
+    font_size = int(size * FONT_SIZE_RATIO)
+    font = _font(font_size)
+    # 编号较长时缩小字号，使文字不超出二维码宽度
+    while font_size > 8 and draw.textlength(text, font=font) > size * TEXT_WIDTH_RATIO:
+        font_size -= 2
+        font = _font(font_size)
+    draw.text((size / 2, size + text_height * 0.45), text, fill=0, font=font, anchor='mm')
+    buffer = io.BytesIO()
+    label.save(buffer, 'PNG', optimize=True)
+    return buffer.getvalue()
+
+
+_RENDERERS = {
+    'png': _render_png,
+    'svg': _render_svg,
+}
+
+
+def cache_key(item_code, fmt):
+    return f'items:label:v{LABEL_TEMPLATE_VERSION}:{fmt}:{item_code}'
+
+
+def get_label(item_code, fmt):
+    """物品编号的标签图片字节串，优先从缓存读取"""
+    key = cache_key(item_code, fmt)
+    data = cache.get(key)
+    if data is None:
+        data = _RENDERERS[fmt](item_code)
+        cache.set(key, data, None)
+    return data
+
+
+def label_url(item_code, fmt='svg'):
+    """带模板版本的标签图片URL，可被浏览器长期缓存"""
+    return f"{reverse('items:tag_image', args=[item_code, fmt])}?v={LABEL_TEMPLATE_VERSION}"
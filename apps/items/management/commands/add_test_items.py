@@ -6,7 +6,8 @@ from django.contrib.auth import get_user_model
 from django.utils import timezone
 import random
 
-from apps.items.models import Item, Category
+from apps.items import search, stats, versions
+from apps.items.models import Item, Category, normalize_room
 
 
 class Command(BaseCommand):
@@ -40,6 +41,7 @@ class Command(BaseCommand):
                 Category.objects.get_or_create(name=category_name, user=user)
             
             # 生成并添加50个物品
+            item_codes = []
             for i in range(50):
                 # 生成随机物品名称
                 item_name = random.choice(item_prefixes) + random.choice(['', ' 1', ' 2', ' 3', ' Pro', ' Air', ' Mini', ' Max'])
@@ -60,12 +62,19 @@ class Command(BaseCommand):
                     # 执行原始SQL插入
                     with connection.cursor() as cursor:
                         cursor.execute(
-                            "INSERT INTO items_item (item_code, name, location, storage_time, user_id) VALUES (%s, %s, %s, %s, %s)",
-                            [new_item_code, item_name, room, current_time, user.id]
+                            "INSERT INTO items_item (item_code, name, location, room_key, has_thumbnails, storage_time, user_id) VALUES (%s, %s, %s, %s, %s, %s, %s)",
+                            [new_item_code, item_name, room, normalize_room(room), False, current_time, user.id]
                         )
+                    item_codes.append(new_item_code)
                     
                     self.stdout.write(self.style.SUCCESS(f'Added item: {item_name} (Room: {room}, Code: {new_item_code}, User: {user.username})'))
                 except Exception as e:
                     self.stdout.write(self.style.ERROR(f'Error adding item for user {user.username}: {e}'))
+            
+            # 原始SQL插入不触发信号，统计、搜索索引和数据版本号在这里统一更新
+            if item_codes:
+                stats.invalidate_user_stats(user.pk)
+                search.reindex_item_ids(list(Item.objects.filter(item_code__in=item_codes).values_list('id', flat=True)))
+                versions.bump(user.pk)
         
         self.stdout.write(self.style.SUCCESS(f'Successfully added 50 test items for all users'))
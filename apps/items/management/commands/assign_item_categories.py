@@ -4,6 +4,7 @@
 from django.core.management.base import BaseCommand
 from apps.users.models import User
 from apps.items.models import Item, Category
+from apps.items import search, stats, versions
 
 
 class Command(BaseCommand):
@@ -29,7 +30,7 @@ class Command(BaseCommand):
             
             # 获取用户的物品
             items = Item.objects.filter(user=user)
-            updated_count = 0
+            updated_ids = []
             
             for item in items:
                 # 如果物品已经有分类，跳过
@@ -44,12 +45,16 @@ class Command(BaseCommand):
                 # 使用update方法避免触发save逻辑，因为有些物品的item_code是字符串格式
                 try:
                     Item.objects.filter(pk=item.pk).update(category=category)
-                    updated_count += 1
+                    updated_ids.append(item.pk)
                 except Exception as e:
                     self.stdout.write(f'  跳过物品 {item.id}: {e}')
             
-            if updated_count > 0:
-                self.stdout.write(f'  为 {updated_count} 个物品分配了分类关联')
+            if updated_ids:
+                # update() 不触发信号，统计、搜索索引和数据版本号在这里统一更新
+                stats.invalidate_user_stats(user.pk)
+                search.reindex_item_ids(updated_ids)
+                versions.bump(user.pk)
+                self.stdout.write(f'  为 {len(updated_ids)} 个物品分配了分类关联')
             else:
                 self.stdout.write(f'  所有物品已分配分类关联')
         
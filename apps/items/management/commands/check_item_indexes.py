@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""检查物品热点查询是否使用复合索引的管理命令"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+from django.db.models import Count
+
+from apps.items.models import Item, Category
+from apps.items.views import filter_find_items, FIND_ITEMS_PAGE_SIZE
+
+
+class Command(BaseCommand):
+    """通过 EXPLAIN 检查视图中的物品查询是否命中复合索引"""
+    help = '对 find_items、get_items_by_category、manage_categories 的查询执行 EXPLAIN，确认使用了复合索引'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='用于生成查询的用户名，默认为物品最多的用户')
+        parser.add_argument('--repeat', type=int, default=20, help='每个查询的计时执行次数')
+
+    def handle(self, *args, **options):
+        """执行命令"""
+        User = get_user_model()
+        users = User.objects.all()
+        if options['user']:
+            users = users.filter(username=options['user'])
+        user = users.annotate(item_total=Count('items')).order_by('-item_total').first()
+        if user is None:
+            raise CommandError('没有找到用户')
+
+        room = Item.objects.filter(user=user).exclude(room_key='').values_list('room_key', flat=True).first() or ''
+        image = Item.objects.filter(user=user).exclude(image='').values_list('image', flat=True).first() or ''
+        category = Category.objects.filter(user=user).first()
+        if category is None:
+            raise CommandError(f'用户 {user.username} 没有分类，无法检查分类查询')
+
+        # (名称, 查询, 期望使用的索引)
+        checks = [
+            ('find_items 首屏', self._first_page(filter_find_items(user, 'room', None)), 'item_user_storage_time_idx'),
+            ('find_items 按房间筛选', self._first_page(filter_find_items(user, 'room', room)), 'item_user_room_key_idx'),
+            ('find_items 按分类筛选', self._first_page(filter_find_items(user, 'category', category.name)), 'item_user_category_idx'),
+            ('get_items_by_category 房间', Item.objects.filter(user=user, room_key=room), 'item_user_room_key_idx'),
+            ('get_items_by_category 分类', Item.objects.filter(user=user, category_id=category.pk), 'item_user_category_idx'),
+            ('manage_categories 房间统计', Item.objects.filter(user=user).order_by().values('room_key').annotate(n=Count('id')), 'item_user_room_key_idx'),
+            ('manage_categories 分类统计', Item.objects.filter(user=user).order_by().values('category_id').annotate(n=Count('id')), 'item_user_category_idx'),
+            ('protected_media 归属校验', Item.objects.filter(user=user, image=image).order_by().values('id')[:1], 'item_user_image_idx'),
+        ]
+
+        failed = []
+        for name, queryset, index_name in checks:
+            plan = queryset.explain()
+            elapsed = self._benchmark(queryset, options['repeat'])
+            if index_name in plan:
+                self.stdout.write(self.style.SUCCESS(f'✓ {name}: {index_name} ({elapsed:.2f}ms)'))
+            else:
+                failed.append(name)
+                self.stdout.write(self.style.ERROR(f'✗ {name}: 未使用 {index_name} ({elapsed:.2f}ms)'))
+                self.stdout.write(plan)
+
+        if failed:
+            raise CommandError(f'{len(failed)} 个查询未使用预期索引: {", ".join(failed)}')
+        self.stdout.write(self.style.SUCCESS('所有查询均使用了复合索引'))
+
+    def _first_page(self, queryset):
+        """构造与分页首屏相同形状的查询"""
+        return queryset.order_by('-storage_time', '-id')[:FIND_ITEMS_PAGE_SIZE + 1]
+
+    def _benchmark(self, queryset, repeat):
+        """返回查询的平均耗时（毫秒）"""
+        start = time.perf_counter()
+        for _ in range(max(repeat, 1)):
+            list(queryset.all())
+        return (time.perf_counter() - start) * 1000 / max(repeat, 1)
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""清理物品图片文件的管理命令"""
+
+from django.core.management.base import BaseCommand
+
+from apps.items import media, variants
+
+
+class Command(BaseCommand):
+    """处理图片删除队列，删除图片目录中没有任何物品引用的文件，并将缩放图片缓存清理到大小上限以内"""
+    help = '清理物品图片：处理删除队列、删除未被引用的图片文件并淘汰超出上限的缩放图片缓存'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-age', type=float, default=24,
+                            help='只删除修改时间早于指定小时数的未引用文件（默认24小时）')
+        parser.add_argument('--batch-size', type=int, default=media.MEDIA_BATCH_SIZE, help='每批处理的文件数')
+        parser.add_argument('--dry-run', action='store_true', help='只列出将被删除的文件，不实际删除')
+
+    def handle(self, *args, **options):
+        """执行命令"""
+        batch_size = options['batch_size']
+
+        if not options['dry_run']:
+            processed = 0
+            while True:
+                count = media.process_pending(batch_size)
+                if not count:
+                    break
+                processed += count
+            self.stdout.write(f'删除队列：处理了 {processed} 条记录')
+
+        scanned, deleted = media.collect_garbage(
+            min_age=options['min_age'] * 60 * 60, dry_run=options['dry_run'], batch_size=batch_size
+        )
+        for name in deleted:
+            self.stdout.write(f'  {name}')
+        action = '将删除' if options['dry_run'] else '删除了'
+        self.stdout.write(self.style.SUCCESS(f'检查了 {scanned} 个文件，{action} {len(deleted)} 个未引用的文件'))
+
+        if not options['dry_run']:
+            evicted = variants.evict()
+            self.stdout.write(f'缩放图片缓存：淘汰了 {evicted} 个文件')
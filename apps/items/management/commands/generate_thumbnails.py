@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""生成物品图片缩略图的管理命令"""
+
+from django.core.management.base import BaseCommand
+
+from apps.items import media
+from apps.items.models import Item
+
+
+class Command(BaseCommand):
+    """为尚未生成缩略图的物品图片补生成缩略图（如后台任务中断或历史数据）"""
+    help = '为物品图片生成缩略图'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='重新生成全部物品图片的缩略图')
+        parser.add_argument('--batch-size', type=int, default=media.MEDIA_BATCH_SIZE, help='每批处理的图片数')
+
+    def handle(self, *args, **options):
+        """执行命令"""
+        items = Item.objects.exclude(image='').exclude(image__isnull=True)
+        if not options['all']:
+            items = items.filter(has_thumbnails=False)
+
+        names = items.order_by().values_list('image', flat=True).distinct()
+        total = done = 0
+        batch = []
+        for name in names.iterator():
+            batch.append(name)
+            if len(batch) >= options['batch_size']:
+                done += media.create_thumbnails(batch)
+                total += len(batch)
+                batch = []
+        done += media.create_thumbnails(batch)
+        total += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'完成，处理了 {total} 张图片，成功 {done} 张'))
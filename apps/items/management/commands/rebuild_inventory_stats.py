@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""重建物品统计汇总表的管理命令"""
+
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+
+from apps.items.stats import rebuild_user_stats
+
+
+class Command(BaseCommand):
+    """重建物品统计汇总表"""
+    help = '重建用户的物品统计（总数、房间、分类），用于原始SQL导入数据后校正统计'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='只重建指定用户名的统计')
+
+    def handle(self, *args, **options):
+        """执行命令"""
+        User = get_user_model()
+        users = User.objects.all()
+        if options['user']:
+            users = users.filter(username=options['user'])
+
+        for user_id, username in users.values_list('id', 'username').iterator():
+            rebuild_user_stats(user_id)
+            self.stdout.write(f'已重建用户 {username} 的统计')
+
+        self.stdout.write(self.style.SUCCESS('完成'))
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""重建拼音索引的管理命令"""
+
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+
+from apps.items import pinyin, search
+from apps.items.models import Item
+
+
+class Command(BaseCommand):
+    """重建房间/分类名称的拼音索引，并重写物品全文索引中的拼音分词"""
+    help = '重建拼音索引（房间、分类名称及物品全文索引）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='只重建指定用户名的拼音索引')
+
+    def handle(self, *args, **options):
+        """执行命令"""
+        if pinyin.lazy_pinyin is None:
+            self.stdout.write(self.style.WARNING('未安装 pypinyin，拼音索引将为空'))
+
+        User = get_user_model()
+        users = User.objects.all()
+        if options['user']:
+            users = users.filter(username=options['user'])
+
+        for user_id, username in users.values_list('id', 'username').iterator():
+            pinyin.rebuild_user_names(user_id)
+            count = search.reindex_queryset(Item.objects.filter(user_id=user_id))
+            self.stdout.write(f'已重建用户 {username} 的拼音索引（{count} 个物品）')
+
+        self.stdout.write(self.style.SUCCESS('完成'))
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""重建物品全文索引的管理命令"""
+
+from django.core.management.base import BaseCommand
+
+from apps.items import search
+from apps.items.models import Item
+
+
+class Command(BaseCommand):
+    """重建物品全文索引"""
+    help = '重建物品全文索引，用于原始SQL导入数据或调整分词规则后'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='只重建指定用户名的物品索引')
+
+    def handle(self, *args, **options):
+        """执行命令"""
+        if not search.is_supported():
+            self.stdout.write(self.style.WARNING('当前数据库不支持全文索引，搜索将使用模糊匹配'))
+            return
+
+        items = Item.objects.all()
+        if options['user']:
+            items = items.filter(user__username=options['user'])
+        count = search.reindex_queryset(items)
+        self.stdout.write(self.style.SUCCESS(f'已重建 {count} 个物品的索引'))
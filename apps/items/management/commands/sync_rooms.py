@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""将物品关联到房间的管理命令"""
+
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+
+from apps.items.models import Room
+
+
+class Command(BaseCommand):
+    """为尚未关联位置的物品（如原始SQL导入的数据）按 location 创建房间并关联"""
+    help = '按存放位置字符串为物品关联房间'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='只处理指定用户名的物品')
+
+    def handle(self, *args, **options):
+        """执行命令"""
+        User = get_user_model()
+        users = User.objects.all()
+        if options['user']:
+            users = users.filter(username=options['user'])
+
+        total = 0
+        # 按用户分批处理，每个房间一条 UPDATE
+        for user_id, username in users.values_list('id', 'username').iterator():
+            count = Room.sync_items(user_id)
+            if count:
+                self.stdout.write(f'用户 {username}：关联了 {count} 个物品')
+            total += count
+
+        self.stdout.write(self.style.SUCCESS(f'完成，共关联 {total} 个物品'))
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""物品图片文件的维护
+
+- 引用计数：图片按内容寻址存储（见 storage.py），多个物品可共用同一文件，
+  StoredFile 记录每个文件被引用的次数，计数归零时才登记删除
+- 缩略图：图片保存后，事务提交时由后台线程生成缩略图（见 thumbnails.py）
+- 删除队列：删除或替换图片时只在当前事务中登记文件名（PendingFileDeletion，连同其缩略图），
+  事务提交后由后台线程删除文件；后台线程未处理完的记录由 gc_media 命令继续处理
+- 垃圾回收：gc_media 命令按批遍历图片目录，删除没有任何物品引用的文件
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import Counter
+
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from . import thumbnails, versions
+from .models import Item, PendingFileDeletion, StoredFile
+
+logger = logging.getLogger(__name__)
+
+# 物品图片目录（与 Item.image 的 upload_to 一致）
+IMAGE_DIR = 'item_images'
+
+# 每批处理的文件数
+MEDIA_BATCH_SIZE = 500
+
+# 最近写入（或被重复上传复用）的原图及其缩略图在此时间（秒）内不从删除队列中删除，
+# 引用它的物品可能尚未提交；未被引用的文件之后由 gc_media 回收
+RECENT_FILE_AGE = 10 * 60
+
+
+def _referenced(names):
+    """返回 names 中仍被物品引用的文件名（缩略图按其原图判断）"""
+    originals = {name: thumbnails.original_name(name) or name for name in names}
+    used = set(Item.objects.filter(image__in=set(originals.values())).values_list('image', flat=True))
+    used.update(StoredFile.objects.filter(name__in=set(originals.values()), ref_count__gt=0)
+                .values_list('name', flat=True))
+    return {name for name, original in originals.items() if original in used}
+
+
+def retain_files(names):
+    """增加图片文件的引用计数（names 中重复的文件名按次数计）"""
+    for name, count in Counter(name for name in names if name).items():
+        files = StoredFile.objects.filter(name=name)
+        if files.update(ref_count=F('ref_count') + count):
+            continue
+        try:
+            with transaction.atomic():
+                StoredFile.objects.create(name=name, ref_count=count)
+        except IntegrityError:
+            # 并发请求已创建该记录，改为增量更新
+            files.update(ref_count=F('ref_count') + count)
+
+
+def release_files(names):
+    """减少图片文件的引用计数，计数归零（或没有计数记录）的文件登记删除"""
+    counts = Counter(name for name in names if name)
+    if not counts:
+        return
+    for name, count in counts.items():
+        StoredFile.objects.filter(name=name).update(ref_count=F('ref_count') - count)
+    alive = set(StoredFile.objects.filter(name__in=counts, ref_count__gt=0).values_list('name', flat=True))
+    StoredFile.objects.filter(name__in=counts, ref_count__lte=0).delete()
+    delete_files_later([name for name in counts if name not in alive])
+
+
+def create_thumbnails(names):
+    """为原图生成缩略图并标记对应物品，返回成功处理的原图数
+
+    内容相同的图片共用一个文件，缩略图已经齐全时直接标记，不重复生成。
+    """
+    done = 0
+    for name in names:
+        try:
+            if not all(default_storage.exists(thumb) for thumb in thumbnails.thumbnail_names(name)):
+                thumbnails.generate(name)
+        except Exception:
+            # 图片损坏或格式不支持时保留原图，页面回退显示原图
+            logger.warning('生成缩略图失败: %s', name, exc_info=True)
+            continue
+        items = Item.objects.filter(image=name)
+        user_ids = list(items.order_by().values_list('user_id', flat=True).distinct())
+        items.update(has_thumbnails=True)
+        # 页面改为显示缩略图
+        versions.bump_many(user_ids)
+        done += 1
+    return done
+
+
+def create_thumbnails_later(names):
+    """事务提交后在后台线程中生成缩略图"""
+    names = sorted({name for name in names if name})
+    if not names:
+        return
+    transaction.on_commit(lambda: threading.Thread(target=create_thumbnails, args=(names,), daemon=True).start())
+
+
+def _recently_used(names, cutoff):
+    """返回 names 中原图在 cutoff 之后写入或被复用过的文件名（缩略图按其原图判断）"""
+    recent = set()
+    for name in names:
+        try:
+            mtime = os.stat(default_storage.path(thumbnails.original_name(name) or name)).st_mtime
+        except FileNotFoundError:
+            continue
+        if mtime >= cutoff:
+            recent.add(name)
+    return recent
+
+
+def _remove_files(names, cutoff):
+    """删除文件，返回成功处理的文件名（文件不存在也视为已处理）
+
+    原图先改名再检查修改时间：改名前刚被重复上传复用（见 storage.py）的文件改回原名保留；
+    改名之后的复用找不到文件，会重新写入。
+    """
+    removed = []
+    for name in names:
+        path = default_storage.path(name)
+        try:
+            if thumbnails.original_name(name):
+                os.remove(path)
+            else:
+                doomed = f'{path}.deleting'
+                os.replace(path, doomed)
+                if os.stat(doomed).st_mtime >= cutoff:
+                    os.replace(doomed, path)
+                    continue
+                os.remove(doomed)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            logger.warning('删除图片文件失败: %s', name, exc_info=True)
+            continue
+        removed.append(name)
+    return removed
+
+
+def process_pending(limit=MEDIA_BATCH_SIZE):
+    """处理删除队列中最早登记的 limit 条记录，返回出队的记录数
+
+    删除前再次确认文件没有被物品引用、也没有刚被重复上传复用（引用它的物品可能尚未提交），
+    这些记录直接出队，不删除文件；删除失败的记录留在队列中。
+    """
+    names = list(PendingFileDeletion.objects.order_by('id').values_list('name', flat=True)[:limit])
+    if not names:
+        return 0
+    cutoff = time.time() - RECENT_FILE_AGE
+    kept = _referenced(names) | _recently_used(names, cutoff)
+    removed = _remove_files([name for name in names if name not in kept], cutoff)
+    done = list(kept) + removed
+    PendingFileDeletion.objects.filter(name__in=done).delete()
+    return len(done)
+
+
+def _drain_in_background():
+    try:
+        while process_pending():
+            pass
+    except Exception:
+        # 未处理的记录保留在队列中，由 gc_media 命令继续处理
+        logger.exception('处理图片删除队列失败')
+
+
+def delete_files_later(names):
+    """登记待删除的图片文件（连同缩略图），事务提交后在后台线程中删除，请求无需等待文件系统"""
+    names = sorted({
+        path for name in names if name for path in [name] + thumbnails.thumbnail_names(name)
+    })
+    if not names:
+        return
+    PendingFileDeletion.objects.bulk_create(
+        [PendingFileDeletion(name=name) for name in names], ignore_conflicts=True
+    )
+    transaction.on_commit(lambda: threading.Thread(target=_drain_in_background, daemon=True).start())
+
+
+def iter_image_batches(batch_size=MEDIA_BATCH_SIZE):
+    """按批遍历图片目录（含子目录），每批为 [(存储中的文件名, 修改时间)] 列表"""
+    root = default_storage.path(IMAGE_DIR)
+    batch = []
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                    continue
+                name = os.path.relpath(entry.path, default_storage.location).replace(os.sep, '/')
+                batch.append((name, entry.stat(follow_symlinks=False).st_mtime))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+    if batch:
+        yield batch
+
+
+def collect_garbage(min_age=24 * 60 * 60, dry_run=False, batch_size=MEDIA_BATCH_SIZE):
+    """删除图片目录中没有物品引用的文件，返回 (检查的文件数, 删除的文件名列表)
+
+    min_age（秒）以内修改过的文件（缩略图按其原图判断）跳过，避免误删正在上传或刚被重复上传复用、尚未保存到物品的文件。
+    """
+    cutoff = time.time() - min_age
+    scanned = 0
+    deleted = []
+    for batch in iter_image_batches(batch_size):
+        scanned += len(batch)
+        candidates = [name for name, mtime in batch if mtime < cutoff]
+        if not candidates:
+            continue
+        referenced = _referenced(candidates)
+        referenced |= _recently_used([name for name in candidates if name not in referenced], cutoff)
+        orphans = [name for name in candidates if name not in referenced]
+        deleted += orphans if dry_run else _remove_files(orphans, cutoff)
+    return scanned, deleted
@@ -3,6 +3,17 @@
 from django.db import migrations, models
 
 
+def clear_legacy_storage_tables(apps, schema_editor):
+    """清空旧模型残留的 items_item_storages、items_storage 表（新建的数据库中没有这两个表）"""
+    tables = schema_editor.connection.introspection.table_names()
+    if 'items_item_storages' in tables:
+        # 清空 items_item_storages（如果存在旧引用，会导致删除 Furniture 表时触发约束）
+        schema_editor.execute("DELETE FROM items_item_storages;")
+    if 'items_storage' in tables:
+        # 清空 items_storage（旧模型残留的表）以避免在删除 Furniture 表时出现外键引用
+        schema_editor.execute("DELETE FROM items_storage;")
+
+
 class Migration(migrations.Migration):
 
     dependencies = [
@@ -19,15 +30,10 @@ class Migration(migrations.Migration):
                 "DELETE FROM items_storagecell WHERE furniture_id NOT IN (SELECT id FROM items_furniture);",
                 # 删除指向不存在 Room 的 StorageCell 行
                 "DELETE FROM items_storagecell WHERE room_id NOT IN (SELECT id FROM items_room);",
-                # 删除可能存在的旧表 items_item_storages 中引用的行（旧模型残留）
-                "DELETE FROM items_item_storages WHERE storage_id NOT IN (SELECT id FROM items_storage);",
-                # 清空 items_item_storages（如果存在旧引用，会导致删除 Furniture 表时触发约束）
-                "DELETE FROM items_item_storages;",
-                # 清空 items_storage（旧模型残留的表）以避免在删除 Furniture 表时出现外键引用
-                "DELETE FROM items_storage;",
             ],
             reverse_sql=migrations.RunSQL.noop,
         ),
+        migrations.RunPython(clear_legacy_storage_tables, migrations.RunPython.noop),
         # 先删除Item模型中与其他模型的关联字段
         migrations.RemoveField(
             model_name='item',
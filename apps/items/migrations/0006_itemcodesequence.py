@@ -0,0 +1,40 @@
+# Generated by Django 4.2.11 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+# 与 models.ITEM_CODE_MAX 保持一致，排除SQLite中遗留的字符串编号
+ITEM_CODE_MAX = 2 ** 63 - 1
+
+
+def seed_item_code_sequence(apps, schema_editor):
+    """以现有最大物品编号初始化编号序列"""
+    Item = apps.get_model('items', 'Item')
+    ItemCodeSequence = apps.get_model('items', 'ItemCodeSequence')
+    max_code = Item.objects.filter(item_code__lte=ITEM_CODE_MAX).aggregate(
+        max_code=models.Max('item_code')
+    )['max_code']
+    ItemCodeSequence.objects.update_or_create(name='item_code', defaults={'last_value': max_code or 0})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0005_navigation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemCodeSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True, verbose_name='序列名称')),
+                ('last_value', models.PositiveBigIntegerField(default=0, verbose_name='当前值')),
+            ],
+            options={
+                'verbose_name': '编号序列',
+                'verbose_name_plural': '编号序列',
+            },
+        ),
+        migrations.RunPython(seed_item_code_sequence, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.11 on 2026-10-18 10:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('items', '0006_itemcodesequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('total', '总数'), ('room', '房间'), ('category', '分类')], max_length=10, verbose_name='统计维度')),
+                ('key', models.CharField(blank=True, max_length=200, verbose_name='维度取值')),
+                ('item_count', models.IntegerField(default=0, verbose_name='物品数量')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_stats', to=settings.AUTH_USER_MODEL, verbose_name='所属用户')),
+            ],
+            options={
+                'verbose_name': '物品统计',
+                'verbose_name_plural': '物品统计',
+                'unique_together': {('user', 'dimension', 'key')},
+            },
+        ),
+    ]
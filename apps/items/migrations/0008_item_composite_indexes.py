@@ -0,0 +1,25 @@
+# Generated by Django 4.2.11 on 2026-10-18 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0007_inventorystat'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['user', 'location', '-storage_time', '-id'], name='item_user_location_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['user', 'category', '-storage_time', '-id'], name='item_user_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['user', '-storage_time', '-id'], name='item_user_storage_time_idx'),
+        ),
+    ]
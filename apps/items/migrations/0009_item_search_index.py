@@ -0,0 +1,87 @@
+# Generated by Django 4.2.11 on 2026-10-18 11:30
+
+import re
+
+from django.db import migrations
+
+# 回填索引时每批处理的物品数
+BACKFILL_BATCH_SIZE = 500
+
+# 以下分词与索引写入为本迁移时 search.py 的副本（迁移中不直接引用该模块，以后修改分词不影响本迁移）
+FTS_TABLE = 'items_item_fts'
+_CJK = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+_CJK_RE = re.compile(f'[{_CJK}]+')
+_TOKEN_RE = re.compile(f'[{_CJK}]+|[0-9a-z]+')
+
+
+def _tokenize(text):
+    tokens = []
+    for run in _TOKEN_RE.findall((text or '').lower()):
+        if not _CJK_RE.fullmatch(run):
+            tokens.append(run)
+            continue
+        tokens.extend(list(run) + [run[i:i + 2] for i in range(len(run) - 1)])
+    return tokens
+
+
+def _write_documents(connection, rows):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(row[0],) for row in rows])
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, owner, body) VALUES (%s, %s, %s)',
+                [(item_id, f'u{user_id}', body) for item_id, user_id, body in rows]
+            )
+        else:
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (item_id, owner, body) VALUES (%s, %s, %s) '
+                f'ON CONFLICT (item_id) DO UPDATE SET owner = EXCLUDED.owner, body = EXCLUDED.body',
+                [(item_id, f'u{user_id}', body) for item_id, user_id, body in rows]
+            )
+
+
+def create_search_index(apps, schema_editor):
+    """创建全文索引表并为现有物品建立索引"""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(owner, body, tokenize='unicode61')"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE TABLE IF NOT EXISTS {FTS_TABLE} (item_id bigint PRIMARY KEY, owner varchar(32) NOT NULL, body text NOT NULL)'
+        )
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {FTS_TABLE}_owner_idx ON {FTS_TABLE} (owner)')
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {FTS_TABLE}_body_idx ON {FTS_TABLE} USING GIN (to_tsvector('simple', body))"
+        )
+    else:
+        return
+
+    Item = apps.get_model('items', 'Item')
+    rows = []
+    items = Item.objects.values_list('id', 'user_id', 'name', 'location', 'category__name', 'item_code')
+    for item_id, user_id, name, location, category_name, item_code in items.iterator(chunk_size=BACKFILL_BATCH_SIZE):
+        parts = [name, location, category_name, '' if item_code is None else str(item_code)]
+        rows.append((item_id, user_id, ' '.join(_tokenize(' '.join(part or '' for part in parts)))))
+        if len(rows) >= BACKFILL_BATCH_SIZE:
+            _write_documents(schema_editor.connection, rows)
+            rows = []
+    if rows:
+        _write_documents(schema_editor.connection, rows)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0008_item_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
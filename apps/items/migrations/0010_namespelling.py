@@ -0,0 +1,125 @@
+# Generated by Django 4.2.11 on 2026-10-18 12:30
+
+import re
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+try:
+    from pypinyin import Style, lazy_pinyin
+except ImportError:  # pragma: no cover - 可选依赖
+    lazy_pinyin = None
+
+# 回填时每批处理的行数
+BACKFILL_BATCH_SIZE = 500
+
+# 以下分词与拼音函数为本迁移时 search.py、pinyin.py 的副本（迁移中不直接引用这些模块，以后修改分词不影响本迁移）
+FTS_TABLE = 'items_item_fts'
+_CJK = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+_CJK_RE = re.compile(f'[{_CJK}]+')
+_TOKEN_RE = re.compile(f'[{_CJK}]+|[0-9a-z]+')
+
+
+def _syllables(text):
+    if lazy_pinyin is None or not text:
+        return []
+    return [syllable for syllable in lazy_pinyin(text, style=Style.NORMAL, errors=lambda chars: []) if syllable]
+
+
+def _spell(text):
+    parts = _syllables(text)
+    return ''.join(parts), ''.join(part[0] for part in parts)
+
+
+def _tokenize(text):
+    tokens = []
+    for run in _TOKEN_RE.findall((text or '').lower()):
+        if not _CJK_RE.fullmatch(run):
+            tokens.append(run)
+            continue
+        tokens.extend(list(run) + [run[i:i + 2] for i in range(len(run) - 1)])
+        parts = _syllables(run)
+        if parts:
+            tokens.extend([''.join(parts), ''.join(part[0] for part in parts)] + parts)
+    return tokens
+
+
+def _write_documents(connection, rows):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(row[0],) for row in rows])
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, owner, body) VALUES (%s, %s, %s)',
+                [(item_id, f'u{user_id}', body) for item_id, user_id, body in rows]
+            )
+        else:
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (item_id, owner, body) VALUES (%s, %s, %s) '
+                f'ON CONFLICT (item_id) DO UPDATE SET owner = EXCLUDED.owner, body = EXCLUDED.body',
+                [(item_id, f'u{user_id}', body) for item_id, user_id, body in rows]
+            )
+
+
+def backfill_spellings(apps, schema_editor):
+    """为现有房间和分类生成拼音索引，并以包含拼音的分词重写全文索引"""
+    Item = apps.get_model('items', 'Item')
+    Category = apps.get_model('items', 'Category')
+    NameSpelling = apps.get_model('items', 'NameSpelling')
+
+    names = set(Category.objects.values_list('user_id', 'name'))
+    rooms = set()
+    for user_id, location in Item.objects.exclude(location='').order_by().values_list('user_id', 'location').distinct():
+        # 与 models.clean_room_name 保持一致，登记的名称与运行时登记的相同
+        name = location.replace('\n', '').replace('\t', '').replace('\r', '').strip()
+        if name:
+            rooms.add((user_id, name))
+    rows = []
+    for kind, pairs in (('category', names), ('room', rooms)):
+        for user_id, name in pairs:
+            full, initials = _spell(name)
+            rows.append(NameSpelling(user_id=user_id, kind=kind, name=name, pinyin=full, initials=initials))
+    NameSpelling.objects.bulk_create(rows, batch_size=BACKFILL_BATCH_SIZE, ignore_conflicts=True)
+
+    connection = schema_editor.connection
+    if connection.vendor not in ('sqlite', 'postgresql'):
+        return
+    rows = []
+    items = Item.objects.values_list('id', 'user_id', 'name', 'location', 'category__name', 'item_code')
+    for item_id, user_id, name, location, category_name, item_code in items.iterator(chunk_size=BACKFILL_BATCH_SIZE):
+        parts = [name, location, category_name, '' if item_code is None else str(item_code)]
+        rows.append((item_id, user_id, ' '.join(_tokenize(' '.join(part or '' for part in parts)))))
+        if len(rows) >= BACKFILL_BATCH_SIZE:
+            _write_documents(connection, rows)
+            rows = []
+    if rows:
+        _write_documents(connection, rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('items', '0009_item_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NameSpelling',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('room', '房间'), ('category', '分类')], max_length=10, verbose_name='名称类型')),
+                ('name', models.CharField(max_length=200, verbose_name='名称')),
+                ('pinyin', models.CharField(blank=True, max_length=800, verbose_name='全拼')),
+                ('initials', models.CharField(blank=True, max_length=200, verbose_name='首字母')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='name_spellings', to=settings.AUTH_USER_MODEL, verbose_name='所属用户')),
+            ],
+            options={
+                'verbose_name': '名称拼音',
+                'verbose_name_plural': '名称拼音',
+                'indexes': [models.Index(fields=['user', 'kind', 'pinyin'], name='spelling_pinyin_idx'), models.Index(fields=['user', 'kind', 'initials'], name='spelling_initials_idx')],
+                'unique_together': {('user', 'kind', 'name')},
+            },
+        ),
+        migrations.RunPython(backfill_spellings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 4.2.11 on 2026-10-18 08:22
+
+from django.db import migrations, models
+
+# 回填房间键时每批处理的物品数
+BACKFILL_BATCH_SIZE = 1000
+
+
+def backfill_room_keys(apps, schema_editor):
+    """按批为已有物品写入规范化的房间键"""
+    Item = apps.get_model('items', 'Item')
+    batch = []
+    items = Item.objects.only('id', 'location').order_by('id')
+    for item in items.iterator(chunk_size=BACKFILL_BATCH_SIZE):
+        # 与 models.normalize_room 保持一致（迁移中不直接引用模型模块）
+        location = item.location or ''
+        for ch in '\n\t\r':
+            location = location.replace(ch, '')
+        item.room_key = location.strip().lower()
+        batch.append(item)
+        if len(batch) >= BACKFILL_BATCH_SIZE:
+            Item.objects.bulk_update(batch, ['room_key'])
+            batch = []
+    if batch:
+        Item.objects.bulk_update(batch, ['room_key'])
+
+
+def reset_inventory_stats(apps, schema_editor):
+    """房间统计改为按房间键记录，清空旧统计，访问时按需重建"""
+    InventoryStat = apps.get_model('items', 'InventoryStat')
+    InventoryStat.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0010_namespelling'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='room_key',
+            field=models.CharField(blank=True, default='', editable=False, max_length=200, verbose_name='房间键'),
+        ),
+        migrations.AddField(
+            model_name='inventorystat',
+            name='label',
+            field=models.CharField(blank=True, default='', max_length=200, verbose_name='显示名称'),
+        ),
+        migrations.RunPython(backfill_room_keys, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='item',
+            name='item_user_location_idx',
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['user', 'room_key', '-storage_time', '-id'], name='item_user_room_key_idx'),
+        ),
+        migrations.RunPython(reset_inventory_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 4.2.11 on 2026-10-18 08:25
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def link_items_to_rooms(apps, schema_editor):
+    """为已有的 location 创建房间并关联物品
+
+    每个房间单独一条 UPDATE（走 user + room_key 索引），迁移不包在单个事务中，
+    大表上也不会长时间锁表；中断后重新执行只会处理尚未关联的物品。
+    """
+    Item = apps.get_model('items', 'Item')
+    Room = apps.get_model('items', 'Room')
+    groups = (
+        Item.objects.filter(room__isnull=True).exclude(room_key='')
+        .order_by().values('user_id', 'room_key').annotate(label=models.Max('location'))
+    )
+    for group in list(groups):
+        room = Room.objects.filter(user_id=group['user_id'], parent=None, key=group['room_key']).first()
+        if room is None:
+            # 历史模型没有自定义 save，这里手动补写路径
+            label = group['label'].replace('\n', '').replace('\t', '').replace('\r', '').strip()
+            room = Room.objects.create(user_id=group['user_id'], name=label, key=group['room_key'])
+            room.path = f'{room.pk}/'
+            room.save(update_fields=['path'])
+        Item.objects.filter(
+            user_id=group['user_id'], room_key=group['room_key'], room__isnull=True
+        ).update(room=room)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('items', '0011_item_room_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Room',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, verbose_name='位置名称')),
+                ('key', models.CharField(editable=False, max_length=200, verbose_name='规范化名称')),
+                ('path', models.CharField(blank=True, default='', editable=False, max_length=255, verbose_name='路径')),
+                ('depth', models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='层级')),
+                ('parent', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='children', to='items.room', verbose_name='上级位置')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rooms', to=settings.AUTH_USER_MODEL, verbose_name='所属用户')),
+            ],
+            options={
+                'verbose_name': '存放位置',
+                'verbose_name_plural': '存放位置',
+                'ordering': ['path'],
+            },
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='room',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='items', to='items.room', verbose_name='存放容器'),
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(fields=['user', 'path'], name='room_user_path_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(fields=['user', 'parent', 'key'], name='room_user_parent_key_idx'),
+        ),
+        migrations.RunPython(link_items_to_rooms, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,133 @@
+# Generated by Django 4.2.11 on 2026-10-18 08:27
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+# 迁移时的默认导航（与 navigation.DEFAULT_NAVIGATION 当时的内容一致）
+DEFAULT_NAVIGATION = [
+    {'name': '按房间找', 'url': '/items/find/?filter=room', 'icon': '🔍', 'order': 1, 'children': []},
+    {'name': '按分类找', 'url': '/items/find/?filter=category', 'icon': '📦', 'order': 2, 'children': []},
+    {'name': '管理分类', 'url': '/items/manage/', 'icon': '⚙️', 'order': 3, 'children': [
+        {'name': '分类管理', 'url': '/items/manage/?sub_tag=分类管理', 'icon': '📋', 'order': 1},
+        {'name': '房间管理', 'url': '/items/manage/?sub_tag=房间管理', 'icon': '🏠', 'order': 2},
+    ]},
+]
+
+
+def collapse_default_navigation(apps, schema_editor):
+    """创建默认导航，删除用户导航中与默认导航完全相同的行
+
+    与默认导航同名但链接、图标或排序不同的行改为替换项（override_of），
+    用户新增的导航项保持不变（原来挂在被删除大分类下的改挂到默认大分类下）。
+    """
+    Navigation = apps.get_model('items', 'Navigation')
+
+    def same(row, default):
+        return (row.url, row.icon, row.order) == (default.url, default.icon, default.order)
+
+    default_mains = {}
+    default_subs = {}
+    for main in DEFAULT_NAVIGATION:
+        parent, _ = Navigation.objects.get_or_create(
+            user=None, name=main['name'], type='main', parent=None,
+            defaults={'url': main['url'], 'icon': main['icon'], 'order': main['order']}
+        )
+        default_mains[parent.name] = parent
+        for child in main['children']:
+            sub, _ = Navigation.objects.get_or_create(
+                user=None, name=child['name'], type='sub', parent=parent,
+                defaults={'url': child['url'], 'icon': child['icon'], 'order': child['order']}
+            )
+            default_subs[(parent.name, sub.name)] = sub
+
+    # 用户的大分类 -> 对应的默认大分类
+    user_mains = {}
+    for row in Navigation.objects.filter(user__isnull=False, type='main', override_of=None).iterator():
+        if row.name in default_mains:
+            user_mains[row.id] = (row, default_mains[row.name])
+
+    # 先处理子标签，再处理大分类（删除大分类会级联删除其下的子标签）
+    subs = Navigation.objects.filter(user__isnull=False, type='sub', override_of=None, parent_id__in=list(user_mains))
+    for row in subs.iterator():
+        default = default_subs.get((user_mains[row.parent_id][1].name, row.name))
+        if default is None:
+            continue
+        if same(row, default):
+            row.delete()
+        else:
+            row.override_of = default
+            row.save(update_fields=['override_of'])
+
+    for row, default in user_mains.values():
+        if same(row, default):
+            Navigation.objects.filter(parent_id=row.id).update(parent=default)
+            row.delete()
+        else:
+            row.override_of = default
+            row.save(update_fields=['override_of'])
+
+
+def restore_user_navigation(apps, schema_editor):
+    """回滚：将默认导航复制给每个用户，再删除默认导航
+
+    用户的替换项改为普通导航项，隐藏的替换项删除；
+    用户新增的、挂在默认大分类下的子标签改挂到该用户的副本下。
+    """
+    Navigation = apps.get_model('items', 'Navigation')
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+
+    # 大分类在前，复制子标签时其上级已有副本
+    defaults = sorted(Navigation.objects.filter(user__isnull=True), key=lambda nav: (nav.type != 'main', nav.order, nav.id))
+    for user in User.objects.iterator():
+        copies = {}
+        for default in defaults:
+            override = Navigation.objects.filter(user=user, override_of=default).first()
+            if override is not None and override.hidden:
+                override.delete()
+                continue
+            parent = copies.get(default.parent_id)
+            if default.parent_id and parent is None:
+                # 上级大分类已被隐藏
+                continue
+            if override is not None:
+                override.override_of = None
+                override.parent = parent
+                override.save(update_fields=['override_of', 'parent'])
+                copies[default.id] = override
+            else:
+                copies[default.id], _ = Navigation.objects.get_or_create(
+                    user=user, name=default.name, type=default.type, parent=parent,
+                    defaults={'url': default.url, 'icon': default.icon, 'order': default.order}
+                )
+        for default_id, copy in copies.items():
+            Navigation.objects.filter(user=user, parent_id=default_id).update(parent=copy)
+
+    Navigation.objects.filter(user__isnull=True).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('items', '0012_room'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='navigation',
+            name='hidden',
+            field=models.BooleanField(default=False, verbose_name='隐藏'),
+        ),
+        migrations.AddField(
+            model_name='navigation',
+            name='override_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='user_overrides', to='items.navigation', verbose_name='替换的默认导航'),
+        ),
+        migrations.AlterField(
+            model_name='navigation',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='navigations', to=settings.AUTH_USER_MODEL, verbose_name='所属用户'),
+        ),
+        migrations.RunPython(collapse_default_navigation, restore_user_navigation),
+    ]
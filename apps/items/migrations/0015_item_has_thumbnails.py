@@ -0,0 +1,18 @@
+# Generated by Django 4.2.11 on 2026-10-18 08:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0014_pendingfiledeletion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='has_thumbnails',
+            field=models.BooleanField(default=False, editable=False, verbose_name='已生成缩略图'),
+        ),
+    ]
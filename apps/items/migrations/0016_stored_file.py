@@ -0,0 +1,46 @@
+# Generated by Django 4.2.11 on 2026-10-18 08:35
+
+import apps.items.storage
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_references(apps, schema_editor):
+    """按已有物品的图片建立引用计数（已有文件保留原文件名）"""
+    Item = apps.get_model('items', 'Item')
+    StoredFile = apps.get_model('items', 'StoredFile')
+    rows = (
+        Item.objects.exclude(image='').exclude(image__isnull=True)
+        .order_by().values('image').annotate(count=Count('id'))
+    )
+    StoredFile.objects.bulk_create(
+        [StoredFile(name=row['image'], ref_count=row['count']) for row in rows], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0015_item_has_thumbnails'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='文件名')),
+                ('ref_count', models.IntegerField(default=0, verbose_name='引用计数')),
+            ],
+            options={
+                'verbose_name': '图片文件',
+                'verbose_name_plural': '图片文件',
+            },
+        ),
+        migrations.AlterField(
+            model_name='item',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=apps.items.storage.item_image_storage, upload_to='item_images/', verbose_name='物品图片'),
+        ),
+        migrations.RunPython(count_references, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.11 on 2026-10-18 08:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0016_stored_file'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['user', 'image'], name='item_user_image_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.11 on 2026-10-18 08:48
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_thirdpartyauth_user_alipay_userid_user_avatar_and_more'),
+        ('items', '0017_item_user_image_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryVersion',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='inventory_version', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='所属用户')),
+                ('version', models.PositiveBigIntegerField(default=1, verbose_name='版本号')),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='修改时间')),
+            ],
+            options={
+                'verbose_name': '物品数据版本',
+                'verbose_name_plural': '物品数据版本',
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.11 on 2026-10-18 08:58
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicate_rooms(apps, schema_editor):
+    """合并同一上级下规范化名称相同的位置（保留ID最小的一个），由浅到深逐组处理"""
+    Room = apps.get_model('items', 'Room')
+    Item = apps.get_model('items', 'Item')
+    while True:
+        group = (
+            Room.objects.values('user_id', 'parent_id', 'key')
+            .annotate(n=Count('id'), keep=Min('id'), level=Min('depth'))
+            .filter(n__gt=1).order_by('level').first()
+        )
+        if group is None:
+            break
+        keep = Room.objects.get(pk=group['keep'])
+        duplicates = Room.objects.filter(
+            user_id=group['user_id'], parent_id=group['parent_id'], key=group['key']
+        ).exclude(pk=keep.pk)
+        for duplicate in list(duplicates):
+            # 子树移到保留的位置下，路径前缀随之替换（同一层级，深度不变）
+            for room in Room.objects.filter(path__startswith=duplicate.path).exclude(pk=duplicate.pk):
+                room.path = keep.path + room.path[len(duplicate.path):]
+                room.save(update_fields=['path'])
+            Room.objects.filter(parent_id=duplicate.pk).update(parent_id=keep.pk)
+            Item.objects.filter(room_id=duplicate.pk).update(room_id=keep.pk)
+            duplicate.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0018_inventory_version'),
+    ]
+
+    operations = [
+        # 合并后的数据同样满足旧的表结构，回滚时无需处理
+        migrations.RunPython(merge_duplicate_rooms, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='room',
+            constraint=models.UniqueConstraint(condition=models.Q(('parent__isnull', True)), fields=('user', 'key'), name='room_unique_root'),
+        ),
+        migrations.AddConstraint(
+            model_name='room',
+            constraint=models.UniqueConstraint(condition=models.Q(('parent__isnull', False)), fields=('user', 'parent', 'key'), name='room_unique_child'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.11 on 2026-10-18 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0019_room_unique_constraints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NavigationVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=50, unique=True, verbose_name='范围')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='版本号')),
+            ],
+            options={
+                'verbose_name': '导航版本',
+                'verbose_name_plural': '导航版本',
+            },
+        ),
+    ]
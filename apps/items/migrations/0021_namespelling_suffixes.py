@@ -0,0 +1,115 @@
+# Generated by Django 4.2.11 on 2026-10-18 09:14
+
+import re
+
+from django.conf import settings
+from django.db import migrations, models
+
+try:
+    from pypinyin import Style, lazy_pinyin
+except ImportError:  # pragma: no cover - 可选依赖
+    lazy_pinyin = None
+
+# 回填时每批处理的行数
+BACKFILL_BATCH_SIZE = 500
+
+# 以下分词与拼音函数为本迁移时 search.py、pinyin.py 的副本（迁移中不直接引用这些模块，以后修改分词不影响本迁移）
+_CJK = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+_CJK_RE = re.compile(f'[{_CJK}]+')
+_TOKEN_RE = re.compile(f'[{_CJK}]+|[0-9a-z]+')
+FTS_TABLE = 'items_item_fts'
+
+
+def _syllables(text):
+    if lazy_pinyin is None or not text:
+        return []
+    return [syllable for syllable in lazy_pinyin(text, style=Style.NORMAL, errors=lambda chars: []) if syllable]
+
+
+def _suffix_spellings(parts):
+    return [(''.join(parts[i:]), ''.join(part[0] for part in parts[i:])) for i in range(len(parts))]
+
+
+def _tokenize(text):
+    tokens = []
+    for run in _TOKEN_RE.findall((text or '').lower()):
+        if not _CJK_RE.fullmatch(run):
+            tokens.append(run)
+            continue
+        tokens.extend(list(run) + [run[i:i + 2] for i in range(len(run) - 1)])
+        for full, initials in _suffix_spellings(_syllables(run)):
+            tokens.extend([full, initials])
+    return tokens
+
+
+def _write_documents(connection, rows):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(row[0],) for row in rows])
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, owner, body) VALUES (%s, %s, %s)',
+                [(item_id, f'u{user_id}', body) for item_id, user_id, body in rows]
+            )
+        else:
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (item_id, owner, body) VALUES (%s, %s, %s) '
+                f'ON CONFLICT (item_id) DO UPDATE SET owner = EXCLUDED.owner, body = EXCLUDED.body',
+                [(item_id, f'u{user_id}', body) for item_id, user_id, body in rows]
+            )
+
+
+def add_suffix_spellings(apps, schema_editor):
+    """为已登记的名称补充从每个汉字开始的拼音行，并以包含后缀拼音的分词重写全文索引"""
+    NameSpelling = apps.get_model('items', 'NameSpelling')
+    Item = apps.get_model('items', 'Item')
+
+    rows = []
+    for user_id, kind, name in NameSpelling.objects.filter(start=0).values_list('user_id', 'kind', 'name').iterator():
+        for start, (full, initials) in enumerate(_suffix_spellings(_syllables(name))[1:], start=1):
+            rows.append(NameSpelling(user_id=user_id, kind=kind, name=name, start=start, pinyin=full, initials=initials))
+    NameSpelling.objects.bulk_create(rows, batch_size=BACKFILL_BATCH_SIZE, ignore_conflicts=True)
+
+    connection = schema_editor.connection
+    if connection.vendor not in ('sqlite', 'postgresql'):
+        return
+    rows = []
+    items = Item.objects.values_list('id', 'user_id', 'name', 'location', 'category__name', 'item_code')
+    for item_id, user_id, name, location, category_name, item_code in items.iterator(chunk_size=BACKFILL_BATCH_SIZE):
+        parts = [name, location, category_name, '' if item_code is None else str(item_code)]
+        rows.append((item_id, user_id, ' '.join(_tokenize(' '.join(part or '' for part in parts)))))
+        if len(rows) >= BACKFILL_BATCH_SIZE:
+            _write_documents(connection, rows)
+            rows = []
+    if rows:
+        _write_documents(connection, rows)
+
+
+def remove_suffix_spellings(apps, schema_editor):
+    """回滚时只保留整个名称的拼音行（全文索引中多出的拼音分词不影响旧版本）"""
+    NameSpelling = apps.get_model('items', 'NameSpelling')
+    NameSpelling.objects.exclude(start=0).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('items', '0020_navigation_version'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='namespelling',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='namespelling',
+            name='start',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='起始位置'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='namespelling',
+            unique_together={('user', 'kind', 'name', 'start')},
+        ),
+        migrations.RunPython(add_suffix_spellings, remove_suffix_spellings),
+    ]
@@ -1,13 +1,117 @@
 # -*- coding: utf-8 -*-
 """物品应用模型"""
 
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.db.models import Value
+from django.db.models.functions import Concat, Substr
+
+from .storage import item_image_storage
+from .thumbnails import thumbnail_urls
 from django.conf import settings
 from django.utils import timezone
 
 
+# 物品编号上限（BIGINT），用于在聚合时排除SQLite中遗留的字符串编号
+ITEM_CODE_MAX = 2 ** 63 - 1
+
+
+def parse_bigint(value, error='编号无效'):
+    """解析外部输入的物品编号或ID，不是 0~ITEM_CODE_MAX 之间的整数时抛出 ValueError(error)
+
+    扫码、URL 参数可能是任意长度的数字串，超出 BIGINT 范围的值直接用于查询时数据库驱动会抛出 OverflowError。
+    """
+    try:
+        number = int(value)
+    except (TypeError, ValueError) as e:
+        raise ValueError(error) from e
+    if not 0 <= number <= ITEM_CODE_MAX:
+        raise ValueError(error)
+    return number
+
+
+def clean_room_name(location):
+    """清理房间名称：去除首尾空格和不可见字符，保留原始大小写"""
+    return (location or '').replace('\n', '').replace('\t', '').replace('\r', '').strip()
+
+
+def normalize_room(location):
+    """房间名称的规范化键：清理后转为小写，用于房间去重、筛选、重命名和删除"""
+    return clean_room_name(location).lower()
+
+
+class ItemCodeSequence(models.Model):
+    """物品编号序列（计数器表）
+
+    通过单行计数器原子地分配物品编号，替代每次新建物品时对全表执行 MAX() 查询。
+    - reserve(count) 一次预留一段连续编号，供批量插入使用
+    - sync() 在计数器落后于已有编号时（如原始SQL插入的数据）进行校正
+    """
+    # 序列名称
+    name = models.CharField(max_length=50, unique=True, verbose_name='序列名称')
+
+    # 最近一次分配出去的编号
+    last_value = models.PositiveBigIntegerField(default=0, verbose_name='当前值')
+
+    ITEM_CODE = 'item_code'
+
+    def __str__(self):
+        return f'{self.name}={self.last_value}'
+
+    @classmethod
+    def current_max_code(cls):
+        """获取物品表中已使用的最大数字编号"""
+        max_code = Item.objects.filter(item_code__lte=ITEM_CODE_MAX).aggregate(
+            max_code=models.Max('item_code')
+        )['max_code']
+        return max_code or 0
+
+    @classmethod
+    def _ensure(cls, name):
+        """确保序列行存在，首次创建时以现有最大编号为起点"""
+        cls.objects.get_or_create(name=name, defaults={'last_value': cls.current_max_code()})
+
+    @classmethod
+    def reserve(cls, count=1, name=ITEM_CODE):
+        """原子地预留 count 个连续编号，返回 range 对象
+
+        UPDATE ... SET last_value = last_value + count 会对序列行加写锁，
+        并发事务在此处串行化，因此不会分配出重复编号。
+        """
+        if count < 1:
+            raise ValueError('count 必须大于 0')
+        with transaction.atomic():
+            updated = cls.objects.filter(name=name).update(last_value=models.F('last_value') + count)
+            if not updated:
+                # 序列行不存在时（首次使用）先创建再分配
+                cls._ensure(name)
+                cls.objects.filter(name=name).update(last_value=models.F('last_value') + count)
+            last_value = cls.objects.filter(name=name).values_list('last_value', flat=True).get()
+        return range(last_value - count + 1, last_value + 1)
+
+    @classmethod
+    def next_value(cls, name=ITEM_CODE):
+        """分配下一个编号"""
+        return cls.reserve(1, name=name)[0]
+
+    @classmethod
+    def sync(cls, name=ITEM_CODE):
+        """将计数器推进到不小于已有最大编号的位置"""
+        cls._ensure(name)
+        max_code = cls.current_max_code()
+        cls.objects.filter(name=name, last_value__lt=max_code).update(last_value=max_code)
+
+    class Meta:
+        verbose_name = '编号序列'
+        verbose_name_plural = '编号序列'
+
+
 class Navigation(models.Model):
-    """导航模型，用于管理侧边栏的大分类和子标签"""
+    """导航模型，用于管理侧边栏的大分类和子标签
+
+    user 为空的导航项是所有用户共用的默认导航；用户自己的导航项只记录与默认导航的差异：
+    - override_of 非空：替换对应的默认导航项（修改名称、链接、图标），hidden 为真时表示隐藏它
+    - override_of 为空：用户新增的导航项
+    """
     # 导航类型：大分类或子标签
     TYPE_CHOICES = [
         ('main', '大分类'),
@@ -39,8 +143,21 @@ class Navigation(models.Model):
     # 排序顺序
     order = models.PositiveIntegerField(default=0, verbose_name='排序顺序')
     
-    # 关联到用户
-    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='navigations', verbose_name='所属用户')
+    # 关联到用户（为空表示默认导航）
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True, related_name='navigations', verbose_name='所属用户')
+    
+    # 被替换的默认导航项
+    override_of = models.ForeignKey(
+        'self',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='user_overrides',
+        verbose_name='替换的默认导航'
+    )
+    
+    # 是否隐藏（仅用于替换默认导航项）
+    hidden = models.BooleanField(default=False, verbose_name='隐藏')
     
     def __str__(self):
         return self.name
@@ -52,6 +169,248 @@ class Navigation(models.Model):
         unique_together = (('user', 'name', 'type', 'parent'),)
 
 
+class NavigationVersion(models.Model):
+    """导航的版本号，用于导航树缓存的失效（见 navigation.py）
+
+    默认导航和每个用户的导航各有一个版本号，导航项修改时递增。
+    版本号保存在数据库中：多个进程共用，且只增不减，不会因缓存淘汰而回退到旧版本。
+    """
+    # 默认导航为 DEFAULT_SCOPE，用户导航为用户ID
+    scope = models.CharField(max_length=50, unique=True, verbose_name='范围')
+
+    # 版本号
+    version = models.PositiveBigIntegerField(default=0, verbose_name='版本号')
+
+    DEFAULT_SCOPE = 'default'
+
+    def __str__(self):
+        return f'{self.scope}:v{self.version}'
+
+    class Meta:
+        verbose_name = '导航版本'
+        verbose_name_plural = '导航版本'
+
+
+class Room(models.Model):
+    """存放位置（房间及其中的容器），如 "卧室 > 衣柜 > 抽屉2"
+
+    使用物化路径表示层级：path 为从根到当前节点的ID序列，如 "3/17/42/"。
+    - 顶层节点即房间，其 key 与 Item.room_key 一致
+    - 查询某位置及其全部子容器为 path 上的前缀范围查询，可直接使用索引
+    - 节点ID写入后不变，因此重命名不影响路径，只有移动时才需要改写子树路径
+    """
+    # 路径分隔符
+    PATH_SEP = '/'
+    # 大于路径中所有字符（数字和分隔符）的字符，用于构造前缀范围查询的上界
+    PATH_UPPER = ':'
+    # 显示完整位置时的分隔符
+    DISPLAY_SEP = ' > '
+
+    # 位置名称
+    name = models.CharField(max_length=200, verbose_name='位置名称')
+
+    # 规范化名称，用于同级去重
+    key = models.CharField(max_length=200, editable=False, verbose_name='规范化名称')
+
+    # 上级位置（房间为空）
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='children',
+        verbose_name='上级位置'
+    )
+
+    # 物化路径
+    path = models.CharField(max_length=255, blank=True, default='', editable=False, verbose_name='路径')
+
+    # 层级深度，房间为0
+    depth = models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='层级')
+
+    # 关联到用户
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='rooms', verbose_name='所属用户')
+
+    def __str__(self):
+        return self.name
+
+    def save(self, *args, **kwargs):
+        self.name = clean_room_name(self.name)
+        self.key = normalize_room(self.name)
+        if self.pk:
+            return super().save(*args, **kwargs)
+
+        # 新节点：写入后才有ID，再补写路径
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            parent_path = self.parent.path if self.parent_id else ''
+            self.path = f'{parent_path}{self.pk}{self.PATH_SEP}'
+            self.depth = self.parent.depth + 1 if self.parent_id else 0
+            Room.objects.filter(pk=self.pk).update(path=self.path, depth=self.depth)
+
+    @property
+    def ancestor_ids(self):
+        """从根到当前节点的ID列表（含自身）"""
+        return [int(part) for part in self.path.split(self.PATH_SEP) if part]
+
+    @property
+    def root_id(self):
+        return self.ancestor_ids[0]
+
+    def ancestors(self):
+        """从根到当前节点的位置列表（含自身），单次查询"""
+        return Room.objects.filter(pk__in=self.ancestor_ids).order_by('depth')
+
+    def full_name(self):
+        """完整位置名称，如 "卧室 > 衣柜 > 抽屉2" """
+        return self.DISPLAY_SEP.join(room.name for room in self.ancestors())
+
+    @classmethod
+    def subtree_filter(cls, path, prefix=''):
+        """路径前缀范围条件（含节点自身），prefix 用于跨关系查询，如 'room__'"""
+        return {
+            f'{prefix}path__gte': path,
+            f'{prefix}path__lt': path + cls.PATH_UPPER,
+        }
+
+    def descendants(self, include_self=True):
+        """当前位置下的全部子位置"""
+        rooms = Room.objects.filter(user_id=self.user_id, **self.subtree_filter(self.path))
+        if not include_self:
+            rooms = rooms.exclude(pk=self.pk)
+        return rooms
+
+    def items_within(self):
+        """存放在当前位置及其全部子容器中的物品"""
+        return Item.objects.filter(
+            user_id=self.user_id, room__user_id=self.user_id, **self.subtree_filter(self.path, prefix='room__')
+        )
+
+    def move_to(self, parent):
+        """将当前位置（连同子树）移动到 parent 下，parent 为空时成为房间
+
+        子树中所有节点的路径和层级通过一条 UPDATE 改写；
+        移动到其他房间时，子树中物品的 location 随之更新。
+        """
+        if parent is not None and (parent.user_id != self.user_id or parent.path.startswith(self.path)):
+            raise ValueError('不能移动到自身或其子位置下')
+        old_path = self.path
+        old_root_id = self.root_id
+        new_path = f'{parent.path if parent else ""}{self.pk}{self.PATH_SEP}'
+        depth_delta = (parent.depth + 1 if parent else 0) - self.depth
+        with transaction.atomic():
+            Room.objects.filter(pk=self.pk).update(parent=parent)
+            Room.objects.filter(user_id=self.user_id, **self.subtree_filter(old_path)).update(
+                path=Concat(Value(new_path), Substr('path', len(old_path) + 1)),
+                depth=models.F('depth') + depth_delta,
+            )
+        self.parent = parent
+        self.path = new_path
+        self.depth += depth_delta
+
+        from . import search, stats, versions
+        versions.bump(self.user_id)
+        if self.root_id != old_root_id:
+            root = parent.ancestors().first() if parent else self
+            items = self.items_within()
+            item_ids = list(items.values_list('id', flat=True))
+            if item_ids:
+                items.update(location=root.name, room_key=root.key)
+                stats.invalidate_user_stats(self.user_id)
+                search.reindex_item_ids(item_ids)
+
+    @classmethod
+    def ensure_child(cls, user_id, parent, name):
+        """获取或创建 parent 下名为 name 的位置（按规范化名称匹配）"""
+        rooms = cls.objects.filter(user_id=user_id, parent=parent, key=normalize_room(name))
+        room = rooms.first()
+        if room is None:
+            try:
+                with transaction.atomic():
+                    room = cls(user_id=user_id, parent=parent, name=name)
+                    room.save()
+            except IntegrityError:
+                # 并发请求已创建同名位置（见 Meta.constraints）
+                room = rooms.get()
+        return room
+
+    @classmethod
+    def ensure_root(cls, user_id, name):
+        """获取或创建名为 name 的房间"""
+        return cls.ensure_child(user_id, None, name)
+
+    @classmethod
+    def ensure_path(cls, user_id, names):
+        """按名称逐级获取或创建位置，如 ['卧室', '衣柜', '抽屉2']，返回最末一级"""
+        room = None
+        for name in names:
+            if not clean_room_name(name):
+                continue
+            room = cls.ensure_child(user_id, room, name)
+        return room
+
+    @classmethod
+    def rename_root(cls, user_id, old_key, new_name):
+        """重命名房间；新名称与已有房间相同时合并两者"""
+        old = cls.objects.filter(user_id=user_id, parent=None, key=old_key).first()
+        if old is None:
+            return None
+        target = cls.objects.filter(user_id=user_id, parent=None, key=normalize_room(new_name)).exclude(pk=old.pk).first()
+        if target is None:
+            old.name = new_name
+            old.save(update_fields=['name', 'key'])
+            return old
+        old.merge_into(target)
+        return target
+
+    def merge_into(self, target):
+        """将当前位置合并到 target：子位置转移到 target 下（同名的子位置递归合并），物品改为关联 target，再删除当前位置"""
+        with transaction.atomic():
+            for child in list(self.children.all()):
+                existing = target.children.filter(key=child.key).first()
+                if existing is None:
+                    child.move_to(target)
+                else:
+                    child.merge_into(existing)
+            Item.objects.filter(user_id=self.user_id, room=self).update(room=target)
+            self.delete()
+
+    @classmethod
+    def sync_items(cls, user_id=None):
+        """为尚未关联位置的物品按 location 关联到对应房间，返回更新的物品数
+
+        每个房间一条 UPDATE（走 user + room_key 索引），适合在线分批执行。
+        """
+        items = Item.objects.filter(room__isnull=True).exclude(room_key='')
+        if user_id is not None:
+            items = items.filter(user_id=user_id)
+        groups = list(items.order_by().values('user_id', 'room_key').annotate(label=models.Max('location')))
+        updated = 0
+        for group in groups:
+            room = cls.ensure_root(group['user_id'], group['label'])
+            updated += Item.objects.filter(
+                user_id=group['user_id'], room_key=group['room_key'], room__isnull=True
+            ).update(room=room)
+        if updated:
+            from . import versions
+            versions.bump_many(group['user_id'] for group in groups)
+        return updated
+
+    class Meta:
+        verbose_name = '存放位置'
+        verbose_name_plural = '存放位置'
+        ordering = ['path']
+        indexes = [
+            models.Index(fields=['user', 'path'], name='room_user_path_idx'),
+            models.Index(fields=['user', 'parent', 'key'], name='room_user_parent_key_idx'),
+        ]
+        # 同一上级下名称（规范化后）唯一；房间的 parent 为空，需单独约束
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], condition=models.Q(parent__isnull=True), name='room_unique_root'),
+            models.UniqueConstraint(fields=['user', 'parent', 'key'], condition=models.Q(parent__isnull=False), name='room_unique_child'),
+        ]
+
+
 class Item(models.Model):
     """物品模型"""
     # 物品编号，从1开始递增的简单数字
@@ -61,11 +420,29 @@ class Item(models.Model):
     name = models.CharField(max_length=200, verbose_name='物品名称')
     
     # 物品图片
-    image = models.ImageField(upload_to='item_images/', blank=True, null=True, verbose_name='物品图片')
+    image = models.ImageField(
+        upload_to='item_images/', storage=item_image_storage, blank=True, null=True, verbose_name='物品图片'
+    )
+    
+    # 缩略图是否已生成（由后台任务在生成后置为真，更换图片时重置）
+    has_thumbnails = models.BooleanField(default=False, editable=False, verbose_name='已生成缩略图')
     
     # 存放位置（房间）
     location = models.CharField(max_length=200, blank=True, verbose_name='存放位置')
     
+    # 房间规范化键（由location生成，保存时自动维护）
+    room_key = models.CharField(max_length=200, blank=True, default='', editable=False, verbose_name='房间键')
+    
+    # 具体存放位置（房间或其中的容器），location 始终为其所在房间的名称
+    room = models.ForeignKey(
+        Room,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='items',
+        verbose_name='存放容器'
+    )
+    
     # 分类
     category = models.ForeignKey(
         'Category', 
@@ -82,14 +459,80 @@ class Item(models.Model):
     # 关联到用户
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='items', verbose_name='所属用户')
     
+    # 编号冲突时的最大重试次数
+    CODE_RETRY_LIMIT = 3
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # 记录加载时的统计维度，供统计表计算增量使用
+        loaded = dict(zip(field_names, values))
+        if {'user_id', 'room_key', 'category_id'} <= loaded.keys():
+            instance._stats_snapshot = (loaded['user_id'], loaded['room_key'], loaded['category_id'])
+        if {'room_key', 'room_id'} <= loaded.keys():
+            instance._room_snapshot = (loaded['room_key'], loaded['room_id'])
+        if 'image' in loaded:
+            # 记录加载时的图片文件名，图片被替换后删除旧文件
+            instance._image_snapshot = loaded['image'] or ''
+        return instance
+
+    def place_in(self, room):
+        """将物品放到指定位置，同时更新 location 为其所在房间的名称"""
+        self.room = room
+        if room is None:
+            self.location = ''
+        elif room.parent_id is None:
+            self.location = room.name
+        else:
+            self.location = Room.objects.filter(pk=room.root_id).values_list('name', flat=True).first() or ''
+
+    def _sync_room(self):
+        """location 被直接修改（且未同时指定容器）时，将物品关联到对应房间"""
+        old_room_key, old_room_id = getattr(self, '_room_snapshot', (None, None))
+        if self.room_key == old_room_key and self.room_id is not None:
+            return
+        if self.room_id is not None and self.room_id != old_room_id:
+            # 调用方已通过 place_in 指定了容器
+            return
+        self.room = Room.ensure_root(self.user_id, self.location) if self.room_key else None
+
+    @property
+    def thumbnails(self):
+        """缩略图URL：{'small'/'large': {'webp'/'jpeg': URL}}，尚未生成时为 None"""
+        if not self.image or not self.has_thumbnails:
+            return None
+        return thumbnail_urls(self.image.name)
+
     def save(self, *args, **kwargs):
-        # 如果是新建物品且没有指定编号，则生成新的递增编号
-        if not self.pk:
-            # 获取当前最大编号
-            max_code = Item.objects.aggregate(max_code=models.Max('item_code'))['max_code']
-            # 如果没有记录，从1开始，否则+1
-            self.item_code = 1 if max_code is None else max_code + 1
-        super().save(*args, **kwargs)
+        # 同步房间规范化键和所在房间
+        self.room_key = normalize_room(self.location)
+        self._sync_room()
+        # 更换图片后缩略图需要重新生成
+        if (self.image.name or '') != getattr(self, '_image_snapshot', ''):
+            self.has_thumbnails = False
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'location' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'room_key', 'room'}
+            update_fields = kwargs['update_fields']
+        if update_fields is not None and 'image' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'has_thumbnails'}
+        
+        # 已有物品或已指定编号（如批量预留）时直接保存
+        if self.pk or self.item_code is not None:
+            return super().save(*args, **kwargs)
+
+        # 新建物品：从编号序列中原子地取号，冲突时校正序列后重试
+        for attempt in range(self.CODE_RETRY_LIMIT):
+            self.item_code = ItemCodeSequence.next_value()
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                # 编号已被序列之外的写入占用（如原始SQL导入），校正后重试
+                if attempt == self.CODE_RETRY_LIMIT - 1 or not Item.objects.filter(item_code=self.item_code).exists():
+                    self.item_code = None
+                    raise
+                ItemCodeSequence.sync()
     
     def __str__(self):
         return self.name
@@ -98,6 +541,15 @@ class Item(models.Model):
         verbose_name = '物品'
         verbose_name_plural = '物品'
         ordering = ['-storage_time']  # 按存放时间倒序排列
+        # 覆盖视图中按用户筛选房间/分类、按存放时间翻页的查询；
+        # 房间/分类索引后缀排序列，筛选后翻页无需额外排序
+        indexes = [
+            models.Index(fields=['user', 'room_key', '-storage_time', '-id'], name='item_user_room_key_idx'),
+            models.Index(fields=['user', 'category', '-storage_time', '-id'], name='item_user_category_idx'),
+            models.Index(fields=['user', '-storage_time', '-id'], name='item_user_storage_time_idx'),
+            # 访问图片时校验归属
+            models.Index(fields=['user', 'image'], name='item_user_image_idx'),
+        ]
 
 
 class Category(models.Model):
@@ -117,3 +569,153 @@ class Category(models.Model):
         verbose_name = '分类'
         verbose_name_plural = '分类'
         unique_together = (('user', 'name'),)
+
+
+class InventoryStat(models.Model):
+    """用户物品统计汇总表
+
+    按用户维护物品总数、各房间物品数和各分类物品数，在物品增删改时增量更新，
+    页面读取统计数据时无需再扫描用户的全部物品。
+    - total：key 为空字符串
+    - room：key 为 Item.room_key，label 为清理后的房间名称（用于显示）
+    - category：key 为分类ID，未分类为空字符串
+    """
+    DIMENSION_TOTAL = 'total'
+    DIMENSION_ROOM = 'room'
+    DIMENSION_CATEGORY = 'category'
+    DIMENSION_CHOICES = [
+        (DIMENSION_TOTAL, '总数'),
+        (DIMENSION_ROOM, '房间'),
+        (DIMENSION_CATEGORY, '分类'),
+    ]
+
+    # 关联到用户
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='inventory_stats', verbose_name='所属用户')
+
+    # 统计维度
+    dimension = models.CharField(max_length=10, choices=DIMENSION_CHOICES, verbose_name='统计维度')
+
+    # 维度取值
+    key = models.CharField(max_length=200, blank=True, verbose_name='维度取值')
+
+    # 显示名称（仅房间维度使用）
+    label = models.CharField(max_length=200, blank=True, default='', verbose_name='显示名称')
+
+    # 物品数量
+    item_count = models.IntegerField(default=0, verbose_name='物品数量')
+
+    def __str__(self):
+        return f'{self.dimension}:{self.key}={self.item_count}'
+
+    class Meta:
+        verbose_name = '物品统计'
+        verbose_name_plural = '物品统计'
+        unique_together = (('user', 'dimension', 'key'),)
+
+
+class InventoryVersion(models.Model):
+    """用户物品数据的版本号
+
+    物品、分类、位置和导航的任何修改都会递增版本号（见 versions.py），
+    物品查找、详情等只读接口据此生成 ETag，数据未变时直接返回 304。
+    版本号保存在数据库中而不是缓存中，缓存被清空后也不会与旧的 ETag 重复。
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='inventory_version', verbose_name='所属用户')
+
+    # 版本号
+    version = models.PositiveBigIntegerField(default=1, verbose_name='版本号')
+
+    # 最后修改时间
+    updated_at = models.DateTimeField(default=timezone.now, verbose_name='修改时间')
+
+    def __str__(self):
+        return f'{self.user_id}:v{self.version}'
+
+    class Meta:
+        verbose_name = '物品数据版本'
+        verbose_name_plural = '物品数据版本'
+
+
+class NameSpelling(models.Model):
+    """房间/分类名称的拼音索引
+
+    预先计算名称的全拼和首字母，拼音联想查询为带索引的前缀范围查询。
+    名称中从每个汉字开始的后缀各占一行，如 "主卧室" 登记 zhuwoshi、woshi、shi，
+    "woshi"、"ws" 也能联想到 "主卧室"。
+    """
+    KIND_ROOM = 'room'
+    KIND_CATEGORY = 'category'
+    KIND_CHOICES = [
+        (KIND_ROOM, '房间'),
+        (KIND_CATEGORY, '分类'),
+    ]
+
+    # 关联到用户
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='name_spellings', verbose_name='所属用户')
+
+    # 名称类型
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, verbose_name='名称类型')
+
+    # 名称
+    name = models.CharField(max_length=200, verbose_name='名称')
+
+    # 拼音从名称中第几个汉字开始，0 为整个名称
+    start = models.PositiveSmallIntegerField(default=0, verbose_name='起始位置')
+
+    # 全拼，如 shouji
+    pinyin = models.CharField(max_length=800, blank=True, verbose_name='全拼')
+
+    # 首字母，如 sj
+    initials = models.CharField(max_length=200, blank=True, verbose_name='首字母')
+
+    def __str__(self):
+        return f'{self.name}({self.pinyin})'
+
+    class Meta:
+        verbose_name = '名称拼音'
+        verbose_name_plural = '名称拼音'
+        unique_together = (('user', 'kind', 'name', 'start'),)
+        indexes = [
+            models.Index(fields=['user', 'kind', 'pinyin'], name='spelling_pinyin_idx'),
+            models.Index(fields=['user', 'kind', 'initials'], name='spelling_initials_idx'),
+        ]
+
+
+class StoredFile(models.Model):
+    """图片文件的引用计数
+
+    图片按内容寻址存储（见 storage.py），多个物品可以引用同一个文件；
+    计数归零后文件才会进入删除队列。
+    """
+    # 存储中的文件名（相对 MEDIA_ROOT）
+    name = models.CharField(max_length=255, unique=True, verbose_name='文件名')
+
+    # 引用该文件的物品数
+    ref_count = models.IntegerField(default=0, verbose_name='引用计数')
+
+    def __str__(self):
+        return f'{self.name}({self.ref_count})'
+
+    class Meta:
+        verbose_name = '图片文件'
+        verbose_name_plural = '图片文件'
+
+
+class PendingFileDeletion(models.Model):
+    """待删除的媒体文件队列
+
+    删除或替换物品图片时，只在数据库事务中登记文件名，由后台线程或 gc_media 命令实际删除文件，
+    请求耗时与文件系统无关；进程意外退出时，未处理的记录会在下次清理时继续处理。
+    """
+    # 存储中的文件名（相对 MEDIA_ROOT）
+    name = models.CharField(max_length=255, unique=True, verbose_name='文件名')
+
+    # 登记时间
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='登记时间')
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        verbose_name = '待删除文件'
+        verbose_name_plural = '待删除文件'
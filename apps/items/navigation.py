@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""侧边栏导航的解析与缓存
+
+默认导航（user 为空）所有用户共用，用户自己的导航项只记录修改、隐藏和新增（见 Navigation）。
+每个用户的导航树在读取时由默认导航和用户导航项合并而成，以一次查询构建后写入缓存。
+缓存键中带有默认导航和用户导航两个版本号，导航项新增、修改、删除时递增对应的版本号
+（见 signals.py），旧缓存随之失效。版本号保存在数据库中（NavigationVersion），所有进程共用，
+缓存命中时渲染侧边栏只需一次读取版本号的查询。
+"""
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+
+from .models import Navigation, NavigationVersion
+
+# 默认导航：大分类及其子标签
+DEFAULT_NAVIGATION = [
+    {'name': '按房间找', 'url': '/items/find/?filter=room', 'icon': '🔍', 'order': 1, 'children': []},
+    {'name': '按分类找', 'url': '/items/find/?filter=category', 'icon': '📦', 'order': 2, 'children': []},
+    {'name': '管理分类', 'url': '/items/manage/', 'icon': '⚙️', 'order': 3, 'children': [
+        {'name': '分类管理', 'url': '/items/manage/?sub_tag=分类管理', 'icon': '📋', 'order': 1},
+        {'name': '房间管理', 'url': '/items/manage/?sub_tag=房间管理', 'icon': '🏠', 'order': 2},
+    ]},
+]
+
+# 导航树缓存时间（秒），版本号变化时会提前失效
+NAV_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _scope(user_id):
+    # user_id 为 None 时是默认导航的版本号
+    return NavigationVersion.DEFAULT_SCOPE if user_id is None else str(user_id)
+
+
+def _tree_key(user_id, default_version, version):
+    # 版本号改存数据库后从 0 重新计数，键名与之前按缓存计数的旧键区分开
+    return f'items:nav:tree:db:{user_id}:{default_version}:{version}'
+
+
+def get_versions(user_id):
+    """单次查询获取 (默认导航版本号, 用户导航版本号)，尚未修改过的为 0"""
+    scopes = [_scope(None), _scope(user_id)]
+    versions = dict(NavigationVersion.objects.filter(scope__in=scopes).values_list('scope', 'version'))
+    return versions.get(scopes[0], 0), versions.get(scopes[1], 0)
+
+
+def bump_version(user_id):
+    """递增用户导航（user_id 为 None 时为默认导航）的版本号，使已缓存的导航树失效"""
+    versions = NavigationVersion.objects.filter(scope=_scope(user_id))
+    if versions.update(version=F('version') + 1):
+        return
+    try:
+        with transaction.atomic():
+            NavigationVersion.objects.create(scope=_scope(user_id), version=1)
+    except IntegrityError:
+        # 并发请求已创建该记录，改为递增
+        versions.update(version=F('version') + 1)
+
+
+def build_nav_tree(user_id):
+    """单次查询合并默认导航和用户导航项，返回大分类列表，每项的 children 为其子标签"""
+    navs = list(
+        Navigation.objects.filter(Q(user_id=user_id) | Q(user__isnull=True)).order_by('order', 'id').values(
+            'id', 'name', 'type', 'parent_id', 'url', 'icon', 'order', 'user_id', 'override_of_id', 'hidden'
+        )
+    )
+    # 被用户替换的默认导航项 -> 替换它的用户导航项
+    replaced = {nav['override_of_id']: nav['id'] for nav in navs if nav['user_id'] is not None and nav['override_of_id']}
+
+    mains = []
+    children = {}
+    for nav in navs:
+        if nav['hidden'] or (nav['user_id'] is None and nav['id'] in replaced):
+            continue
+        parent_id = replaced.get(nav['parent_id'], nav['parent_id'])
+        node = {key: nav[key] for key in ('id', 'name', 'type', 'url', 'icon', 'order')}
+        node['parent_id'] = parent_id
+        if nav['type'] == 'main':
+            node['children'] = children.setdefault(nav['id'], [])
+            mains.append(node)
+        elif parent_id is not None:
+            children.setdefault(parent_id, []).append(node)
+    return mains
+
+
+def get_nav_tree(user_id):
+    """获取用户的导航树（优先读取缓存）"""
+    key = _tree_key(user_id, *get_versions(user_id))
+    tree = cache.get(key)
+    if tree is None:
+        tree = build_nav_tree(user_id)
+        cache.set(key, tree, NAV_CACHE_TIMEOUT)
+    return tree
+
+
+def resolve_navigation(user_id, path, active_sub_tag=''):
+    """根据当前请求路径确定活动的大分类，返回侧边栏所需的模板变量"""
+    main_navs = get_nav_tree(user_id)
+    active_main = next((nav for nav in main_navs if nav['url'] == path), None)
+    return {
+        'main_navs': main_navs,
+        'sub_navs': active_main['children'] if active_main else [],
+        'active_sub_tag': active_sub_tag,
+    }
+
+
+def get_visible(user_id, nav_id):
+    """获取用户可见的导航项（默认导航或用户自己的导航项），不存在时抛出 Navigation.DoesNotExist"""
+    return Navigation.objects.get(Q(user_id=user_id) | Q(user__isnull=True), id=nav_id)
+
+
+def _user_copy(nav, user_id):
+    """获取或创建用户对默认导航项的替换项"""
+    override = Navigation.objects.filter(user_id=user_id, override_of=nav).first()
+    if override is None:
+        override = Navigation(
+            user_id=user_id, override_of=nav, type=nav.type, parent_id=nav.parent_id,
+            name=nav.name, url=nav.url, icon=nav.icon, order=nav.order
+        )
+    return override
+
+
+def update_nav(nav, user_id, **fields):
+    """修改导航项；修改默认导航时只为该用户记录一条替换项，返回实际保存的导航项"""
+    if nav.user_id is None:
+        nav = _user_copy(nav, user_id)
+    for name, value in fields.items():
+        setattr(nav, name, value)
+    nav.save()
+    return nav
+
+
+def delete_nav(nav, user_id):
+    """删除导航项；默认导航（及其替换项）只对该用户隐藏"""
+    if nav.user_id is None or nav.override_of_id:
+        update_nav(nav, user_id, hidden=True)
+    else:
+        nav.delete()
+
+
+def ensure_defaults():
+    """创建默认导航（已存在的跳过），返回新建的导航项数"""
+    created_count = 0
+    for main in DEFAULT_NAVIGATION:
+        parent, created = Navigation.objects.get_or_create(
+            user=None, name=main['name'], type='main', parent=None,
+            defaults={'url': main['url'], 'icon': main['icon'], 'order': main['order']}
+        )
+        created_count += created
+        for child in main['children']:
+            _, created = Navigation.objects.get_or_create(
+                user=None, name=child['name'], type='sub', parent=parent,
+                defaults={'url': child['url'], 'icon': child['icon'], 'order': child['order']}
+            )
+            created_count += created
+    return created_count
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""物品列表的游标（keyset）分页
+
+按 (storage_time, id) 倒序翻页，游标记录上一页最后一条记录的位置，
+下一页只需 WHERE (storage_time, id) < (游标) 的索引范围扫描，翻页代价与页码无关。
+"""
+
+import base64
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+def encode_cursor(item):
+    """将物品的排序键编码为游标字符串"""
+    raw = f'{item.storage_time.isoformat()}|{item.pk}'
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """解析游标字符串，格式错误时抛出 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        storage_time, pk = raw.rsplit('|', 1)
+        storage_time = parse_datetime(storage_time)
+        pk = int(pk)
+    except (ValueError, UnicodeError) as e:
+        raise ValueError('无效的分页游标') from e
+    if storage_time is None:
+        raise ValueError('无效的分页游标')
+    return storage_time, pk
+
+
+def paginate_items(queryset, cursor=None, page_size=50):
+    """按 (storage_time, id) 倒序返回一页物品
+
+    返回 (物品列表, 下一页游标)，没有更多数据时游标为 None。
+    """
+    queryset = queryset.order_by('-storage_time', '-id')
+    if cursor:
+        storage_time, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(storage_time__lt=storage_time) | Q(storage_time=storage_time, id__lt=pk))
+
+    # 多取一条用于判断是否还有下一页
+    page = list(queryset[:page_size + 1])
+    if len(page) > page_size:
+        page = page[:page_size]
+        return page, encode_cursor(page[-1])
+    return page, None
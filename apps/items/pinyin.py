@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""中文名称的拼音转换
+
+依赖 pypinyin（离线词典）；未安装时返回空结果，拼音搜索不可用但不影响其他功能。
+"""
+
+from django.db.models import Max, Q
+
+from .models import Category, Item, NameSpelling, clean_room_name
+
+try:
+    from pypinyin import Style, lazy_pinyin
+except ImportError:  # pragma: no cover - 可选依赖
+    lazy_pinyin = None
+
+
+def syllables(text):
+    """返回文本中汉字的拼音音节列表，非汉字字符被忽略"""
+    if lazy_pinyin is None or not text:
+        return []
+    # errors 回调返回空列表，丢弃非汉字部分
+    return [syllable for syllable in lazy_pinyin(text, style=Style.NORMAL, errors=lambda chars: []) if syllable]
+
+
+def suffix_spellings(parts):
+    """音节列表每个后缀的 (全拼, 首字母)，如 ["shou", "ji"] -> [("shouji", "sj"), ("ji", "j")]
+
+    对后缀做前缀匹配即可匹配文本中间的词，如 "shouji"、"sj" 匹配 "华为手机"。
+    """
+    return [(''.join(parts[i:]), ''.join(part[0] for part in parts[i:])) for i in range(len(parts))]
+
+
+def spelling_rows(user_id, kind, name):
+    """名称的拼音索引行，每个汉字开始的后缀一行；没有汉字的名称只有一行空拼音"""
+    spellings = suffix_spellings(syllables(name)) or [('', '')]
+    return [
+        NameSpelling(user_id=user_id, kind=kind, name=name, start=start, pinyin=full, initials=initials)
+        for start, (full, initials) in enumerate(spellings)
+    ]
+
+
+def register_name(user_id, kind, name):
+    """登记房间/分类名称的拼音（已存在时跳过）"""
+    if not name or NameSpelling.objects.filter(user_id=user_id, kind=kind, name=name).exists():
+        return
+    NameSpelling.objects.bulk_create(spelling_rows(user_id, kind, name), ignore_conflicts=True)
+
+
+def rebuild_user_names(user_id):
+    """重建用户全部房间和分类名称的拼音索引"""
+    names = [(NameSpelling.KIND_CATEGORY, name) for name in Category.objects.filter(user_id=user_id).values_list('name', flat=True)]
+    rooms = Item.objects.filter(user_id=user_id).exclude(room_key='').order_by().values('room_key').annotate(label=Max('location'))
+    names += [(NameSpelling.KIND_ROOM, clean_room_name(row['label'])) for row in rooms]
+
+    rows = []
+    for kind, name in names:
+        rows.extend(spelling_rows(user_id, kind, name))
+    NameSpelling.objects.filter(user_id=user_id).delete()
+    NameSpelling.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+def suggest(user, kind, query, live_names, limit=10):
+    """按名称前缀、全拼前缀或首字母前缀联想房间/分类名称
+
+    拼音可以从名称中任一汉字开始匹配，整个名称的匹配排在前面。
+    live_names 为当前仍在使用的名称集合，用于过滤已重命名或已清空的旧名称。
+    """
+    query = query.strip()
+    if not query:
+        return []
+    condition = Q(start=0, name__startswith=query)
+    prefix = query.lower().replace(' ', '')
+    if prefix.isascii() and prefix.isalpha():
+        # 拼音只包含小写字母，[prefix, prefix + '{') 即为所有以 prefix 开头的值，可走索引范围扫描
+        condition |= Q(pinyin__gte=prefix, pinyin__lt=prefix + '{')
+        condition |= Q(initials__gte=prefix, initials__lt=prefix + '{')
+
+    names = []
+    candidates = NameSpelling.objects.filter(user=user, kind=kind).filter(condition).order_by('start', 'pinyin')
+    for name in candidates.values_list('name', flat=True)[:limit * 5]:
+        if name in live_names and name not in names:
+            names.append(name)
+            if len(names) >= limit:
+                break
+    return names
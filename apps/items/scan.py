@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""扫码查询物品
+
+手机连续扫描一排货架时每秒会有多次查询，按物品编号查询的结果放入短时缓存：
+- 缓存键包含用户、用户的数据版本号（见 versions.py）和物品编号，只缓存该用户自己的物品
+- 批量查询时一次 get_many，未命中的编号用一条 item_code IN (...) 查询（物品编号唯一索引）
+- 物品的任何修改都会递增版本号，各进程随即改用新的缓存键，旧缓存不再被读取、到期后清除
+"""
+
+import json
+
+from django.core.cache import cache
+
+from . import versions
+from .models import Item, parse_bigint
+from .storage import item_image_storage
+from .thumbnails import thumbnail_urls
+
+# 缓存有效期（秒）
+SCAN_CACHE_TIMEOUT = 30
+
+# 单次批量查询的最大编号数
+SCAN_BATCH_LIMIT = 100
+
+# 二维码类别：物品、储物格（位置）
+CATEGORY_ITEM = 'item'
+CATEGORY_STORAGE = 'storage'
+
+# 会话中记录已扫描、等待放入储物格的物品ID
+PENDING_SESSION_KEY = 'scan_pending_items'
+
+# 等待放入储物格的最大物品数
+PENDING_LIMIT = 100
+
+_FIELDS = ('id', 'item_code', 'name', 'location', 'room_id', 'category_id', 'image', 'has_thumbnails')
+
+
+def parse_code(value):
+    """解析扫描结果，返回 (类别, 编号)
+
+    value 可以是标签二维码内容 {"category": ..., "code": ...}（见 labels.qr_data），也可以是纯数字编号（视为物品）。
+    无法识别或编号超出范围时抛出 ValueError。
+    """
+    if isinstance(value, dict):
+        data = value
+    else:
+        text = str(value).strip()
+        if text.isdigit():
+            return CATEGORY_ITEM, parse_bigint(text, '无法识别的二维码')
+        try:
+            data = json.loads(text)
+        except ValueError as e:
+            raise ValueError('无法识别的二维码') from e
+    if not isinstance(data, dict) or data.get('category') not in (CATEGORY_ITEM, CATEGORY_STORAGE):
+        raise ValueError('无法识别的二维码')
+    return data['category'], parse_bigint(data.get('code'), '无法识别的二维码')
+
+
+def cache_key(user_id, version, item_code):
+    return f'items:scan:{user_id}:{version}:{item_code}'
+
+
+def _payload(row):
+    """查询结果转换为返回给客户端的精简数据"""
+    thumbnail = None
+    if row['image']:
+        # 小缩略图（JPEG），尚未生成时使用原图
+        thumbnail = (thumbnail_urls(row['image'])['small']['jpeg'] if row['has_thumbnails']
+                     else item_image_storage().url(row['image']))
+    return {
+        'id': row['id'],
+        'code': row['item_code'],
+        'name': row['name'],
+        'location': row['location'],
+        'room_id': row['room_id'],
+        'category_id': row['category_id'],
+        'thumbnail': thumbnail,
+    }
+
+
+def lookup(user, codes):
+    """按物品编号批量查询用户的物品，返回 ({编号: 物品数据}, 未找到的编号列表)"""
+    codes = list(dict.fromkeys(codes))
+    version = versions.get_version(user.pk)[0]
+    keys = {code: cache_key(user.pk, version, code) for code in codes}
+    cached = cache.get_many(list(keys.values()))
+    items = {code: cached[keys[code]] for code in codes if keys[code] in cached}
+    misses = [code for code in codes if code not in items]
+    if misses:
+        rows = Item.objects.filter(user=user, item_code__in=misses).order_by().values(*_FIELDS)
+        fresh = {row['item_code']: _payload(row) for row in rows}
+        cache.set_many({keys[code]: payload for code, payload in fresh.items()}, SCAN_CACHE_TIMEOUT)
+        items.update(fresh)
+    return items, [code for code in codes if code not in items]
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""物品全文搜索
+
+索引内容为物品名称、存放位置、分类名称和物品编号，写入时在 Python 中完成分词：
+- 中日韩文字：逐字 + 相邻二字（bigram），查询时按二字匹配，单字查询按单字匹配
+- 字母和数字：按连续片段小写分词，查询时做前缀匹配
+
+分词结果以空格拼接后写入索引表，因此数据库端只需按空白切分：
+- SQLite：FTS5 虚拟表 items_item_fts（rowid 即物品ID）
+- PostgreSQL：普通表 items_item_fts + to_tsvector('simple', body) 的 GIN 索引
+其他数据库回退到 icontains 查询。
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Item
+from .pinyin import suffix_spellings, syllables
+
+# 索引表名
+FTS_TABLE = 'items_item_fts'
+
+# 批量重建索引时每批处理的物品数
+INDEX_BATCH_SIZE = 500
+
+_CJK = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+_CJK_RE = re.compile(f'[{_CJK}]+')
+_TOKEN_RE = re.compile(f'[{_CJK}]+|[0-9a-z]+')
+
+
+def tokenize(text, for_query=False):
+    """将文本切分为索引词
+
+    建立索引时中文同时输出单字和二字词；查询时只输出二字词（单字查询除外），
+    使 "手机" 只匹配包含相邻 "手机" 的文本。
+    建立索引时还会输出从每个汉字开始的全拼和首字母，如 "华为手机" -> huaweishouji、hwsj、weishouji、wsj、shouji、sj、ji、j，
+    配合字母的前缀匹配即可用 "sj"、"shouj" 搜到名称中间的 "手机"。
+    """
+    tokens = []
+    for run in _TOKEN_RE.findall((text or '').lower()):
+        if not _CJK_RE.fullmatch(run):
+            tokens.append(run)
+            continue
+        bigrams = [run[i:i + 2] for i in range(len(run) - 1)]
+        if for_query:
+            tokens.extend(bigrams or [run])
+        else:
+            tokens.extend(list(run) + bigrams)
+            for full, initials in suffix_spellings(syllables(run)):
+                tokens.extend([full, initials])
+    return tokens
+
+
+def build_document(name, location, category_name, item_code):
+    """构建物品的索引文本"""
+    parts = [name, location, category_name, '' if item_code is None else str(item_code)]
+    return ' '.join(tokenize(' '.join(part or '' for part in parts)))
+
+
+def owner_token(user_id):
+    """用户标识词，用于在全文查询中限定用户"""
+    return f'u{user_id}'
+
+
+def is_supported():
+    """当前数据库是否支持全文索引"""
+    return connection.vendor in ('sqlite', 'postgresql')
+
+
+def write_documents(rows):
+    """写入索引行，rows 为 (物品ID, 用户ID, 索引文本) 列表"""
+    if not rows or not is_supported():
+        return
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(row[0],) for row in rows])
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, owner, body) VALUES (%s, %s, %s)',
+                [(item_id, owner_token(user_id), body) for item_id, user_id, body in rows]
+            )
+        else:
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (item_id, owner, body) VALUES (%s, %s, %s) '
+                f'ON CONFLICT (item_id) DO UPDATE SET owner = EXCLUDED.owner, body = EXCLUDED.body',
+                [(item_id, owner_token(user_id), body) for item_id, user_id, body in rows]
+            )
+
+
+def index_items(items):
+    """更新一组物品的索引（物品应已 select_related('category')）"""
+    write_documents([
+        (item.pk, item.user_id, build_document(
+            item.name, item.location, item.category.name if item.category else '', item.item_code
+        ))
+        for item in items
+    ])
+
+
+def remove_items(item_ids):
+    """从索引中删除物品"""
+    item_ids = list(item_ids)
+    if not item_ids or not is_supported():
+        return
+    column = 'rowid' if connection.vendor == 'sqlite' else 'item_id'
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE {column} = %s', [(item_id,) for item_id in item_ids])
+
+
+def reindex_queryset(queryset, batch_size=INDEX_BATCH_SIZE):
+    """按批重建查询集中物品的索引，返回处理的物品数"""
+    if not is_supported():
+        return 0
+    total = 0
+    batch = []
+    for item in queryset.select_related('category').order_by().iterator(chunk_size=batch_size):
+        batch.append(item)
+        if len(batch) >= batch_size:
+            index_items(batch)
+            total += len(batch)
+            batch = []
+    index_items(batch)
+    return total + len(batch)
+
+
+def reindex_item_ids(item_ids, batch_size=INDEX_BATCH_SIZE):
+    """按ID列表分批重建索引"""
+    item_ids = list(item_ids)
+    for start in range(0, len(item_ids), batch_size):
+        reindex_queryset(Item.objects.filter(id__in=item_ids[start:start + batch_size]), batch_size)
+
+
+def _search_ids_sqlite(user_id, tokens, limit):
+    terms = [f'"{token}"' if _CJK_RE.fullmatch(token) else f'"{token}"*' for token in tokens]
+    match = f'owner:{owner_token(user_id)} AND ' + ' AND '.join(f'body:{term}' for term in terms)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s ORDER BY rank LIMIT %s', [match, limit]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _search_ids_postgresql(user_id, tokens, limit):
+    terms = [f"'{token}'" if _CJK_RE.fullmatch(token) else f"'{token}':*" for token in tokens]
+    query = ' & '.join(terms)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT item_id FROM {FTS_TABLE} "
+            f"WHERE owner = %s AND to_tsvector('simple', body) @@ to_tsquery('simple', %s) "
+            f"ORDER BY ts_rank(to_tsvector('simple', body), to_tsquery('simple', %s)) DESC LIMIT %s",
+            [owner_token(user_id), query, query, limit]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_items(user, query, limit=200):
+    """搜索用户的物品，按相关度返回物品列表"""
+    tokens = tokenize(query, for_query=True)
+    if not tokens:
+        return []
+
+    if not is_supported():
+        # 不支持全文索引的数据库：回退到模糊匹配
+        items = Item.objects.filter(user=user).select_related('category')
+        for word in query.split():
+            items = items.filter(Q(name__icontains=word) | Q(location__icontains=word) | Q(category__name__icontains=word))
+        return list(items[:limit])
+
+    if connection.vendor == 'sqlite':
+        item_ids = _search_ids_sqlite(user.pk, tokens, limit)
+    else:
+        item_ids = _search_ids_postgresql(user.pk, tokens, limit)
+
+    # 按相关度顺序返回，同时再次限定用户
+    items = Item.objects.filter(user=user, id__in=item_ids).select_related('category').in_bulk()
+    return [items[item_id] for item_id in item_ids if item_id in items]
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""受保护文件的发送
+
+视图完成权限校验后调用 send_file，按 MEDIA_ACCEL_MODE 选择发送方式：
+- nginx：返回 X-Accel-Redirect，由 nginx 的 internal location 传输文件
+- sendfile：返回 X-Sendfile，由 Apache（mod_xsendfile）或 lighttpd 传输文件
+- 未配置：由 Django 发送，支持 If-Modified-Since 和单段 Range 请求
+"""
+
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.static import was_modified_since
+
+# 发送文件时每次读取的字节数
+CHUNK_SIZE = 64 * 1024
+
+_RANGE_RE = re.compile(r'^bytes=(?P<start>\d*)-(?P<end>\d*)$')
+
+
+def internal_url(path):
+    """文件路径对应的 nginx internal location URL，不在 MEDIA_ACCEL_LOCATIONS 目录中时返回 None"""
+    path = os.path.abspath(path)
+    for root, prefix in settings.MEDIA_ACCEL_LOCATIONS.items():
+        root = os.path.abspath(root)
+        if path.startswith(root + os.sep):
+            relative = os.path.relpath(path, root).replace(os.sep, '/')
+            return prefix.rstrip('/') + '/' + quote(relative)
+    return None
+
+
+def parse_range(header, size):
+    """解析 Range 请求头，返回 (起始, 结束) 字节位置（含结束位置）
+
+    没有 Range、格式不支持（如多段范围）时返回 None，按完整文件发送；
+    范围无法满足时抛出 ValueError。
+    """
+    match = _RANGE_RE.match(header.strip()) if header else None
+    if not match or not (match.group('start') or match.group('end')):
+        return None
+    if match.group('start'):
+        start = int(match.group('start'))
+        end = min(int(match.group('end')), size - 1) if match.group('end') else size - 1
+    else:
+        # bytes=-N 表示最后 N 个字节
+        start = max(size - int(match.group('end')), 0)
+        end = size - 1
+    if start > end or start >= size:
+        raise ValueError('无法满足的范围')
+    return start, end
+
+
+def _iter_range(path, start, length):
+    with open(path, 'rb') as fp:
+        fp.seek(start)
+        while length > 0:
+            chunk = fp.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _range_applies(request, stat):
+    """If-Range 与当前文件不一致时忽略 Range，发送完整文件"""
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    return parse_http_date_safe(if_range) == int(stat.st_mtime)
+
+
+def _django_response(request, path, stat, content_type):
+    try:
+        byte_range = parse_range(request.headers.get('Range'), stat.st_size) if _range_applies(request, stat) else None
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return response
+    if byte_range is None:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+        response['Content-Length'] = stat.st_size
+        return response
+    start, end = byte_range
+    response = StreamingHttpResponse(_iter_range(path, start, end - start + 1), status=206, content_type=content_type)
+    response['Content-Length'] = end - start + 1
+    response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    return response
+
+
+def send_file(request, path, content_type=None):
+    """发送 path 指向的文件，文件不存在时抛出 FileNotFoundError
+
+    调用方负责权限校验和缓存相关响应头（Cache-Control、ETag 等）。
+    """
+    stat = os.stat(path)
+    content_type = content_type or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    if not was_modified_since(request.headers.get('If-Modified-Since'), stat.st_mtime):
+        return HttpResponseNotModified()
+
+    mode = settings.MEDIA_ACCEL_MODE
+    url = internal_url(path) if mode == 'nginx' else None
+    if url:
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = url
+    elif mode == 'sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = os.path.abspath(path)
+    else:
+        response = _django_response(request, path, stat, content_type)
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Accept-Ranges'] = 'bytes'
+    return response
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""批量打印标签：按 A4 不干胶标签纸的网格排版
+
+- pdf：多页 PDF，二维码以矢量矩形绘制，编号使用 PDF 内置字体（不嵌入字体）
+- svg：每页一个内嵌 SVG 的 HTML 页面，由浏览器打印，可同时显示物品名称
+两种格式都逐页生成并以流式响应发送，物品按批从数据库读取，内存占用与标签总数无关；
+二维码矩阵复用 labels.qr_runs 的缓存。
+"""
+
+import zlib
+from collections import namedtuple
+from html import escape
+
+from . import labels
+
+# 标签纸规格（毫米）：每行列数、每页行数、标签宽高、左/上页边距、水平/垂直间距（相邻标签左上角的距离）
+SheetLayout = namedtuple('SheetLayout', 'label columns rows width height left top pitch_x pitch_y')
+
+SHEET_LAYOUTS = {
+    'a4-3x8': SheetLayout('A4 3×8（63.5×33.9mm）', 3, 8, 63.5, 33.9, 7.2, 12.9, 66.0, 33.9),
+    'a4-2x7': SheetLayout('A4 2×7（99.1×38.1mm）', 2, 7, 99.1, 38.1, 4.7, 15.1, 101.6, 38.1),
+    'a4-5x13': SheetLayout('A4 5×13（38.1×21.2mm）', 5, 13, 38.1, 21.2, 4.7, 10.7, 40.6, 21.2),
+}
+
+DEFAULT_LAYOUT = 'a4-3x8'
+
+# 输出格式：名称 -> MIME 类型
+SHEET_FORMATS = {
+    'pdf': 'application/pdf',
+    'svg': 'text/html; charset=utf-8',
+}
+
+# 单次最多打印的标签数
+LABEL_SHEET_LIMIT = 2000
+
+# 从数据库读取物品的批大小
+FETCH_CHUNK_SIZE = 500
+
+PAGE_WIDTH = 210
+PAGE_HEIGHT = 297
+
+# 标签内边距（毫米）
+LABEL_PADDING = 2
+
+# Helvetica-Bold 中数字和 # 的字宽（相对字号）
+_PDF_CHAR_WIDTH = 0.556
+
+_PT_PER_MM = 72 / 25.4
+
+
+def _pages(rows, per_page):
+    """将 (编号, 名称) 序列按每页标签数分组"""
+    page = []
+    for row in rows:
+        page.append(row)
+        if len(page) == per_page:
+            yield page
+            page = []
+    if page:
+        yield page
+
+
+def _cells(layout, page):
+    """页面中每个标签的 (左, 上, 编号, 名称)，单位毫米，原点为页面左上角"""
+    for index, (item_code, name) in enumerate(page):
+        row, column = divmod(index, layout.columns)
+        yield layout.left + column * layout.pitch_x, layout.top + row * layout.pitch_y, item_code, name
+
+
+def _qr_side(layout):
+    return min(layout.height - 2 * LABEL_PADDING, layout.width / 2)
+
+
+def _pdf_page(layout, page):
+    """单页 PDF 内容流"""
+    side = _qr_side(layout)
+    ops = []
+    for left, top, item_code, _ in _cells(layout, page):
+        modules, runs = labels.qr_runs(item_code)
+        module = side / modules * _PT_PER_MM
+        qr_left = (left + LABEL_PADDING) * _PT_PER_MM
+        qr_top = (PAGE_HEIGHT - top - (layout.height - side) / 2) * _PT_PER_MM
+        ops.append(''.join(
+            f'{qr_left + x * module:.2f} {qr_top - (y + 1) * module:.2f} {length * module:.2f} {module:.2f} re\n'
+            for x, y, length in runs
+        ) + 'f\n')
+
+        text = f'#{item_code}'
+        text_width = (layout.width - side - 3 * LABEL_PADDING) * _PT_PER_MM
+        font_size = min(layout.height * _PT_PER_MM * 0.3, text_width / (len(text) * _PDF_CHAR_WIDTH))
+        text_left = (left + side + 2 * LABEL_PADDING) * _PT_PER_MM
+        baseline = (PAGE_HEIGHT - top - layout.height / 2) * _PT_PER_MM - font_size * 0.35
+        ops.append(f'BT /F1 {font_size:.2f} Tf {text_left:.2f} {baseline:.2f} Td ({text}) Tj ET\n')
+    return ''.join(ops).encode('ascii')
+
+
+def stream_pdf(layout, rows):
+    """逐页生成 PDF，边生成边输出；页面树和交叉引用表在最后写出"""
+    offsets = {}
+    position = 0
+
+    def emit(number, body):
+        nonlocal position
+        data = f'{number} 0 obj\n'.encode() + body + b'\nendobj\n'
+        offsets[number] = position
+        position += len(data)
+        return data
+
+    header = b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n'
+    position = len(header)
+    yield header
+    # 1：目录，2：页面树（最后写出），3：字体
+    yield emit(1, b'<< /Type /Catalog /Pages 2 0 R >>')
+    yield emit(3, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold >>')
+
+    page_width = PAGE_WIDTH * _PT_PER_MM
+    page_height = PAGE_HEIGHT * _PT_PER_MM
+    kids = []
+    number = 3
+    for page in _pages(rows, layout.columns * layout.rows):
+        content = zlib.compress(_pdf_page(layout, page))
+        number += 2
+        yield emit(number - 1, f'<< /Length {len(content)} /Filter /FlateDecode >>\nstream\n'.encode()
+                   + content + b'\nendstream')
+        yield emit(number, (
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {page_width:.2f} {page_height:.2f}] '
+            f'/Resources << /Font << /F1 3 0 R >> >> /Contents {number - 1} 0 R >>'
+        ).encode())
+        kids.append(f'{number} 0 R')
+
+    yield emit(2, f'<< /Type /Pages /Kids [{" ".join(kids)}] /Count {len(kids)} >>'.encode())
+    xref = [f'xref\n0 {number + 1}\n', '0000000000 65535 f \n']
+    xref += [f'{offsets[n]:010d} 00000 n \n' for n in range(1, number + 1)]
+    xref.append(f'trailer\n<< /Size {number + 1} /Root 1 0 R >>\nstartxref\n{position}\n%%EOF\n')
+    yield ''.join(xref).encode()
+
+
+def _svg_page(layout, page):
+    side = _qr_side(layout)
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {PAGE_WIDTH} {PAGE_HEIGHT}">']
+    for left, top, item_code, name in _cells(layout, page):
+        modules, runs = labels.qr_runs(item_code)
+        qr_top = top + (layout.height - side) / 2
+        parts.append(
+            f'<g transform="translate({left + LABEL_PADDING:g} {qr_top:g}) scale({side / modules:.4f})">'
+            f'<path d="{labels.svg_path(runs)}" shape-rendering="crispEdges"/></g>'
+        )
+        text = f'#{item_code}'
+        text_left = left + side + 2 * LABEL_PADDING
+        text_width = layout.width - side - 3 * LABEL_PADDING
+        font_size = labels.fit_font_size(text, text_width, layout.height * 0.28)
+        middle = top + layout.height / 2
+        parts.append(f'<text x="{text_left:g}" y="{middle:g}" font-size="{font_size:.2f}" font-weight="bold">{text}</text>')
+        if name:
+            name_size = min(font_size, text_width / max(len(name), 1))
+            parts.append(
+                f'<text x="{text_left:g}" y="{middle + font_size * 1.3:g}" font-size="{name_size:.2f}">{escape(name)}</text>'
+            )
+    parts.append('</svg>')
+    return ''.join(parts).encode()
+
+
+def stream_svg(layout, rows):
+    """逐页生成每页一个 SVG 的 HTML 打印页面"""
+    yield (
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>物品标签</title><style>'
+        '@page{size:A4;margin:0}body{margin:0;font-family:sans-serif}'
+        f'svg{{display:block;width:{PAGE_WIDTH}mm;height:{PAGE_HEIGHT}mm;break-after:page}}'
+        '</style></head><body>'
+    ).encode()
+    for page in _pages(rows, layout.columns * layout.rows):
+        yield _svg_page(layout, page)
+    yield b'</body></html>'
+
+
+def stream_sheet(items, layout_name=DEFAULT_LAYOUT, fmt='pdf'):
+    """物品查询集的标签页，返回逐块生成的字节串迭代器"""
+    layout = SHEET_LAYOUTS[layout_name]
+    rows = items.order_by('item_code').values_list('item_code', 'name').iterator(chunk_size=FETCH_CHUNK_SIZE)
+    return stream_pdf(layout, rows) if fmt == 'pdf' else stream_svg(layout, rows)
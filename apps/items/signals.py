@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""物品应用信号处理"""
+
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import media, navigation, pinyin, search, stats, versions
+from .models import Category, Item, NameSpelling, Navigation, Room, clean_room_name
+
+
+@receiver(post_save, sender=Item)
+def update_stats_on_item_save(sender, instance, created, raw=False, **kwargs):
+    """物品新建或修改后增量更新统计"""
+    if raw:
+        return
+    current = (instance.user_id, instance.room_key, instance.category_id)
+    room_label = clean_room_name(instance.location)
+    previous = getattr(instance, '_stats_snapshot', None)
+    if created:
+        stats.apply_item_delta(*current, 1, room_label)
+    else:
+        if previous is None:
+            # 无法得知修改前的房间和分类，使统计失效
+            stats.invalidate_user_stats(instance.user_id)
+        elif previous != current:
+            stats.apply_item_delta(*previous, -1)
+            stats.apply_item_delta(*current, 1, room_label)
+    instance._stats_snapshot = current
+    instance._room_snapshot = (instance.room_key, instance.room_id)
+    search.index_items([instance])
+    versions.bump(instance.user_id)
+    
+    # 图片被替换后释放旧文件的引用，新图片在后台生成缩略图
+    previous_image = getattr(instance, '_image_snapshot', '')
+    current_image = instance.image.name or ''
+    if previous_image != current_image:
+        media.retain_files([current_image])
+        media.release_files([previous_image])
+        if not instance.has_thumbnails:
+            media.create_thumbnails_later([current_image])
+    instance._image_snapshot = current_image
+    
+    # 新房间登记拼音索引
+    if instance.room_key and (previous is None or previous[1] != instance.room_key):
+        pinyin.register_name(instance.user_id, NameSpelling.KIND_ROOM, room_label)
+
+
+@receiver(post_delete, sender=Item)
+def update_stats_on_item_delete(sender, instance, **kwargs):
+    """物品删除后增量更新统计"""
+    previous = getattr(instance, '_stats_snapshot', None)
+    if previous is None:
+        previous = (instance.user_id, instance.room_key, instance.category_id)
+    stats.apply_item_delta(*previous, -1)
+    search.remove_items([instance.pk])
+    media.release_files([instance.image.name])
+    versions.bump(instance.user_id)
+
+
+@receiver(post_save, sender=Category)
+def reindex_on_category_save(sender, instance, created, raw=False, **kwargs):
+    """分类新建或重命名后更新拼音索引和其物品的搜索索引"""
+    if raw:
+        return
+    pinyin.register_name(instance.user_id, NameSpelling.KIND_CATEGORY, instance.name)
+    versions.bump(instance.user_id)
+    if not created:
+        search.reindex_queryset(instance.items.all())
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_items(sender, instance, **kwargs):
+    """记录将被置为未分类的物品，删除后重建其索引"""
+    instance._item_ids = list(instance.items.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Category)
+def update_stats_on_category_delete(sender, instance, **kwargs):
+    """分类删除后其物品变为未分类"""
+    stats.move_category_to_uncategorized(instance.user_id, instance.pk)
+    search.reindex_item_ids(getattr(instance, '_item_ids', []))
+    versions.bump(instance.user_id)
+
+
+@receiver(post_save, sender=Room)
+@receiver(post_delete, sender=Room)
+def bump_version_on_room_change(sender, instance, raw=False, **kwargs):
+    """位置新增、重命名、删除后递增用户的数据版本号"""
+    if raw:
+        return
+    versions.bump(instance.user_id)
+
+
+@receiver(post_save, sender=Navigation)
+@receiver(post_delete, sender=Navigation)
+def invalidate_navigation_cache(sender, instance, raw=False, **kwargs):
+    """导航项新增、修改、删除后使该用户（默认导航为所有用户）的导航缓存和数据版本号失效"""
+    if raw:
+        return
+    navigation.bump_version(instance.user_id)
+    if instance.user_id is None:
+        versions.bump_all()
+    else:
+        versions.bump(instance.user_id)
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""物品统计汇总：按用户增量维护房间/分类/总数统计"""
+
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max
+
+from .models import InventoryStat, Item, clean_room_name, normalize_room
+
+
+def _category_key(category_id):
+    """分类ID转换为统计键，未分类为空字符串"""
+    return '' if category_id is None else str(category_id)
+
+
+def _bump(user_id, dimension, key, delta, label=''):
+    """对单条统计记录做增量更新，不存在时创建；增加计数时同时刷新显示名称"""
+    if not delta:
+        return
+    stats = InventoryStat.objects.filter(user_id=user_id, dimension=dimension, key=key)
+    changes = {'item_count': F('item_count') + delta}
+    if label and delta > 0:
+        changes['label'] = label
+    if stats.update(**changes) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            InventoryStat.objects.create(user_id=user_id, dimension=dimension, key=key, label=label, item_count=delta)
+    except IntegrityError:
+        # 并发请求已创建该记录，改为增量更新
+        stats.update(**changes)
+
+
+def apply_item_delta(user_id, room_key, category_id, delta, room_label=''):
+    """按单个物品的房间和分类更新统计
+
+    统计尚未建立（没有总数记录）时跳过，首次读取时会整体重建。
+    """
+    total = InventoryStat.objects.filter(user_id=user_id, dimension=InventoryStat.DIMENSION_TOTAL, key='')
+    if not total.update(item_count=F('item_count') + delta):
+        return
+    _bump(user_id, InventoryStat.DIMENSION_ROOM, room_key or '', delta, room_label)
+    _bump(user_id, InventoryStat.DIMENSION_CATEGORY, _category_key(category_id), delta)
+
+
+def apply_items_delta(user_id, rows, sign=1):
+    """按一批物品的房间和分类更新统计
+
+    rows 为 (房间键, 分类ID, 房间显示名称, 物品数) 列表，可以是逐个物品，也可以是分组计数；
+    sign 为 1 表示新增、-1 表示删除。每个房间、每个分类只更新一次。
+    """
+    rows = [row for row in rows if row[3]]
+    if not rows:
+        return
+    total = InventoryStat.objects.filter(user_id=user_id, dimension=InventoryStat.DIMENSION_TOTAL, key='')
+    if not total.update(item_count=F('item_count') + sign * sum(row[3] for row in rows)):
+        return
+    rooms = Counter()
+    labels = {}
+    categories = Counter()
+    for room_key, category_id, label, count in rows:
+        rooms[room_key or ''] += count
+        labels[room_key or ''] = label
+        categories[_category_key(category_id)] += count
+    for room_key, count in rooms.items():
+        _bump(user_id, InventoryStat.DIMENSION_ROOM, room_key, sign * count, labels[room_key])
+    for category_key, count in categories.items():
+        _bump(user_id, InventoryStat.DIMENSION_CATEGORY, category_key, sign * count)
+
+
+def group_counts(queryset):
+    """按房间和分类分组统计查询集中的物品数，返回可传给 apply_items_delta 的行"""
+    groups = queryset.order_by().values('room_key', 'category_id').annotate(n=Count('id'), label=Max('location'))
+    return [(row['room_key'], row['category_id'], clean_room_name(row['label']), row['n']) for row in groups]
+
+
+def move_room(user_id, old_key, new_name, count):
+    """批量重命名或清空房间后，将物品数从旧房间移到新房间"""
+    new_key = normalize_room(new_name)
+    if not count or old_key == new_key:
+        return
+    _bump(user_id, InventoryStat.DIMENSION_ROOM, old_key, -count)
+    _bump(user_id, InventoryStat.DIMENSION_ROOM, new_key, count, clean_room_name(new_name))
+
+
+def move_category_to_uncategorized(user_id, category_id):
+    """分类被删除后，其物品变为未分类"""
+    stats = InventoryStat.objects.filter(
+        user_id=user_id, dimension=InventoryStat.DIMENSION_CATEGORY, key=_category_key(category_id)
+    )
+    count = stats.values_list('item_count', flat=True).first()
+    if count:
+        stats.delete()
+        _bump(user_id, InventoryStat.DIMENSION_CATEGORY, '', count)
+
+
+def invalidate_user_stats(user_id):
+    """无法计算增量时使统计失效，下次读取时重建"""
+    InventoryStat.objects.filter(user_id=user_id, dimension=InventoryStat.DIMENSION_TOTAL).delete()
+
+
+def rebuild_user_stats(user_id):
+    """使用分组COUNT查询重建用户的全部统计"""
+    items = Item.objects.filter(user_id=user_id).order_by()
+    rows = [InventoryStat(user_id=user_id, dimension=InventoryStat.DIMENSION_TOTAL, key='', item_count=items.count())]
+    for row in items.values('room_key').annotate(n=Count('id'), label=Max('location')):
+        rows.append(InventoryStat(
+            user_id=user_id, dimension=InventoryStat.DIMENSION_ROOM, key=row['room_key'],
+            label=clean_room_name(row['label']), item_count=row['n']
+        ))
+    for row in items.values('category_id').annotate(n=Count('id')):
+        rows.append(InventoryStat(
+            user_id=user_id, dimension=InventoryStat.DIMENSION_CATEGORY,
+            key=_category_key(row['category_id']), item_count=row['n']
+        ))
+    with transaction.atomic():
+        InventoryStat.objects.filter(user_id=user_id).delete()
+        InventoryStat.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+def get_user_stats(user):
+    """读取用户统计数据
+
+    返回字典：
+    - total：物品总数
+    - rooms：{房间键: 物品数}，不含空房间
+    - room_labels：{房间键: 房间显示名称}
+    - categories：{分类ID: 物品数}，未分类的键为 None
+    """
+    fields = ('dimension', 'key', 'label', 'item_count')
+    rows = list(InventoryStat.objects.filter(user=user).values_list(*fields))
+    if not any(row[0] == InventoryStat.DIMENSION_TOTAL for row in rows):
+        rebuild_user_stats(user.pk)
+        rows = list(InventoryStat.objects.filter(user=user).values_list(*fields))
+
+    stats = {'total': 0, 'rooms': {}, 'room_labels': {}, 'categories': {}}
+    for dimension, key, label, count in rows:
+        if dimension == InventoryStat.DIMENSION_TOTAL:
+            stats['total'] = count
+        elif count <= 0:
+            continue
+        elif dimension == InventoryStat.DIMENSION_ROOM:
+            if key:
+                stats['rooms'][key] = count
+                stats['room_labels'][key] = label or key
+        elif dimension == InventoryStat.DIMENSION_CATEGORY:
+            stats['categories'][int(key) if key else None] = count
+    return stats
+
+
+def count_filtered_items(stats, filter_type, category_filter, categories):
+    """根据查找页面的筛选条件，从统计数据中得到物品数"""
+    if not category_filter:
+        return stats['total']
+    if filter_type == 'room':
+        return stats['rooms'].get(normalize_room(category_filter), 0)
+    if category_filter == '未分类':
+        return stats['categories'].get(None, 0)
+    return sum(stats['categories'].get(category.id, 0) for category in categories if category.name == category_filter)
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""按内容寻址的物品图片存储
+
+上传的图片按内容的 SHA-256 命名（item_images/ab/abcdef....jpg），相同内容只存一份；
+多个物品引用同一文件时由 StoredFile 表记录引用计数（见 media.py），
+计数归零后文件才进入删除队列。
+"""
+
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+
+# 内容寻址文件名：目录/哈希前两位/哈希.扩展名
+_CAS_RE = re.compile(r'(?:^|/)[0-9a-f]{2}/(?P<digest>[0-9a-f]{64})(?:\.[0-9a-z]+)?$')
+
+
+def content_digest(name):
+    """从内容寻址文件名中取出内容哈希，不是内容寻址文件名时返回 None"""
+    match = _CAS_RE.search(name or '')
+    return match.group('digest') if match else None
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """按内容哈希命名文件的本地存储，重复上传不占用额外磁盘空间"""
+
+    def get_available_name(self, name, max_length=None):
+        # 同名即同内容，直接复用已有文件
+        return name
+
+    def _save(self, name, content):
+        sha = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks():
+            sha.update(chunk)
+        digest = sha.hexdigest()
+        directory = posixpath.dirname(name)
+        ext = posixpath.splitext(name)[1].lower()
+        name = posixpath.join(directory, digest[:2], f'{digest}{ext}')
+
+        try:
+            # 复用已有文件：更新修改时间，使删除队列和垃圾回收把它当作刚写入的文件（见 media.py）
+            os.utime(self.path(name))
+            return name
+        except FileNotFoundError:
+            pass
+        content.seek(0)
+        self.write_atomic(name, content.chunks())
+        return name
+
+    def write_atomic(self, name, chunks):
+        """将 chunks 写入临时文件后原子替换为 name（已存在时覆盖），并发写入相同内容时结果一致"""
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+        if self.directory_permissions_mode is not None:
+            os.chmod(directory, self.directory_permissions_mode)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.upload')
+        try:
+            with os.fdopen(fd, 'wb') as fp:
+                for chunk in chunks:
+                    fp.write(chunk)
+            if self.file_permissions_mode is not None:
+                os.chmod(tmp_path, self.file_permissions_mode)
+            os.replace(tmp_path, full_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+def item_image_storage():
+    """Item.image 使用的存储（可调用对象，迁移中只记录引用）
+
+    文件仍位于 MEDIA_ROOT 下，URL 指向需要登录的 items:protected_media 视图。
+    """
+    return ContentAddressedStorage(base_url=settings.ITEM_MEDIA_URL)
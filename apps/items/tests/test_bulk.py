@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+物品批量操作测试
+"""
+
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.items import stats
+from apps.items.models import Category, Item
+from apps.items.tests.test_stats import StatsTestMixin
+
+
+class BulkOperationsTestCase(StatsTestMixin, TestCase):
+    """
+    测试批量操作后统计与逐个修改时一致
+    """
+
+    def setUp(self):
+        """测试前的设置"""
+        self.user = get_user_model().objects.create_user(username='bulk_user', password='testpassword123')
+        self.client.force_login(self.user)
+        self.tools = Category.objects.create(user=self.user, name='工具')
+        Item.objects.create(user=self.user, name='锤子', location='客厅', category=self.tools)
+        stats.get_user_stats(self.user)
+
+    def post_json(self, name, data):
+        """以JSON格式提交批量操作请求"""
+        return self.client.post(reverse(name), json.dumps(data), content_type='application/json').json()
+
+    def test_bulk_deposit(self):
+        """测试批量存放后统计一致，且编号连续"""
+        result = self.post_json('items:bulk_deposit_items', {'items': [
+            {'name': '扳手', 'location': '储藏室', 'category': self.tools.pk},
+            {'name': '钳子', 'location': '储藏室 ', 'category': '工具'},
+            {'name': '台灯', 'location': '客厅'},
+        ]})
+        self.assertTrue(result['success'])
+
+        self.assertStatsConsistent(self.user)
+        user_stats = stats.get_user_stats(self.user)
+        self.assertEqual(user_stats['rooms'], {'客厅': 2, '储藏室': 2})
+        self.assertEqual(user_stats['categories'], {self.tools.pk: 3, None: 1})
+        codes = sorted(Item.objects.filter(user=self.user, name__in=['扳手', '钳子', '台灯']).values_list('item_code', flat=True))
+        self.assertEqual(codes, list(range(codes[0], codes[0] + 3)))
+
+    def test_bulk_deposit_rejects_invalid_rows(self):
+        """测试有无效行时不存放任何物品，统计不变"""
+        result = self.post_json('items:bulk_deposit_items', {'items': [
+            {'name': '扳手', 'location': '储藏室'},
+            {'name': '', 'location': '储藏室'},
+        ]})
+        self.assertFalse(result['success'])
+        self.assertEqual(Item.objects.filter(user=self.user).count(), 1)
+        self.assertStatsConsistent(self.user)
+
+    def test_bulk_move(self):
+        """测试批量移动后统计一致，且只移动当前用户的物品"""
+        other = get_user_model().objects.create_user(username='bulk_other', password='testpassword123')
+        foreign = Item.objects.create(user=other, name='别人的物品', location='客厅')
+        Item.objects.create(user=self.user, name='台灯', location='客厅')
+        result = self.post_json('items:bulk_move_items', {'room': '客厅', 'location': ' 书房 '})
+        self.assertTrue(result['success'])
+        self.assertEqual(result['count'], 2)
+        self.assertEqual(result['location'], '书房')
+
+        self.assertStatsConsistent(self.user)
+        self.assertEqual(stats.get_user_stats(self.user)['rooms'], {'书房': 2})
+        foreign.refresh_from_db()
+        self.assertEqual(foreign.location, '客厅')
+
+    def test_bulk_delete(self):
+        """测试批量删除后统计一致"""
+        lamp = Item.objects.create(user=self.user, name='台灯', location='书房')
+        result = self.post_json('items:bulk_delete_items', {'category': '工具'})
+        self.assertTrue(result['success'])
+        self.assertEqual(result['count'], 1)
+
+        self.assertStatsConsistent(self.user)
+        self.assertEqual(list(Item.objects.filter(user=self.user)), [lamp])
+        self.assertEqual(stats.get_user_stats(self.user)['categories'], {None: 1})
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+扫码查询缓存测试
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from apps.items import scan, versions
+from apps.items.models import Item
+
+
+class ScanLookupTestCase(TestCase):
+    """
+    测试扫码查询的缓存随数据版本号失效，且只返回当前用户的物品
+    """
+
+    def setUp(self):
+        """测试前的设置"""
+        # 回滚后用户ID、物品编号和版本号会被重复使用，清除之前测试留下的缓存
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='scan_user', password='testpassword123')
+        self.item = Item.objects.create(user=self.user, name='锤子', location='客厅')
+
+    def test_cached_result_follows_version(self):
+        """测试其他进程修改物品（只递增版本号，不清除本进程缓存）后不再返回旧数据"""
+        items, missing = scan.lookup(self.user, [self.item.item_code])
+        self.assertEqual(items[self.item.item_code]['location'], '客厅')
+        self.assertEqual(missing, [])
+
+        Item.objects.filter(pk=self.item.pk).update(location='书房')
+        self.assertEqual(scan.lookup(self.user, [self.item.item_code])[0][self.item.item_code]['location'], '客厅')
+        versions.bump(self.user.pk)
+        self.assertEqual(scan.lookup(self.user, [self.item.item_code])[0][self.item.item_code]['location'], '书房')
+
+    def test_deleted_item_is_missing(self):
+        """测试删除的物品不再从缓存中返回"""
+        code = self.item.item_code
+        scan.lookup(self.user, [code])
+        self.item.delete()
+        self.assertEqual(scan.lookup(self.user, [code]), ({}, [code]))
+
+    def test_other_users_items_are_missing(self):
+        """测试不返回其他用户的物品"""
+        other = get_user_model().objects.create_user(username='scan_other', password='testpassword123')
+        self.assertEqual(scan.lookup(other, [self.item.item_code]), ({}, [self.item.item_code]))
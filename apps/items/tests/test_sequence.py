@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+物品编号序列测试
+"""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from apps.items import bulk
+from apps.items.models import Item, ItemCodeSequence
+
+
+class ItemCodeSequenceTestCase(TestCase):
+    """
+    测试编号序列的分配、校正，以及编号冲突时的重试
+    """
+
+    def setUp(self):
+        """测试前的设置"""
+        self.user = get_user_model().objects.create_user(username='seq_user', password='testpassword123')
+
+    def _occupy_next_code(self):
+        """绕过序列写入一个占用下一个编号的物品（模拟原始SQL导入），返回被占用的编号"""
+        last_value = ItemCodeSequence.objects.values_list('last_value', flat=True).get(name=ItemCodeSequence.ITEM_CODE)
+        Item.objects.create(user=self.user, name='导入物品', item_code=last_value + 1)
+        return last_value + 1
+
+    def test_reserve_returns_consecutive_block(self):
+        """测试一次预留的编号连续，且与之后分配的编号不重叠"""
+        first = ItemCodeSequence.next_value()
+        block = ItemCodeSequence.reserve(5)
+        self.assertEqual(list(block), list(range(first + 1, first + 6)))
+        self.assertEqual(ItemCodeSequence.next_value(), first + 6)
+
+    def test_reserve_rejects_non_positive_count(self):
+        """测试预留数量必须大于0"""
+        with self.assertRaises(ValueError):
+            ItemCodeSequence.reserve(0)
+
+    def test_first_use_starts_after_existing_codes(self):
+        """测试序列行不存在时以现有最大编号为起点"""
+        Item.objects.create(user=self.user, name='已有物品', item_code=41)
+        ItemCodeSequence.objects.all().delete()
+        self.assertEqual(ItemCodeSequence.next_value(), 42)
+
+    def test_sync_keeps_sequence_continuous(self):
+        """测试计数器未落后时 sync 不改变计数器，落后时推进到已有最大编号"""
+        code = ItemCodeSequence.next_value()
+        ItemCodeSequence.sync()
+        self.assertEqual(ItemCodeSequence.next_value(), code + 1)
+
+        Item.objects.create(user=self.user, name='导入物品', item_code=code + 100)
+        ItemCodeSequence.sync()
+        self.assertEqual(ItemCodeSequence.next_value(), code + 101)
+
+    def test_save_retries_after_code_conflict(self):
+        """测试新建物品的编号被占用时校正序列并重试"""
+        ItemCodeSequence.next_value()
+        taken = self._occupy_next_code()
+
+        item = Item.objects.create(user=self.user, name='新物品')
+        self.assertEqual(item.item_code, taken + 1)
+        self.assertEqual(ItemCodeSequence.next_value(), taken + 2)
+
+    def test_bulk_insert_retries_after_code_conflict(self):
+        """测试批量插入的编号被占用时校正序列并重新预留"""
+        ItemCodeSequence.next_value()
+        taken = self._occupy_next_code()
+
+        items = bulk._insert([Item(user=self.user, name=f'批量物品{i}') for i in range(3)])
+        # 第一次预留的 taken ~ taken+2 因冲突作废，重试时预留其后的一段
+        self.assertEqual([item.item_code for item in items], [taken + 3, taken + 4, taken + 5])
+        self.assertEqual(Item.objects.filter(user=self.user).count(), 4)
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+物品统计增量更新测试
+"""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.items import stats
+from apps.items.models import Category, Item
+
+
+class StatsTestMixin:
+    """比较增量维护的统计与重建后的统计"""
+
+    def assertStatsConsistent(self, user):
+        """断言增量维护的统计与分组COUNT重建的结果一致"""
+        incremental = stats.get_user_stats(user)
+        stats.rebuild_user_stats(user.pk)
+        self.assertEqual(incremental, stats.get_user_stats(user))
+
+
+class InventoryStatsTestCase(StatsTestMixin, TestCase):
+    """
+    测试物品、分类和房间修改后统计的增量更新
+    """
+
+    def setUp(self):
+        """测试前的设置"""
+        self.user = get_user_model().objects.create_user(username='stats_user', password='testpassword123')
+        self.client.force_login(self.user)
+        self.tools = Category.objects.create(user=self.user, name='工具')
+        self.books = Category.objects.create(user=self.user, name='书籍')
+        self.hammer = Item.objects.create(user=self.user, name='锤子', location='客厅', category=self.tools)
+        self.novel = Item.objects.create(user=self.user, name='小说', location='书房', category=self.books)
+        self.charger = Item.objects.create(user=self.user, name='充电器', location=' 客厅 ')
+        # 读取一次统计，之后的修改都在已有统计上做增量更新
+        stats.get_user_stats(self.user)
+
+    def test_item_changes(self):
+        """测试新建、修改位置和分类、删除物品"""
+        Item.objects.create(user=self.user, name='螺丝刀', location='储藏室', category=self.tools)
+        self.hammer.location = '储藏室'
+        self.hammer.save()
+        self.novel.category = None
+        self.novel.save()
+        self.charger.delete()
+
+        self.assertStatsConsistent(self.user)
+        user_stats = stats.get_user_stats(self.user)
+        self.assertEqual(user_stats['total'], 3)
+        self.assertEqual(user_stats['rooms'], {'储藏室': 2, '书房': 1})
+        self.assertEqual(user_stats['categories'], {self.tools.pk: 2, None: 1})
+
+    def test_delete_category(self):
+        """测试删除分类后其物品计入未分类"""
+        self.client.post(reverse('items:manage_categories'), {'delete_category': '1', 'category_id': self.tools.pk})
+
+        self.assertStatsConsistent(self.user)
+        self.assertEqual(stats.get_user_stats(self.user)['categories'], {self.books.pk: 1, None: 2})
+
+    def test_rename_room(self):
+        """测试重命名房间，包括重命名为已有房间"""
+        self.client.post(reverse('items:manage_categories'), {'update_room': '1', 'old_name': '客厅', 'new_name': '起居室'})
+        self.assertStatsConsistent(self.user)
+        self.assertEqual(stats.get_user_stats(self.user)['room_labels'], {'起居室': '起居室', '书房': '书房'})
+
+        self.client.post(reverse('items:manage_categories'), {'update_room': '1', 'old_name': '书房', 'new_name': '起居室'})
+        self.assertStatsConsistent(self.user)
+        self.assertEqual(stats.get_user_stats(self.user)['rooms'], {'起居室': 3})
+
+    def test_clear_room(self):
+        """测试删除房间后其物品不再属于任何房间"""
+        self.client.post(reverse('items:manage_categories'), {'delete_room': '1', 'room_name': '客厅'})
+
+        self.assertStatsConsistent(self.user)
+        user_stats = stats.get_user_stats(self.user)
+        self.assertEqual(user_stats['rooms'], {'书房': 1})
+        self.assertEqual(user_stats['total'], 3)
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+物品只读视图条件请求（ETag/304）测试
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.crypto import get_random_string
+
+from apps.items import versions
+from apps.items.models import Item
+
+
+class ConditionalRequestTestCase(TestCase):
+    """
+    测试 ETag 随数据版本号和 CSRF 令牌变化，未变化时返回 304
+    """
+
+    def setUp(self):
+        """测试前的设置"""
+        self.user = get_user_model().objects.create_user(username='etag_user', password='testpassword123')
+        self.client.force_login(self.user)
+        self.item = Item.objects.create(user=self.user, name='锤子', location='客厅')
+        self.url = reverse('items:item_detail', args=[self.item.pk])
+
+    def test_first_response_etag_matches_next_request(self):
+        """测试首个响应的 ETag（同时下发 CSRF Cookie）在下一次请求中即可匹配"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(settings.CSRF_COOKIE_NAME, response.cookies)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_after_item_change(self):
+        """测试物品修改后旧 ETag 失效"""
+        etag = self.client.get(self.url)['ETag']
+        self.item.name = '羊角锤'
+        self.item.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertContains(response, '羊角锤')
+
+    def test_etag_changes_with_csrf_token(self):
+        """测试 CSRF 令牌更换后不再返回 304（旧页面中的表单令牌已失效）"""
+        etag = self.client.get(self.url)['ETag']
+        self.client.cookies[settings.CSRF_COOKIE_NAME] = get_random_string(32)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_is_per_user(self):
+        """测试其他用户的修改不影响当前用户的 ETag"""
+        etag = self.client.get(self.url)['ETag']
+        other = get_user_model().objects.create_user(username='etag_other', password='testpassword123')
+        versions.get_version(other.pk)
+        Item.objects.create(user=other, name='扳手', location='客厅')
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_response_with_messages_has_no_etag(self):
+        """测试显示了提示消息的页面不带校验值，之后不会以 304 重复显示消息"""
+        self.client.post(reverse('items:deposit_item'), {'name': '扳手', 'location': '客厅'})
+
+        response = self.client.get(self.url)
+        self.assertContains(response, '物品已成功存放')
+        self.assertFalse(response.has_header('ETag'))
+
+        response = self.client.get(self.url)
+        self.assertNotContains(response, '物品已成功存放')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""物品图片缩略图
+
+每张图片生成固定尺寸（长边 128/512 像素）的 WebP 和 JPEG 两种格式，
+与原图一起存放在图片目录下的 thumbs 子目录中，文件名由原图文件名推导：
+item_images/foo.png -> item_images/thumbs/foo.png_128.webp
+"""
+
+import io
+import posixpath
+import re
+
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from .storage import item_image_storage
+
+# 缩略图尺寸：名称 -> 长边像素
+THUMBNAIL_SIZES = {
+    'small': 128,
+    'large': 512,
+}
+
+# 输出格式：名称 -> (Pillow 格式, 扩展名, 保存参数)
+THUMBNAIL_FORMATS = {
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+
+# 缩略图子目录名
+THUMB_DIR = 'thumbs'
+
+_THUMB_RE = re.compile(r'^(?P<name>.+)_(?P<px>\d+)\.(?P<ext>[a-z]+)$')
+
+
+def thumbnail_name(name, size, fmt):
+    """原图 name 在指定尺寸和格式下的缩略图文件名"""
+    directory, filename = posixpath.split(name)
+    ext = THUMBNAIL_FORMATS[fmt][1]
+    return posixpath.join(directory, THUMB_DIR, f'{filename}_{THUMBNAIL_SIZES[size]}.{ext}')
+
+
+def thumbnail_names(name):
+    """原图 name 的全部缩略图文件名"""
+    return [thumbnail_name(name, size, fmt) for size in THUMBNAIL_SIZES for fmt in THUMBNAIL_FORMATS]
+
+
+def original_name(name):
+    """缩略图文件名对应的原图文件名，name 不是缩略图时返回 None"""
+    directory, filename = posixpath.split(name)
+    if posixpath.basename(directory) != THUMB_DIR:
+        return None
+    match = _THUMB_RE.match(filename)
+    if not match:
+        return None
+    return posixpath.join(posixpath.dirname(directory), match.group('name'))
+
+
+def thumbnail_urls(name):
+    """原图 name 的缩略图URL：{尺寸: {格式: URL}}"""
+    storage = item_image_storage()
+    return {
+        size: {fmt: storage.url(thumbnail_name(name, size, fmt)) for fmt in THUMBNAIL_FORMATS}
+        for size in THUMBNAIL_SIZES
+    }
+
+
+def render(image, box, fmt):
+    """将已打开的图片等比缩放到不超过 box（宽, 高），按 fmt 编码后返回字节串（不放大）"""
+    pil_format, _, options = THUMBNAIL_FORMATS[fmt]
+    thumb = image.copy()
+    thumb.thumbnail(box, Image.LANCZOS)
+    if pil_format == 'JPEG' and thumb.mode != 'RGB':
+        # JPEG 不支持透明通道，透明部分以白色填充
+        background = Image.new('RGB', thumb.size, (255, 255, 255))
+        rgba = thumb.convert('RGBA')
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        thumb = background
+    elif thumb.mode not in ('RGB', 'RGBA'):
+        thumb = thumb.convert('RGBA' if 'A' in thumb.getbands() else 'RGB')
+    buffer = io.BytesIO()
+    thumb.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def open_image(name):
+    """打开存储中的图片并按 EXIF 方向信息旋转（手机照片）"""
+    with default_storage.open(name, 'rb') as fp:
+        image = Image.open(fp)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    return image
+
+
+def generate(name):
+    """为存储中的原图 name 生成全部缩略图（已存在的覆盖）
+
+    多个物品共用同一原图时可能同时生成，写入采用原子替换，不会产生重名文件。
+    """
+    storage = item_image_storage()
+    image = open_image(name)
+    for size, max_px in THUMBNAIL_SIZES.items():
+        for fmt in THUMBNAIL_FORMATS:
+            storage.write_atomic(thumbnail_name(name, size, fmt), [render(image, (max_px, max_px), fmt)])
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""上传图片的处理
+
+手机照片动辄 10~20 MB，保存前统一处理：
+- 按 EXIF 方向信息旋转，之后去除 EXIF 等元数据（含拍摄位置）
+- 长边缩小到 ITEM_UPLOAD_MAX_DIMENSION 以内，按 ITEM_UPLOAD_FORMAT/ITEM_UPLOAD_QUALITY 重新编码
+- JPEG 解码时直接按 1/2、1/4、1/8 缩小（Pillow draft 模式），大图不会完整解码到内存
+动图不处理；处理后反而更大且无需旋转、缩小的图片保留原文件。
+浏览器在上传前按 client_config() 下发的参数先行压缩（见 static/js/deposit_module.js）。
+"""
+
+import io
+import posixpath
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# 输出格式：名称 -> (Pillow 格式, 扩展名, MIME 类型)
+UPLOAD_FORMATS = {
+    'jpeg': ('JPEG', 'jpg', 'image/jpeg'),
+    'webp': ('WEBP', 'webp', 'image/webp'),
+    'png': ('PNG', 'png', 'image/png'),
+}
+
+# EXIF 方向标签
+_ORIENTATION_TAG = 0x0112
+
+
+def _output_format(image):
+    fmt = settings.ITEM_UPLOAD_FORMAT
+    if fmt == 'jpeg' and ('A' in image.getbands() or 'transparency' in image.info):
+        # JPEG 不支持透明通道
+        return 'png'
+    return fmt
+
+
+def _encode(image, fmt):
+    pil_format = UPLOAD_FORMATS[fmt][0]
+    if pil_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+    options = {}
+    if pil_format == 'JPEG':
+        options = {'quality': settings.ITEM_UPLOAD_QUALITY, 'optimize': True, 'progressive': True}
+    elif pil_format == 'WEBP':
+        options = {'quality': settings.ITEM_UPLOAD_QUALITY, 'method': 4}
+    elif pil_format == 'PNG':
+        options = {'optimize': True}
+    if image.info.get('icc_profile'):
+        # 保留色彩配置，其余元数据不写入
+        options['icc_profile'] = image.info['icc_profile']
+    buffer = io.BytesIO()
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def process_image(upload):
+    """处理上传的图片文件，返回处理后的上传文件（无需处理时返回原文件）
+
+    不是有效图片或像素数超过 ITEM_UPLOAD_MAX_PIXELS 时抛出 ValueError。
+    """
+    if not settings.ITEM_UPLOAD_PROCESSING:
+        return upload
+    max_dimension = settings.ITEM_UPLOAD_MAX_DIMENSION
+    upload.seek(0)
+    try:
+        # 只读取文件头，像素数据在 load() 时按 draft 设定的比例解码
+        image = Image.open(upload)
+        width, height = image.size
+        if width * height > settings.ITEM_UPLOAD_MAX_PIXELS:
+            raise ValueError('图片尺寸过大')
+        if getattr(image, 'is_animated', False):
+            upload.seek(0)
+            return upload
+        needs_resize = max_dimension and max(width, height) > max_dimension
+        if needs_resize:
+            image.draft('RGB', (max_dimension, max_dimension))
+        rotated = image.getexif().get(_ORIENTATION_TAG, 1) != 1
+        has_metadata = bool(image.info.get('exif') or image.info.get('xmp') or image.info.get('XML:com.adobe.xmp'))
+        image = ImageOps.exif_transpose(image)
+        if needs_resize:
+            image.thumbnail((max_dimension, max_dimension), Image.LANCZOS, reducing_gap=3.0)
+        fmt = _output_format(image)
+        data = _encode(image, fmt)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        raise ValueError('无法识别的图片文件') from e
+
+    upload.seek(0)
+    if not (needs_resize or rotated or has_metadata) and len(data) >= upload.size:
+        return upload
+    _, ext, content_type = UPLOAD_FORMATS[fmt]
+    name = f'{posixpath.splitext(posixpath.basename(upload.name or "image"))[0]}.{ext}'
+    return SimpleUploadedFile(name, data, content_type=content_type)
+
+
+def client_config():
+    """下发给浏览器的压缩参数，页面中以 json_script 输出（id 为 upload-config）"""
+    fmt = settings.ITEM_UPLOAD_FORMAT if settings.ITEM_UPLOAD_FORMAT in ('jpeg', 'webp') else 'jpeg'
+    return {
+        'maxDimension': settings.ITEM_UPLOAD_MAX_DIMENSION if settings.ITEM_UPLOAD_PROCESSING else 0,
+        'quality': settings.ITEM_UPLOAD_QUALITY / 100,
+        'type': UPLOAD_FORMATS[fmt][2],
+        'targetBytes': settings.ITEM_UPLOAD_TARGET_BYTES,
+    }
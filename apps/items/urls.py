@@ -8,18 +8,35 @@ from .views import ItemCreateView
 app_name = 'items'
 urlpatterns = [
     path('deposit/', views.deposit_item, name='deposit_item'),  # 保留原有的模态框路由
+    path('deposit/bulk/', views.bulk_deposit_items, name='bulk_deposit_items'),  # 批量存放物品API
     path('create/', ItemCreateView.as_view(), name='item_create'),  # 新增独立页面路由
     path('success/', views.success, name='success'),  # 成功页面路由
     path('tag_view/', views.tag_view, name='tag_view'),
+    path('print/', views.print_selector, name='print_selector'),  # 选择打印类型
+    path('labels/sheet/', views.label_sheet, name='label_sheet'),  # 批量打印标签（PDF/SVG）
+    path('generate_tag/', views.generate_tag, name='generate_tag'),  # 生成物品标签API
+    path('tag/<int:item_code>.<str:fmt>', views.tag_image, name='tag_image'),  # 物品标签图片（png/svg）
     path('find/', views.find_items, name='find_items'),  # 查找物品页面
+    path('find/page/', views.find_items_page, name='find_items_page'),  # 查找物品分页片段API
     path('test-find/', views.test_find_items, name='test_find_items'),
     path('detail/<int:item_id>/', views.item_detail, name='item_detail'),  # 物品详情页
+    path('image/<int:item_id>/', views.item_image, name='item_image'),  # 物品图片按需缩放API
+    path('media/<path:name>', views.protected_media, name='protected_media'),  # 物品图片及缩略图（需登录，前缀与 ITEM_MEDIA_URL 一致）
     path('delete/<int:item_id>/', views.delete_item, name='delete_item'),  # 删除物品API
     path('update_location/<int:item_id>/', views.update_item_location, name='update_item_location'),  # 更新物品位置API
+    path('bulk/move/', views.bulk_move_items, name='bulk_move_items'),  # 批量移动物品API
+    path('bulk/delete/', views.bulk_delete_items, name='bulk_delete_items'),  # 批量删除物品API
     path('add_category/', views.add_category, name='add_category'),  # 添加新分类API
     path('add_room/', views.add_room, name='add_room'),  # 添加新房间API
     path('manage/', views.manage_categories, name='manage_categories'),  # 管理分类和房间
     path('manage_nav/', views.manage_navigation, name='manage_navigation'),  # 管理导航项API
     path('api/get_items_by_category/', views.get_items_by_category, name='get_items_by_category'),  # 根据分类获取物品API
+    path('api/search/', views.search_items, name='search_items'),  # 物品搜索API
+    path('api/suggest/', views.suggest_names, name='suggest_names'),  # 房间/分类名称联想API
+    path('api/scan/', views.scan_lookup, name='scan_lookup'),  # 扫码查询物品API（支持批量）
+    path('associate/', views.associate_item_storage, name='associate_item_storage'),  # 扫码关联物品和储物格
+    path('associate/clear/', views.clear_association, name='clear_association'),  # 清除扫码关联状态
+    path('api/rooms/', views.room_tree, name='room_tree'),  # 位置树API
+    path('api/rooms/<int:room_id>/items/', views.room_items, name='room_items'),  # 位置及其子容器中的物品API
 
 ]
\ No newline at end of file
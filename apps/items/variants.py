@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""物品图片按需缩放及其磁盘缓存
+
+任意尺寸/格式的图片变体只渲染一次，写入 ITEM_IMAGE_CACHE_DIR：
+- 缓存键为原图内容哈希 + 参数，原图不变时跨物品、跨进程复用，原图更换后自然失效
+- 命中时更新文件修改时间；总大小超过 ITEM_IMAGE_CACHE_MAX_BYTES 时按修改时间淘汰最久未使用的变体
+- 淘汰需要遍历缓存目录，每写入一批新变体在后台线程中检查一次，gc_media 命令也会执行一次
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.urls import reverse
+
+from . import thumbnails
+from .storage import content_digest
+
+# 允许请求的最大边长（像素）
+MAX_VARIANT_SIZE = 2048
+
+# 每写入多少个新变体检查一次缓存总大小
+EVICT_INTERVAL = 50
+
+# 淘汰时清理到上限的比例，避免每次写入都触发淘汰
+EVICT_TARGET_RATIO = 0.9
+
+# URL 中内容版本（内容哈希前缀）的长度
+VERSION_LENGTH = 12
+
+_writes = 0
+_evict_lock = threading.Lock()
+
+
+def cache_dir():
+    return str(settings.ITEM_IMAGE_CACHE_DIR)
+
+
+def content_hash(name):
+    """原图内容的 SHA-256，按文件名、大小和修改时间缓存，避免每次请求重读原图
+
+    按内容寻址存储的图片直接从文件名中取出哈希。
+    """
+    digest = content_digest(name)
+    if digest:
+        return digest
+    path = default_storage.path(name)
+    stat = os.stat(path)
+    key = f'items:image_hash:{hashlib.md5(name.encode()).hexdigest()}:{stat.st_size}:{stat.st_mtime_ns}'
+    digest = cache.get(key)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as fp:
+            for chunk in iter(lambda: fp.read(1024 * 1024), b''):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        cache.set(key, digest, None)
+    return digest
+
+
+def parse_params(width, height, fmt, accept=''):
+    """校验缩放参数，返回 (宽, 高, 格式)，宽或高为 0 表示不限制；参数无效时抛出 ValueError"""
+    try:
+        width = int(width or 0)
+        height = int(height or 0)
+    except ValueError as e:
+        raise ValueError('尺寸参数无效') from e
+    if not (0 <= width <= MAX_VARIANT_SIZE and 0 <= height <= MAX_VARIANT_SIZE) or not (width or height):
+        raise ValueError(f'宽高须在 1~{MAX_VARIANT_SIZE} 之间，且至少指定一个')
+    if not fmt:
+        # 未指定格式时按浏览器支持情况选择
+        fmt = 'webp' if 'image/webp' in accept else 'jpeg'
+    if fmt not in thumbnails.THUMBNAIL_FORMATS:
+        raise ValueError('不支持的图片格式')
+    return width, height, fmt
+
+
+def variant_url(item, width=0, height=0, fmt='jpeg'):
+    """带内容版本的缩放图片URL，可被浏览器长期缓存"""
+    query = f'w={width}&h={height}&format={fmt}&v={content_hash(item.image.name)[:VERSION_LENGTH]}'
+    return f"{reverse('items:item_image', args=[item.pk])}?{query}"
+
+
+def variant_path(digest, width, height, fmt):
+    ext = thumbnails.THUMBNAIL_FORMATS[fmt][1]
+    return os.path.join(cache_dir(), digest[:2], f'{digest}_{width}x{height}.{ext}')
+
+
+def get_variant(name, width, height, fmt):
+    """返回 (变体文件路径, 内容哈希)，缓存中没有时渲染并写入"""
+    digest = content_hash(name)
+    path = variant_path(digest, width, height, fmt)
+    try:
+        # 命中：刷新修改时间，供 LRU 淘汰使用
+        os.utime(path)
+        return path, digest
+    except FileNotFoundError:
+        pass
+
+    box = (width or MAX_VARIANT_SIZE, height or MAX_VARIANT_SIZE)
+    data = thumbnails.render(thumbnails.open_image(name), box, fmt)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # 先写临时文件再原子替换，并发请求不会读到不完整的文件
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as fp:
+        fp.write(data)
+    os.replace(tmp_path, path)
+    _after_write()
+    return path, digest
+
+
+def _after_write():
+    global _writes
+    _writes += 1
+    if _writes % EVICT_INTERVAL == 1 and not _evict_lock.locked():
+        # 遍历缓存目录的耗时随缓存增长，不在图片请求中执行
+        threading.Thread(target=evict, daemon=True).start()
+
+
+def evict(max_bytes=None):
+    """缓存总大小超过上限时，按修改时间从旧到新删除变体，返回删除的文件数"""
+    max_bytes = settings.ITEM_IMAGE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    if not _evict_lock.acquire(blocking=False):
+        return 0
+    try:
+        entries = []
+        total = 0
+        for directory, _, files in os.walk(cache_dir()):
+            for filename in files:
+                path = os.path.join(directory, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        if total <= max_bytes:
+            return 0
+        removed = 0
+        target = max_bytes * EVICT_TARGET_RATIO
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+    finally:
+        _evict_lock.release()
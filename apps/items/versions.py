@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""用户物品数据版本号与条件请求
+
+物品、分类、位置的增删改以及导航修改时递增用户的版本号（信号、批量操作、房间整体更新等处调用 bump）；
+默认导航为所有用户共用，修改时递增所有用户的版本号。
+物品查找、详情等只读视图用 conditional 装饰，ETag 由用户、版本号和 CSRF 令牌组成，
+在视图执行任何物品查询之前比较 If-None-Match，数据未变时直接返回 304（只需一次主键查询）。
+"""
+
+import hashlib
+from functools import wraps
+
+from django.contrib.messages import get_messages
+from django.middleware.csrf import get_token
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .models import InventoryVersion
+
+# 同一请求中读取的版本号，ETag 和 Last-Modified 共用一次查询
+_REQUEST_ATTR = '_inventory_version'
+
+
+def get_version(user_id):
+    """用户当前的 (版本号, 修改时间)，尚无记录时创建"""
+    row = InventoryVersion.objects.filter(user_id=user_id).values_list('version', 'updated_at').first()
+    if row is None:
+        try:
+            with transaction.atomic():
+                version = InventoryVersion.objects.create(user_id=user_id)
+            row = (version.version, version.updated_at)
+        except IntegrityError:
+            # 并发请求已创建该记录
+            row = InventoryVersion.objects.filter(user_id=user_id).values_list('version', 'updated_at').get()
+    return row
+
+
+def bump(user_id):
+    """递增用户的版本号，使已发出的 ETag 失效
+
+    记录在首次生成 ETag 时创建（见 get_version），尚无记录时无需递增；
+    这里不创建记录，删除用户时级联删除物品触发的信号不会再插入该用户的记录。
+    """
+    InventoryVersion.objects.filter(user_id=user_id).update(version=F('version') + 1, updated_at=timezone.now())
+
+
+def bump_many(user_ids):
+    """递增多个用户的版本号，单条 UPDATE"""
+    InventoryVersion.objects.filter(user_id__in=set(user_ids)).update(
+        version=F('version') + 1, updated_at=timezone.now()
+    )
+
+
+def bump_all():
+    """递增所有用户的版本号（默认导航修改后），单条 UPDATE"""
+    InventoryVersion.objects.update(version=F('version') + 1, updated_at=timezone.now())
+
+
+def _request_version(request):
+    if not hasattr(request, _REQUEST_ATTR):
+        setattr(request, _REQUEST_ATTR, get_version(request.user.pk))
+    return getattr(request, _REQUEST_ATTR)
+
+
+def _cacheable(request):
+    return request.method in ('GET', 'HEAD') and request.user.is_authenticated
+
+
+def _etag(request, *args, **kwargs):
+    if not _cacheable(request):
+        return None
+    version = _request_version(request)[0]
+    # 页面中的表单带有 CSRF 令牌，令牌更换（如重新登录）后不能再使用旧页面；
+    # 尚无 CSRF Cookie 时 get_token 生成并在响应中下发，首个响应的 ETag 即可在后续请求中匹配
+    get_token(request)
+    token = hashlib.blake2b(request.META['CSRF_COOKIE'].encode(), digest_size=6).hexdigest()
+    return f'inv-{request.user.pk}-{version}-{token}'
+
+
+def _last_modified(request, *args, **kwargs):
+    if not _cacheable(request):
+        return None
+    return _request_version(request)[1]
+
+
+def conditional(view):
+    """只读视图的条件请求装饰器（放在 login_required 之内）
+
+    响应带有 ETag 和 Last-Modified，并要求浏览器每次使用前重新验证；
+    只有成功的响应可被缓存，错误响应和显示了提示消息（base_template.html）的页面不带校验值，
+    否则之后的 304 会让浏览器再次显示已消费的消息。待显示的消息不影响 304，留到下次完整渲染时显示。
+    """
+    conditional_view = condition(etag_func=_etag, last_modified_func=_last_modified)(view)
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = conditional_view(request, *args, **kwargs)
+        storage = get_messages(request)
+        if response.status_code not in (200, 304) or (storage.used and len(storage)):
+            for header in ('ETag', 'Last-Modified'):
+                if response.has_header(header):
+                    del response[header]
+        elif response.has_header('ETag'):
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    return wrapper
@@ -2,16 +2,26 @@
 """物品应用视图"""
 
 from django.shortcuts import render, get_object_or_404, redirect
+from django.template.loader import render_to_string
 from django.urls import reverse_lazy
 from django.contrib.auth.decorators import login_required
 from django.views.generic import CreateView
-from django.http import JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.contrib import messages
-from collections import defaultdict
-import os
+from django.views.static import serve as static_serve
+from django.core.exceptions import SuspiciousFileOperation
+import base64
+import json
+import posixpath
 
-from .models import Item, Category, Navigation
+from .models import Item, Category, Navigation, NameSpelling, Room, clean_room_name, normalize_room, parse_bigint
 from .forms import ItemForm
+from . import (
+    bulk, labels, media, navigation as nav_cache, pinyin, scan, search, sendfile, sheets, stats, thumbnails, uploads,
+    variants, versions,
+)
+from .storage import content_digest, item_image_storage
+from .pagination import paginate_items
 
 
 @login_required
@@ -28,7 +38,110 @@ def deposit_item(request):
             return redirect('items:success')
     else:
         form = ItemForm()
-    return render(request, 'items/deposit_item.html', {'form': form})
+    return render(request, 'items/deposit_item.html', {'form': form, 'upload_config': uploads.client_config()})
+
+
+@login_required
+def bulk_deposit_items(request):
+    """批量存放物品API
+
+    支持两种请求格式：
+    - JSON：{"items": [{"name": ..., "location": ..., "category": 分类ID或名称}, ...]}
+    - multipart：items 字段为上述列表的JSON字符串，第 i 个物品的图片字段名为 image_i
+    全部物品校验通过后才会写入；返回每个物品的处理结果。
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Invalid request method'})
+    
+    try:
+        if request.content_type == 'application/json':
+            rows = json.loads(request.body or b'{}').get('items')
+        else:
+            rows = json.loads(request.POST.get('items', '[]'))
+    except (ValueError, AttributeError):
+        return JsonResponse({'success': False, 'error': '请求数据格式错误'})
+    
+    if not isinstance(rows, list) or not rows:
+        return JsonResponse({'success': False, 'error': '物品列表不能为空'})
+    if len(rows) > bulk.BULK_DEPOSIT_LIMIT:
+        return JsonResponse({'success': False, 'error': f'单次最多存放{bulk.BULK_DEPOSIT_LIMIT}个物品'})
+    
+    files = {}
+    for field, upload in request.FILES.items():
+        if field.startswith('image_') and field[6:].isdigit():
+            files[int(field[6:])] = upload
+    
+    items, errors = bulk.validate_rows(request.user, rows, files)
+    if errors:
+        results = [{'index': error['index'], 'success': False, 'errors': error['errors']} for error in errors]
+        return JsonResponse({'success': False, 'error': '部分物品数据无效，未存放任何物品', 'results': results})
+    
+    items = bulk.create_items(request.user, items)
+    results = [{
+        'index': index,
+        'success': True,
+        'id': item.id,
+        'item_code': item.item_code,
+        'name': item.name,
+        'location': item.location,
+    } for index, item in enumerate(items)]
+    return JsonResponse({'success': True, 'results': results, 'count': len(results)})
+
+
+def _bulk_request_data(request):
+    """解析批量操作的请求参数（JSON 请求体或表单，表单中的 ids 可以重复出现）"""
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError as e:
+            raise ValueError('请求数据格式错误') from e
+        if not isinstance(data, dict):
+            raise ValueError('请求数据格式错误')
+        return data
+    data = request.POST.dict()
+    data['ids'] = request.POST.getlist('ids')
+    return data
+
+
+@login_required
+def bulk_move_items(request):
+    """批量移动物品API：将选中的物品移动到 room_id 指定的位置或名为 location 的房间"""
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Invalid request method'})
+    
+    try:
+        data = _bulk_request_data(request)
+        items = bulk.select_items(request.user, data)
+        target = None
+        if data.get('to_room_id'):
+            target = Room.objects.filter(id=parse_bigint(data['to_room_id'], '目标位置不存在'), user=request.user).first()
+            if target is None:
+                raise ValueError('目标位置不存在')
+        location = data.get('location', '')
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)})
+    
+    # 物品的 location 是所在房间（而非容器）的名称，返回实际写入的值
+    location, target = bulk.resolve_destination(request.user, location, target)
+    count = bulk.move_items(request.user, items, location=location, room=target)
+    return JsonResponse({
+        'success': True, 'count': count, 'location': location, 'room_id': target.pk if target else None,
+    })
+
+
+@login_required
+def bulk_delete_items(request):
+    """批量删除物品API：单条 DELETE，图片文件在后台删除"""
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Invalid request method'})
+    
+    try:
+        items = bulk.select_items(request.user, _bulk_request_data(request))
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)})
+    
+    count = bulk.delete_items(request.user, items)
+    return JsonResponse({'success': True, 'count': count})
 
 
 class ItemCreateView(CreateView):
@@ -38,6 +151,12 @@ class ItemCreateView(CreateView):
     template_name = 'items/deposit_item.html'  # 使用现有的deposit_item.html模板，避免创建新文件
     success_url = reverse_lazy('items:success')
 
+    def get_context_data(self, **kwargs):
+        """页面中下发浏览器端图片压缩参数"""
+        context = super().get_context_data(**kwargs)
+        context['upload_config'] = uploads.client_config()
+        return context
+
     def form_valid(self, form):
         """验证表单并保存物品"""
         item = form.save(commit=False)
@@ -54,27 +173,136 @@ def success(request):
     return render(request, 'items/success.html')
 
 
+def _user_item_by_code(user, item_code):
+    """按物品编号查找用户的物品（物品编号唯一索引），编号无效或不存在时返回 None"""
+    try:
+        item_code = parse_bigint(item_code)
+    except ValueError:
+        return None
+    return Item.objects.filter(item_code=item_code, user=user).only('id', 'item_code', 'name').first()
+
+
 @login_required
 def tag_view(request):
-    """标签视图"""
-    # 这里可以添加标签相关的功能
-    return render(request, 'items/tag_view.html')
+    """标签视图，?item_code= 指定物品时显示服务端渲染的二维码标签"""
+    context = {}
+    item = _user_item_by_code(request.user, request.GET.get('item_code'))
+    if item is not None:
+        context = {
+            'item_code': item.item_code,
+            'name': item.name,
+            'tag_url': labels.label_url(item.item_code, 'svg'),
+        }
+    return render(request, 'items/tag_view.html', context)
+
+
+@login_required
+def print_selector(request):
+    """选择打印类型：单个物品标签或按房间、分类、编号范围批量打印"""
+    return render(request, 'items/print_selector.html', {
+        'rooms': sorted(stats.get_user_stats(request.user)['room_labels'].values()),
+        'categories': Category.objects.filter(user=request.user).order_by('name'),
+        'layouts': sheets.SHEET_LAYOUTS,
+        'default_layout': sheets.DEFAULT_LAYOUT,
+    })
+
 
+@login_required
+def label_sheet(request):
+    """批量打印标签API：?format=pdf|svg&layout=标签纸规格，物品范围参数同批量操作（见 bulk.select_items）
 
-def generate_recommendations(user, limit=5):
-    """生成推荐的房间和分类"""
-    from collections import Counter
+    标签页逐页生成并以流式响应发送，打印上千个标签也不会占用大量内存。
+    """
+    fmt = request.GET.get('format', 'pdf')
+    layout = request.GET.get('layout', sheets.DEFAULT_LAYOUT)
+    if fmt not in sheets.SHEET_FORMATS or layout not in sheets.SHEET_LAYOUTS:
+        return JsonResponse({'success': False, 'error': '不支持的格式或标签纸规格'}, status=400)
     
-    # 获取用户的物品
-    items = Item.objects.filter(user=user)
+    data = request.GET.dict()
+    data['ids'] = request.GET.getlist('ids')
+    try:
+        items = bulk.select_items(request.user, data)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    count = items.count()
+    if not count:
+        return JsonResponse({'success': False, 'error': '没有符合条件的物品'}, status=400)
+    if count > sheets.LABEL_SHEET_LIMIT:
+        return JsonResponse({'success': False, 'error': f'单次最多打印{sheets.LABEL_SHEET_LIMIT}个标签'}, status=400)
+    
+    response = StreamingHttpResponse(sheets.stream_sheet(items, layout, fmt), content_type=sheets.SHEET_FORMATS[fmt])
+    if fmt == 'pdf':
+        response['Content-Disposition'] = 'inline; filename="labels.pdf"'
+    return response
+
+
+@login_required
+def generate_tag(request):
+    """生成物品标签API：item_code=物品编号
+
+    返回物品名称、编号、PNG 标签（base64）以及可长期缓存的 PNG/SVG 标签URL。
+    """
+    item = _user_item_by_code(request.user, request.POST.get('item_code') or request.GET.get('item_code'))
+    if item is None:
+        return JsonResponse({'success': False, 'error': '物品不存在'})
+    return JsonResponse({
+        'success': True,
+        'name': item.name,
+        'item_code': item.item_code,
+        'qr_code': base64.b64encode(labels.get_label(item.item_code, 'png')).decode(),
+        'png_url': labels.label_url(item.item_code, 'png'),
+        'svg_url': labels.label_url(item.item_code, 'svg'),
+    })
+
+
+@login_required
+def tag_image(request, item_code, fmt):
+    """物品标签图片（png 或 svg）
+
+    渲染结果按编号和模板版本缓存；URL 带当前模板版本（?v=）时内容永不变化，浏览器可长期缓存。
+    """
+    if fmt not in labels.LABEL_FORMATS:
+        return JsonResponse({'success': False, 'error': '不支持的标签格式'}, status=404)
+    if _user_item_by_code(request.user, item_code) is None:
+        return JsonResponse({'success': False, 'error': '物品不存在'}, status=404)
+    
+    etag = f'"label-v{labels.LABEL_TEMPLATE_VERSION}-{item_code}-{fmt}"'
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponse(status=304)
+    else:
+        response = HttpResponse(labels.get_label(item_code, fmt), content_type=labels.LABEL_FORMATS[fmt])
+    response['ETag'] = etag
+    if request.GET.get('v') == str(labels.LABEL_TEMPLATE_VERSION):
+        response['Cache-Control'] = 'private, max-age=31536000, immutable'
+    else:
+        response['Cache-Control'] = 'private, max-age=86400'
+    return response
+
+
+def generate_recommendations(user, limit=5, user_stats=None, categories=None):
+    """生成推荐的房间和分类
+
+    直接使用统计汇总表中的房间/分类物品数，查询次数与物品数量无关；
+    调用方已读取统计数据和分类列表时可传入复用，不再产生额外查询。
+    """
+    if user_stats is None:
+        user_stats = stats.get_user_stats(user)
     
-    # 生成推荐房间
-    room_counter = Counter(item.location for item in items if item.location)
-    recommended_rooms = [room for room, count in room_counter.most_common(limit)]
+    # 生成推荐房间：按物品数倒序
+    room_counts = sorted(user_stats['rooms'].items(), key=lambda pair: (-pair[1], pair[0]))
+    recommended_rooms = [user_stats['room_labels'][room_key] for room_key, count in room_counts[:limit]]
     
-    # 生成推荐分类
-    category_counter = Counter(item.category.name for item in items if item.category)
-    recommended_categories = [category for category, count in category_counter.most_common(limit)]
+    # 生成推荐分类：按物品数倒序，跳过未分类
+    category_counts = sorted(
+        ((category_id, count) for category_id, count in user_stats['categories'].items() if category_id is not None),
+        key=lambda pair: (-pair[1], pair[0])
+    )[:limit]
+    if categories is None:
+        categories = Category.objects.filter(user=user, id__in=[category_id for category_id, count in category_counts])
+    category_names = {category.id: category.name for category in categories}
+    recommended_categories = [
+        category_names[category_id] for category_id, count in category_counts if category_id in category_names
+    ]
     
     return {
         'rooms': recommended_rooms,
@@ -82,98 +310,117 @@ def generate_recommendations(user, limit=5):
     }
 
 
-@login_required
-def find_items(request):
-    """查找物品页面视图"""
-    # 处理筛选条件
-    filter_type = request.GET.get('filter', 'room')
-    # 获取分类筛选参数
-    category_filter = request.GET.get('category', None)
-    
+# 查找物品页面每页显示的物品数
+FIND_ITEMS_PAGE_SIZE = 60
+
+# 搜索结果最多返回的物品数
+SEARCH_RESULT_LIMIT = 200
+
+
+def find_category_id(user, name):
+    """按名称查找用户的分类ID
+
+    先通过 (user, name) 唯一索引取得分类ID，再按 category_id 等值筛选物品，
+    使物品查询走 (user, category) 复合索引，而不是关联查询后按用户扫描。
+    """
+    return Category.objects.filter(user=user, name=name).values_list('id', flat=True).first()
+
+
+def filter_find_items(user, filter_type, category_filter):
+    """根据查找页面的筛选条件构建物品查询"""
     # 获取用户的物品
-    items = Item.objects.filter(user=request.user).select_related('category')
+    items = Item.objects.filter(user=user).select_related('category')
     
     # 应用分类筛选
     if category_filter:
         if filter_type == 'room':
-            # 按房间筛选
-            items = items.filter(location=category_filter)
+            # 按房间筛选（规范化键匹配，忽略大小写和首尾空白）
+            items = items.filter(room_key=normalize_room(category_filter))
         else:
             # 按分类筛选
             if category_filter == '未分类':
                 items = items.filter(category__isnull=True)
             else:
-                items = items.filter(category__name=category_filter)
+                category_id = find_category_id(user, category_filter)
+                items = items.filter(category_id=category_id) if category_id else items.none()
+    return items
+
+
+def group_items(items, filter_type, user_stats):
+    """将一页物品按房间或分类分组
+
+    分组内的物品数量取自统计汇总表（而不是当前页的物品数），
+    返回 [{'name': 分组名, 'items': [...], 'count': 总数}, ...]，按首次出现顺序排列。
+    """
+    groups = {}
+    for item in items:
+        if filter_type == 'category':
+            # 按分类分组
+            name = item.category.name if item.category else "未分类"
+            count = user_stats['categories'].get(item.category_id, 0)
+        else:
+            # 按房间分组（同一规范化键的房间归为一组）
+            if item.room_key:
+                name = user_stats['room_labels'].get(item.room_key) or clean_room_name(item.location)
+                count = user_stats['rooms'].get(item.room_key, 0)
+            else:
+                name = "未指定"
+                count = user_stats['total'] - sum(user_stats['rooms'].values())
+        group = groups.setdefault(name, {'name': name, 'items': [], 'count': count})
+        group['items'].append(item)
+    return list(groups.values())
+
+
+@login_required
+@versions.conditional
+def find_items(request):
+    """查找物品页面视图
+
+    首屏只渲染第一页物品，后续页面由 find_items_page 按游标返回片段，滚动时加载。
+    """
+    # 处理筛选条件
+    filter_type = request.GET.get('filter', 'room')
+    # 获取分类筛选参数
+    category_filter = request.GET.get('category', None)
+    # 获取搜索关键词
+    search_query = request.GET.get('q', '').strip()
     
-    # 按房间或分类分组
-    grouped_items = defaultdict(list)
-    
-    if filter_type == 'category':
-        # 按分类分组
-        for item in items:
-            category = item.category.name if item.category else "未分类"
-            grouped_items[category].append(item)
-    elif filter_type == 'room':
-        # 按房间分组
-        for item in items:
-            room = item.location or "未指定"
-            grouped_items[room].append(item)
-    
-    # 转换为普通字典，确保模板能够正确判断是否为空
-    grouped_items = dict(grouped_items)
-    
-    # 统计数据
-    total_items = items.count()
-    categories = Category.objects.filter(user=request.user)
-    category_count = categories.count()
-    
-    # 统计房间数 - 直接从所有物品中获取唯一房间列表
-    # 先获取所有物品的房间名称，然后进行彻底的清理和去重
-    all_rooms = Item.objects.filter(user=request.user).values_list('location', flat=True).exclude(location__isnull=True).exclude(location='')
-    
-    # 彻底清理和去重：
-    # 1. 去除首尾空格
-    # 2. 去除所有不可见字符
-    # 3. 考虑大小写不敏感进行去重，但保留原始大小写
-    cleaned_rooms_dict = {}
-    for room in all_rooms:
-        # 去除首尾空格
-        cleaned_room = room.strip()
-        # 去除所有不可见字符
-        cleaned_room = cleaned_room.replace('\n', '').replace('\t', '').replace('\r', '')
-        # 只处理非空值
-        if cleaned_room:
-            # 使用小写作为键进行去重，但保留原始值
-            cleaned_rooms_dict[cleaned_room.lower()] = cleaned_room
-    
-    # 转换为列表并排序
-    rooms = sorted(list(cleaned_rooms_dict.values()))
-    room_count = len(rooms)
+    if search_query:
+        # 搜索结果按相关度排列，不分页
+        items = search.search_items(request.user, search_query, limit=SEARCH_RESULT_LIMIT)
+        next_cursor = None
+    else:
+        # 获取第一页物品
+        items, next_cursor = paginate_items(
+            filter_find_items(request.user, filter_type, category_filter), page_size=FIND_ITEMS_PAGE_SIZE
+        )
     
-    # 生成推荐数据
-    recommendations = generate_recommendations(request.user)
+    # 统计数据 - 从统计汇总表读取，不再扫描全部物品
+    user_stats = stats.get_user_stats(request.user)
+    categories = list(Category.objects.filter(user=request.user))
+    category_count = len(categories)
+    if search_query:
+        total_items = len(items)
+    else:
+        total_items = stats.count_filtered_items(user_stats, filter_type, category_filter, categories)
     
-    # 获取导航数据
-    main_navs = Navigation.objects.filter(user=request.user, type='main').order_by('order')
+    # 按房间或分类分组
+    grouped_items = group_items(items, filter_type, user_stats)
     
-    # 获取当前活动的主导航
-    active_main = None
-    for nav in main_navs:
-        if request.path == nav.url:
-            active_main = nav
-            break
+    # 统计房间数 - 统计表按房间规范化键汇总，已完成清理和去重
+    rooms = sorted(user_stats['room_labels'].values())
+    room_count = len(rooms)
     
-    # 获取当前主导航的子标签
-    sub_navs = []
-    if active_main:
-        sub_navs = active_main.children.filter(user=request.user).order_by('order')
+    # 生成推荐数据
+    recommendations = generate_recommendations(request.user, user_stats=user_stats, categories=categories)
     
-    # 获取当前活动的子标签
-    active_sub_tag = request.GET.get('sub_tag', '')
+    # 导航数据（main_navs、sub_navs、active_sub_tag）由 context_processors.navigation 提供
     
     return render(request, 'items/find_items_base.html', {
         'grouped_items': grouped_items,
         'items': items,
+        'next_cursor': next_cursor,
+        'search_query': search_query,
         'total_items': total_items,
         'categories': categories,
         'category_count': category_count,
@@ -183,13 +430,70 @@ def find_items(request):
         'recommended_rooms': recommendations['rooms'],
         'recommended_categories': recommendations['categories'],
         'all_categories': categories,
-        'all_rooms': rooms,
-        'main_navs': main_navs,
-        'sub_navs': sub_navs,
-        'active_sub_tag': active_sub_tag
+        'all_rooms': rooms
     })
 
 
+@login_required
+def find_items_page(request):
+    """查找物品分页API：按游标返回下一页物品卡片的HTML片段"""
+    filter_type = request.GET.get('filter', 'room')
+    category_filter = request.GET.get('category', None)
+    cursor = request.GET.get('cursor', '')
+    
+    try:
+        items, next_cursor = paginate_items(
+            filter_find_items(request.user, filter_type, category_filter), cursor, FIND_ITEMS_PAGE_SIZE
+        )
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)})
+    
+    grouped_items = group_items(items, filter_type, stats.get_user_stats(request.user))
+    html = render_to_string('items/_item_groups.html', {'grouped_items': grouped_items}, request=request)
+    return JsonResponse({'success': True, 'html': html, 'next_cursor': next_cursor, 'count': len(items)})
+
+
+@login_required
+def search_items(request):
+    """物品搜索API：按名称、位置、分类和编号全文搜索"""
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return JsonResponse({'success': False, 'error': '搜索关键词不能为空'})
+    
+    try:
+        limit = max(1, min(int(request.GET.get('limit', 20)), SEARCH_RESULT_LIMIT))
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'limit参数无效'})
+    
+    items = search.search_items(request.user, query, limit=limit)
+    item_list = [{
+        'id': item.id,
+        'name': item.name,
+        'location': item.location,
+        'category': item.category.name if item.category else '未分类',
+        'item_code': item.item_code,
+    } for item in items]
+    return JsonResponse({'success': True, 'data': item_list, 'query': query, 'count': len(item_list)})
+
+
+@login_required
+def suggest_names(request):
+    """房间/分类名称联想API：支持名称前缀、全拼前缀和首字母前缀"""
+    query = request.GET.get('q', '').strip()
+    kind = request.GET.get('type', NameSpelling.KIND_ROOM)
+    if kind not in (NameSpelling.KIND_ROOM, NameSpelling.KIND_CATEGORY):
+        return JsonResponse({'success': False, 'error': 'type参数无效'})
+    
+    # 只联想当前仍在使用的名称
+    if kind == NameSpelling.KIND_ROOM:
+        live_names = set(stats.get_user_stats(request.user)['room_labels'].values())
+    else:
+        live_names = set(Category.objects.filter(user=request.user).values_list('name', flat=True))
+    
+    names = pinyin.suggest(request.user, kind, query, live_names)
+    return JsonResponse({'success': True, 'data': names, 'query': query, 'type': kind})
+
+
 @login_required
 def add_category(request):
     """添加新分类API"""
@@ -206,15 +510,71 @@ def add_category(request):
 
 @login_required
 def add_room(request):
-    """添加新房间API"""
+    """添加新房间API，指定 parent_id 时在该位置下添加子容器"""
     if request.method == 'POST':
-        name = request.POST.get('name')
+        name = clean_room_name(request.POST.get('name'))
         if name:
-            # 房间直接存储在物品的location字段中，不需要单独的模型
-            return JsonResponse({'success': True, 'room': name})
+            parent = None
+            parent_id = request.POST.get('parent_id')
+            if parent_id:
+                try:
+                    parent_id = parse_bigint(parent_id, '上级位置参数无效')
+                except ValueError as e:
+                    return JsonResponse({'success': False, 'error': str(e)})
+                parent = Room.objects.filter(id=parent_id, user=request.user).first()
+                if parent is None:
+                    return JsonResponse({'success': False, 'error': '上级位置不存在'})
+            room = Room.ensure_child(request.user.pk, parent, name)
+            return JsonResponse({'success': True, 'room': name, 'room_id': room.id, 'path': room.path})
     return JsonResponse({'success': False, 'error': 'Invalid request'})
 
 
+@login_required
+def room_tree(request):
+    """位置树API：单次查询返回用户的全部房间及子容器"""
+    nodes = {}
+    roots = []
+    # 按路径排序时父节点总在子节点之前
+    for room in Room.objects.filter(user=request.user).order_by('path'):
+        node = {'id': room.id, 'name': room.name, 'depth': room.depth, 'children': []}
+        nodes[room.id] = node
+        if room.parent_id in nodes:
+            nodes[room.parent_id]['children'].append(node)
+        else:
+            roots.append(node)
+    return JsonResponse({'success': True, 'data': roots})
+
+
+@login_required
+def room_items(request, room_id):
+    """位置物品API：返回存放在该位置及其全部子容器中的物品（游标分页）"""
+    room = get_object_or_404(Room, id=room_id, user=request.user)
+    try:
+        items, next_cursor = paginate_items(
+            room.items_within().select_related('category', 'room'), request.GET.get('cursor', ''), FIND_ITEMS_PAGE_SIZE
+        )
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)})
+    
+    item_list = [{
+        'id': item.id,
+        'name': item.name,
+        'location': item.location,
+        'container': item.room.name if item.room else '',
+        'category': item.category.name if item.category else '未分类',
+        'item_code': item.item_code,
+        'image': item.image.url if item.image else None,
+        'thumbnails': item.thumbnails
+    } for item in items]
+    return JsonResponse({
+        'success': True,
+        'data': item_list,
+        'room': room.full_name(),
+        'next_cursor': next_cursor,
+        'count': len(item_list)
+    })
+
+
 @login_required
 def test_find_items(request):
     """测试查找物品功能"""
@@ -223,6 +583,7 @@ def test_find_items(request):
 
 
 @login_required
+@versions.conditional
 def item_detail(request, item_id):
     """物品详情页视图，支持返回模态框片段"""
     item = get_object_or_404(Item, id=item_id, user=request.user)
@@ -233,12 +594,12 @@ def item_detail(request, item_id):
         item.name = request.POST.get('name', item.name)
         item.location = request.POST.get('location', item.location)
         
-        # 处理图片上传
+        # 处理图片上传（缩小并去除元数据；旧图片的引用在保存后释放）
         if 'image' in request.FILES:
-            # 删除旧图片
-            if item.image and os.path.exists(item.image.path):
-                os.remove(item.image.path)
-            item.image = request.FILES['image']
+            try:
+                item.image = uploads.process_image(request.FILES['image'])
+            except ValueError as e:
+                return JsonResponse({'success': False, 'error': str(e)})
         
         item.save()
         return JsonResponse({'success': True, 'item': {'id': item.id, 'name': item.name, 'location': item.location}})
@@ -250,13 +611,167 @@ def item_detail(request, item_id):
         return render(request, 'items/item_detail.html', {'item': item})
 
 
+@login_required
+def item_image(request, item_id):
+    """物品图片按需缩放API：?w=宽&h=高&format=webp|jpeg[&v=内容版本]
+
+    变体渲染一次后写入磁盘缓存；ETag 由原图内容哈希和参数组成，
+    浏览器带 If-None-Match 再次请求时直接返回 304。
+    """
+    item = get_object_or_404(Item, id=item_id, user=request.user)
+    if not item.image:
+        return JsonResponse({'success': False, 'error': '物品没有图片'}, status=404)
+    
+    try:
+        width, height, fmt = variants.parse_params(
+            request.GET.get('w'), request.GET.get('h'), request.GET.get('format'),
+            request.headers.get('Accept', '')
+        )
+        path, digest = variants.get_variant(item.image.name, width, height, fmt)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    except FileNotFoundError:
+        return JsonResponse({'success': False, 'error': '图片文件不存在'}, status=404)
+    
+    etag = f'"{digest[:32]}-{width}x{height}-{fmt}"'
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponse(status=304)
+    else:
+        response = sendfile.send_file(request, path, content_type=f'image/{fmt}')
+    response['ETag'] = etag
+    if request.GET.get('v') == digest[:variants.VERSION_LENGTH]:
+        # URL 带有原图内容版本（见 variants.variant_url），内容永不变化
+        response['Cache-Control'] = 'private, max-age=31536000, immutable'
+    else:
+        # 原图更换后同一URL的内容会变化，过期后凭 ETag 重新验证
+        response['Cache-Control'] = 'private, max-age=86400'
+    if not request.GET.get('format'):
+        response['Vary'] = 'Accept'
+    return response
+
+
+@login_required
+def protected_media(request, name):
+    """物品图片及缩略图文件
+
+    只允许访问自己物品的图片（缩略图按其原图判断），校验通过后由 sendfile 交给前端 Web 服务器发送。
+    """
+    name = posixpath.normpath(name)
+    if not name.startswith(media.IMAGE_DIR + '/'):
+        raise Http404
+    original = thumbnails.original_name(name) or name
+    if not Item.objects.filter(image=original, user=request.user).exists():
+        raise Http404
+    
+    try:
+        response = sendfile.send_file(request, item_image_storage().path(name))
+    except (FileNotFoundError, SuspiciousFileOperation) as e:
+        raise Http404 from e
+    if content_digest(original):
+        # 按内容命名的文件内容永不变化
+        response['Cache-Control'] = 'private, max-age=31536000, immutable'
+    else:
+        response['Cache-Control'] = 'private, max-age=86400'
+    return response
+
+
+def debug_media(request, path, document_root=None, show_indexes=False):
+    """开发环境（DEBUG）下 MEDIA_URL 的静态文件服务，物品图片只能经 protected_media 访问"""
+    if posixpath.normpath(path).lstrip('/').split('/')[0] == media.IMAGE_DIR:
+        raise Http404
+    return static_serve(request, path, document_root=document_root, show_indexes=show_indexes)
+
+
+def _scan_codes(request):
+    """解析扫码查询的编号：JSON 请求体 {"codes": [...]}，或查询参数/表单中可重复的 code"""
+    if request.method == 'POST' and request.content_type == 'application/json':
+        codes = _bulk_request_data(request).get('codes')
+        if not isinstance(codes, list):
+            raise ValueError('codes参数无效')
+    else:
+        codes = request.GET.getlist('code') or request.POST.getlist('code')
+    if not codes:
+        raise ValueError('请指定物品编号')
+    if len(codes) > scan.SCAN_BATCH_LIMIT:
+        raise ValueError(f'单次最多查询{scan.SCAN_BATCH_LIMIT}个编号')
+    parsed = []
+    for code in codes:
+        category, item_code = scan.parse_code(code)
+        if category != scan.CATEGORY_ITEM:
+            raise ValueError('只能查询物品二维码')
+        parsed.append(item_code)
+    return parsed
+
+
+@login_required
+def scan_lookup(request):
+    """扫码查询物品API：按物品编号（或标签二维码内容）查询，支持一次查询多个
+
+    返回 items（按查询顺序）和未找到的编号 missing。
+    """
+    try:
+        codes = _scan_codes(request)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    items, missing = scan.lookup(request.user, codes)
+    return JsonResponse({'success': True, 'items': list(items.values()), 'missing': missing})
+
+
+@login_required
+def associate_item_storage(request):
+    """关联物品和储物格：依次扫描物品二维码，再扫描储物格（位置）二维码，将扫描过的物品放入该位置
+
+    储物格二维码的编号为位置（Room）ID。已扫描的物品记录在会话中。
+    """
+    if request.method != 'POST':
+        return render(request, 'items/associate_item_storage.html')
+    
+    try:
+        data = _bulk_request_data(request)
+        category, code = scan.parse_code(data.get('qr_data', ''))
+    except ValueError as e:
+        return JsonResponse({'success': False, 'message': str(e)})
+    pending = request.session.get(scan.PENDING_SESSION_KEY, [])
+    
+    if category == scan.CATEGORY_ITEM:
+        items, _ = scan.lookup(request.user, [code])
+        if not items:
+            return JsonResponse({'success': False, 'message': f'未找到物品 #{code}'})
+        item = items[code]
+        if item['id'] not in pending:
+            if len(pending) >= scan.PENDING_LIMIT:
+                return JsonResponse({'success': False, 'message': f'最多同时关联{scan.PENDING_LIMIT}个物品'})
+            pending.append(item['id'])
+            request.session[scan.PENDING_SESSION_KEY] = pending
+        return JsonResponse({
+            'success': True, 'complete': False, 'item': item,
+            'message': f'已扫描物品：{item["name"]}（共{len(pending)}个），请扫描储物格',
+        })
+    
+    room = Room.objects.filter(id=code, user=request.user).first()
+    if room is None:
+        return JsonResponse({'success': False, 'message': '未找到储物格'})
+    if not pending:
+        return JsonResponse({'success': False, 'message': '请先扫描物品'})
+    moved = bulk.move_items(request.user, Item.objects.filter(user=request.user, id__in=pending), room=room)
+    request.session.pop(scan.PENDING_SESSION_KEY, None)
+    return JsonResponse({'success': True, 'complete': True, 'message': f'已将{moved}个物品放入{room.full_name()}'})
+
+
+@login_required
+def clear_association(request):
+    """清除已扫描、尚未放入储物格的物品"""
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Invalid request method'})
+    request.session.pop(scan.PENDING_SESSION_KEY, None)
+    return JsonResponse({'success': True})
+
+
 @login_required
 def delete_item(request, item_id):
     """删除物品API"""
     item = get_object_or_404(Item, id=item_id, user=request.user)
-    # 删除物品图片（如果存在）
-    if item.image and os.path.exists(item.image.path):
-        os.remove(item.image.path)
+    # 物品图片由删除队列在后台删除（见 signals.py）
     item.delete()
     return JsonResponse({'success': True})
 
@@ -266,16 +781,58 @@ def update_item_location(request, item_id):
     """更新物品位置API"""
     item = get_object_or_404(Item, id=item_id, user=request.user)
     if request.method == 'POST':
-        new_location = request.POST.get('location', '')
-        item.location = new_location
+        room_id = request.POST.get('room_id')
+        if room_id:
+            # 放到具体的容器中，location 随之更新为所在房间
+            try:
+                room_id = parse_bigint(room_id, '位置不存在')
+            except ValueError as e:
+                return JsonResponse({'success': False, 'error': str(e)})
+            room = Room.objects.filter(id=room_id, user=request.user).first()
+            if room is None:
+                return JsonResponse({'success': False, 'error': '位置不存在'})
+            item.place_in(room)
+        else:
+            item.location = request.POST.get('location', '')
         item.save()
-        return JsonResponse({'success': True, 'location': new_location})
+        return JsonResponse({'success': True, 'location': item.location, 'room_id': item.room_id})
     return JsonResponse({'success': False, 'error': 'Invalid request method'})
 
 
+# get_items_by_category 可返回的字段：字段名 -> 需要从数据库读取的模型字段（id 始终返回）
+ITEM_API_FIELDS = {
+    'name': ('name',),
+    'location': ('location',),
+    'category': ('category', 'category__name'),
+    'item_code': ('item_code',),
+    'image': ('image',),
+    'thumbnails': ('image', 'has_thumbnails'),
+}
+
+# get_items_by_category 每页最大物品数
+ITEM_API_MAX_PAGE_SIZE = 200
+
+
+def _item_api_value(item, field):
+    """物品在 API 中的字段值"""
+    if field == 'category':
+        return item.category.name if item.category_id else '未分类'
+    if field == 'image':
+        return item.image.url if item.image else None
+    if field == 'thumbnails':
+        return item.thumbnails
+    return getattr(item, field)
+
+
 @login_required
+@versions.conditional
 def get_items_by_category(request):
-    """根据分类获取物品API"""
+    """根据分类获取物品API（游标分页）
+
+    参数：category、filter_type（room 或 category）、cursor、limit（每页数量），
+    fields（逗号分隔的返回字段，默认全部，见 ITEM_API_FIELDS）。
+    count 为符合条件的物品总数，来自统计表，不随分页变化。
+    """
     # 获取分类参数
     category = request.GET.get('category', '')
     # 获取过滤类型
@@ -284,36 +841,39 @@ def get_items_by_category(request):
     # 参数校验
     if not category:
         return JsonResponse({'success': False, 'error': '分类参数不能为空'})
+    fields = [field for field in request.GET.get('fields', '').split(',') if field] or list(ITEM_API_FIELDS)
+    unknown = [field for field in fields if field not in ITEM_API_FIELDS]
+    if unknown:
+        return JsonResponse({'success': False, 'error': f'不支持的字段：{",".join(unknown)}'}, status=400)
+    try:
+        page_size = min(int(request.GET.get('limit') or FIND_ITEMS_PAGE_SIZE), ITEM_API_MAX_PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'limit参数无效'}, status=400)
+    if page_size < 1:
+        return JsonResponse({'success': False, 'error': 'limit参数无效'}, status=400)
     
+    # 只读取请求的字段（以及分页所需的排序键），不需要分类名称时不关联分类表
+    columns = {'id', 'storage_time'}
+    for field in fields:
+        columns.update(ITEM_API_FIELDS[field])
+    items = filter_find_items(request.user, filter_type, category)
+    if 'category' not in fields:
+        items = items.select_related(None)
     try:
-        # 根据过滤类型和分类参数查询数据
-        if filter_type == 'room':
-            # 按房间查询
-            items = Item.objects.filter(user=request.user, location=category).select_related('category')
-        else:
-            # 按分类查询
-            items = Item.objects.filter(user=request.user, category__name=category).select_related('category')
-        
-        # 构建返回数据
-        item_list = []
-        for item in items:
-            item_list.append({
-                'id': item.id,
-                'name': item.name,
-                'location': item.location,
-                'category': item.category.name if item.category else '未分类',
-                'item_code': item.item_code,
-                'image': item.image.url if item.image else None
-            })
-        
-        return JsonResponse({
-            'success': True,
-            'data': item_list,
-            'category': category,
-            'count': len(item_list)
-        })
-    except Exception as e:
+        page, next_cursor = paginate_items(items.only(*columns), request.GET.get('cursor', ''), page_size)
+    except ValueError as e:
         return JsonResponse({'success': False, 'error': str(e)})
+    
+    # 总数从统计表读取，无需对全部物品计数
+    categories = [] if filter_type == 'room' else Category.objects.filter(user=request.user, name=category).only('id', 'name')
+    total = stats.count_filtered_items(stats.get_user_stats(request.user), filter_type, category, categories)
+    return JsonResponse({
+        'success': True,
+        'data': [{'id': item.id, **{field: _item_api_value(item, field) for field in fields}} for item in page],
+        'category': category,
+        'count': total,
+        'next_cursor': next_cursor,
+    })
 
 
 @login_required
@@ -334,6 +894,9 @@ def manage_navigation(request):
                 return JsonResponse({'success': False, 'error': '缺少必填字段'})
             
             try:
+                # 父级导航可以是默认导航或用户自己的导航项
+                if parent_id:
+                    nav_cache.get_visible(request.user.pk, parent_id)
                 # 创建导航项
                 nav = Navigation(
                     user=request.user,
@@ -350,6 +913,8 @@ def manage_navigation(request):
                     'url': nav.url,
                     'icon': nav.icon
                 }})
+            except Navigation.DoesNotExist:
+                return JsonResponse({'success': False, 'error': '父级导航不存在'})
             except Exception as e:
                 return JsonResponse({'success': False, 'error': str(e)})
         
@@ -365,12 +930,9 @@ def manage_navigation(request):
                 return JsonResponse({'success': False, 'error': '缺少必填字段'})
             
             try:
-                # 更新导航项
-                nav = Navigation.objects.get(id=nav_id, user=request.user)
-                nav.name = name
-                nav.url = url
-                nav.icon = icon
-                nav.save()
+                # 更新导航项（修改默认导航时只为当前用户记录替换项）
+                nav = nav_cache.get_visible(request.user.pk, nav_id)
+                nav = nav_cache.update_nav(nav, request.user.pk, name=name, url=url, icon=icon)
                 return JsonResponse({'success': True, 'nav': {
                     'id': nav.id,
                     'name': nav.name,
@@ -390,8 +952,9 @@ def manage_navigation(request):
                 return JsonResponse({'success': False, 'error': '缺少导航项ID'})
             
             try:
-                nav = Navigation.objects.get(id=nav_id, user=request.user)
-                nav.delete()
+                # 删除导航项（默认导航只对当前用户隐藏）
+                nav = nav_cache.get_visible(request.user.pk, nav_id)
+                nav_cache.delete_nav(nav, request.user.pk)
                 return JsonResponse({'success': True})
             except Navigation.DoesNotExist:
                 return JsonResponse({'success': False, 'error': '导航项不存在'})
@@ -404,12 +967,6 @@ def manage_navigation(request):
 @login_required
 def manage_categories(request):
     """管理分类和房间视图"""
-    # 获取用户的所有分类
-    categories = Category.objects.filter(user=request.user)
-    
-    # 获取用户的所有房间，去除空值并去重
-    rooms = list(set(Item.objects.filter(user=request.user).values_list('location', flat=True).exclude(location__isnull=True).exclude(location='')))
-    
     # 处理POST请求
     if request.method == 'POST':
         # 处理分类删除
@@ -423,14 +980,22 @@ def manage_categories(request):
             room_name = request.POST.get('room_name')
             if room_name:
                 # 将使用该房间的物品的location设为''
-                Item.objects.filter(user=request.user, location=room_name).update(location='')
+                room_key = normalize_room(room_name)
+                room_items = Item.objects.filter(user=request.user, room_key=room_key)
+                item_ids = list(room_items.values_list('id', flat=True))
+                updated = room_items.update(location='', room_key='', room=None)
+                stats.move_room(request.user.pk, room_key, '', updated)
+                Room.objects.filter(user=request.user, parent=None, key=room_key).delete()
+                search.reindex_item_ids(item_ids)
         
         # 处理分类更新
         elif 'update_category' in request.POST:
             category_id = request.POST.get('category_id')
             new_name = request.POST.get('new_name')
             if category_id and new_name:
-                Category.objects.filter(id=category_id, user=request.user).update(name=new_name)
+                if Category.objects.filter(id=category_id, user=request.user).update(name=new_name):
+                    pinyin.register_name(request.user.pk, NameSpelling.KIND_CATEGORY, new_name)
+                    search.reindex_queryset(Item.objects.filter(user=request.user, category_id=category_id))
         
         # 处理房间更新
         elif 'update_room' in request.POST:
@@ -438,51 +1003,49 @@ def manage_categories(request):
             new_name = request.POST.get('new_name')
             if old_name and new_name:
                 # 更新使用该房间的物品的location
-                Item.objects.filter(user=request.user, location=old_name).update(location=new_name)
+                room_key = normalize_room(old_name)
+                room_items = Item.objects.filter(user=request.user, room_key=room_key)
+                item_ids = list(room_items.values_list('id', flat=True))
+                updated = room_items.update(location=new_name, room_key=normalize_room(new_name))
+                stats.move_room(request.user.pk, room_key, new_name, updated)
+                Room.rename_root(request.user.pk, room_key, new_name)
+                pinyin.register_name(request.user.pk, NameSpelling.KIND_ROOM, new_name)
+                search.reindex_item_ids(item_ids)
+        
+        # 物品的位置、分类以整体 UPDATE 修改，不经过信号
+        versions.bump(request.user.pk)
         
         # 重定向回管理分类页面
         return redirect('items:manage_categories')
     
-    # 获取导航数据
-    main_navs = Navigation.objects.filter(user=request.user, type='main').order_by('order')
-    
-    # 获取当前活动的主导航
-    active_main = None
-    for nav in main_navs:
-        if request.path == nav.url:
-            active_main = nav
-            break
+    # 获取用户的所有分类
+    categories = list(Category.objects.filter(user=request.user))
     
-    # 获取当前主导航的子标签
-    sub_navs = []
-    if active_main:
-        sub_navs = active_main.children.filter(user=request.user).order_by('order')
+    # 从统计汇总表获取用户的所有房间（按规范化键去重）
+    user_stats = stats.get_user_stats(request.user)
+    rooms = sorted(user_stats['room_labels'].values())
     
-    # 获取当前活动的子标签
-    active_sub_tag = request.GET.get('sub_tag', '')
+    # 导航数据（main_navs、sub_navs、active_sub_tag）由 context_processors.navigation 提供
     
     # 为find_items_base.html模板提供必要的上下文数据
     # 获取所有物品
     items = Item.objects.filter(user=request.user)
     # 物品总数
-    total_items = items.count()
+    total_items = user_stats['total']
     # 分类数量
-    category_count = categories.count()
+    category_count = len(categories)
     # 房间数量
     room_count = len(rooms)
     # 筛选类型 - 管理分类页面默认使用'category'
     filter_type = 'category'
     # 生成推荐数据
-    recommendations = generate_recommendations(request.user)
+    recommendations = generate_recommendations(request.user, user_stats=user_stats, categories=categories)
     # 空的分组物品，因为管理分类页面不需要分组显示
-    grouped_items = {}
+    grouped_items = []
     
     return render(request, 'items/manage_categories.html', {
         'categories': categories,
         'rooms': rooms,
-        'main_navs': main_navs,
-        'sub_navs': sub_navs,
-        'active_sub_tag': active_sub_tag,
         # 以下是find_items_base.html模板所需的数据
         'grouped_items': grouped_items,
         'items': items,
@@ -60,6 +60,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'apps.items.context_processors.navigation',
             ],
         },
     },
@@ -130,6 +131,37 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# 物品图片按需缩放的磁盘缓存（不在 MEDIA_ROOT 下，只能通过需要登录的接口访问）
+ITEM_IMAGE_CACHE_DIR = BASE_DIR / 'cache' / 'image_variants'
+ITEM_IMAGE_CACHE_MAX_BYTES = int(os.environ.get('ITEM_IMAGE_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+
+# 上传图片处理（见 apps/items/uploads.py）：按 EXIF 方向旋转、去除元数据、缩小并重新编码后再保存
+ITEM_UPLOAD_PROCESSING = os.environ.get('ITEM_UPLOAD_PROCESSING', 'True').lower() == 'true'
+# 长边最大像素数，0 表示不缩小
+ITEM_UPLOAD_MAX_DIMENSION = int(os.environ.get('ITEM_UPLOAD_MAX_DIMENSION', 2048))
+# 重新编码的格式（jpeg 或 webp，带透明通道的图片在 jpeg 下保存为 png）和质量
+ITEM_UPLOAD_FORMAT = os.environ.get('ITEM_UPLOAD_FORMAT', 'jpeg')
+ITEM_UPLOAD_QUALITY = int(os.environ.get('ITEM_UPLOAD_QUALITY', 82))
+# 浏览器上传前压缩的目标体积（字节），超过时逐步降低质量（见 static/js/deposit_module.js）
+ITEM_UPLOAD_TARGET_BYTES = int(os.environ.get('ITEM_UPLOAD_TARGET_BYTES', 1024 * 1024))
+# 允许解码的最大像素数，超过时拒绝上传（防止解压炸弹）
+ITEM_UPLOAD_MAX_PIXELS = int(os.environ.get('ITEM_UPLOAD_MAX_PIXELS', 50_000_000))
+
+# 物品图片经需要登录的视图访问（items:protected_media），URL 前缀须与 apps/items/urls.py 一致
+ITEM_MEDIA_URL = '/items/media/'
+
+# 受保护文件的发送方式：校验权限后交给前端 Web 服务器传输文件，不占用 Python 进程
+# - 'nginx'：返回 X-Accel-Redirect，nginx 中需为 MEDIA_ACCEL_LOCATIONS 的每个前缀配置 internal location
+# - 'sendfile'：返回 X-Sendfile（Apache mod_xsendfile、lighttpd）
+# - 空：由 Django 直接发送（支持 Range 请求），适用于开发环境
+MEDIA_ACCEL_MODE = os.environ.get('MEDIA_ACCEL_MODE', '')
+
+# 文件目录 -> nginx internal location 前缀
+MEDIA_ACCEL_LOCATIONS = {
+    str(MEDIA_ROOT): '/protected/media/',
+    str(ITEM_IMAGE_CACHE_DIR): '/protected/image_variants/',
+}
+
 # 默认主键字段类型
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
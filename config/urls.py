@@ -7,6 +7,8 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.views.generic import TemplateView
 
+from apps.items.views import debug_media
+
 urlpatterns = [
     # 首页
     path('', TemplateView.as_view(template_name='index.html'), name='index'),
@@ -24,7 +26,9 @@ urlpatterns = [
 ]
 
 # 静态文件和媒体文件的URL配置
+# 物品图片不经过 MEDIA_URL，而是由需要登录的 items:protected_media 视图发送（见 ITEM_MEDIA_URL）；
+# 开发环境的 MEDIA_URL 同样不提供物品图片
 if settings.DEBUG:
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    urlpatterns += static(settings.MEDIA_URL, view=debug_media, document_root=settings.MEDIA_ROOT)
 
\ No newline at end of file
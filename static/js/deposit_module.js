@@ -3,8 +3,148 @@
  * 提供物品录入和标签生成功能
  */
 
+/**
+ * 上传前在浏览器中压缩图片
+ * 压缩参数由服务端下发（页面中 id="upload-config" 的 JSON，见 apps/items/uploads.py），
+ * 与服务端的上传处理保持一致：长边不超过 maxDimension，按 type/quality 重新编码，
+ * 体积超过 targetBytes 时逐步降低质量
+ */
+class ImageCompressor {
+    constructor(config = {}) {
+        this.config = Object.assign({
+            maxDimension: 2048,
+            quality: 0.82,
+            minQuality: 0.5,
+            type: 'image/jpeg',
+            targetBytes: 1024 * 1024,
+        }, config);
+    }
+
+    // 从页面读取服务端下发的压缩参数
+    static fromPage() {
+        const element = document.getElementById('upload-config');
+        return new ImageCompressor(element ? JSON.parse(element.textContent) : {});
+    }
+
+    // 压缩图片，返回新的 File；无需压缩或浏览器不支持时返回原文件
+    // onProgress(stage) 用于显示进度，stage 为 'decode' | 'encode' | 'done'
+    async compress(file, onProgress = () => {}) {
+        const { maxDimension, targetBytes } = this.config;
+        if (!maxDimension || !file.type.startsWith('image/') || file.type === 'image/gif') {
+            return file;
+        }
+        let source;
+        try {
+            onProgress('decode');
+            source = await this.decode(file);
+        } catch (error) {
+            console.warn('图片解码失败，上传原图', error);
+            return file;
+        }
+        const scale = Math.min(1, maxDimension / Math.max(source.width, source.height));
+        if (scale === 1 && file.size <= targetBytes) {
+            this.release(source);
+            onProgress('done');
+            return file;
+        }
+
+        const width = Math.round(source.width * scale);
+        const height = Math.round(source.height * scale);
+        const canvas = typeof OffscreenCanvas !== 'undefined'
+            ? new OffscreenCanvas(width, height)
+            : Object.assign(document.createElement('canvas'), { width, height });
+        const context = canvas.getContext('2d');
+        if (this.config.type === 'image/jpeg') {
+            // JPEG 不支持透明通道，透明部分以白色填充
+            context.fillStyle = '#fff';
+            context.fillRect(0, 0, width, height);
+        }
+        context.imageSmoothingQuality = 'high';
+        context.drawImage(source, 0, 0, width, height);
+        this.release(source);
+
+        onProgress('encode');
+        let quality = this.config.quality;
+        let blob = await this.encode(canvas, quality);
+        while (blob.size > targetBytes && quality - 0.1 >= this.config.minQuality) {
+            quality -= 0.1;
+            blob = await this.encode(canvas, quality);
+        }
+        onProgress('done');
+        if (scale === 1 && blob.size >= file.size) {
+            return file;
+        }
+        const extension = blob.type === 'image/webp' ? 'webp' : 'jpg';
+        const name = file.name.replace(/\.[^.]*$/, '') + '.' + extension;
+        return new File([blob], name, { type: blob.type, lastModified: Date.now() });
+    }
+
+    // 解码图片（按 EXIF 方向旋转），优先使用 createImageBitmap，不占用主线程
+    async decode(file) {
+        if (typeof createImageBitmap === 'function') {
+            return createImageBitmap(file, { imageOrientation: 'from-image' });
+        }
+        const url = URL.createObjectURL(file);
+        try {
+            const image = new Image();
+            image.src = url;
+            await image.decode();
+            return image;
+        } finally {
+            URL.revokeObjectURL(url);
+        }
+    }
+
+    encode(canvas, quality) {
+        if (canvas.convertToBlob) {
+            return canvas.convertToBlob({ type: this.config.type, quality });
+        }
+        return new Promise((resolve, reject) => {
+            canvas.toBlob(blob => (blob ? resolve(blob) : reject(new Error('图片编码失败'))), this.config.type, quality);
+        });
+    }
+
+    release(source) {
+        if (source.close) {
+            source.close();
+        }
+    }
+
+    // 用压缩后的文件替换文件选择框中的文件，表单提交时上传压缩后的图片
+    static replaceInputFile(input, file) {
+        if (typeof DataTransfer === 'undefined') {
+            return false;
+        }
+        const transfer = new DataTransfer();
+        transfer.items.add(file);
+        input.files = transfer.files;
+        return true;
+    }
+}
+
+/**
+ * 带上传进度的表单提交（XMLHttpRequest），跟随重定向后以 xhr 返回最终页面
+ * onProgress(percent) 报告上传进度
+ */
+function submitFormWithProgress(form, onProgress = () => {}) {
+    return new Promise((resolve, reject) => {
+        const xhr = new XMLHttpRequest();
+        xhr.open(form.method || 'POST', form.action || window.location.href);
+        xhr.upload.addEventListener('progress', (event) => {
+            if (event.lengthComputable) {
+                onProgress(Math.round(event.loaded / event.total * 100));
+            }
+        });
+        xhr.addEventListener('load', () => resolve(xhr));
+        xhr.addEventListener('error', () => reject(new Error('网络错误')));
+        xhr.send(new FormData(form));
+    });
+}
+
 class DepositModule {
     constructor() {
+        // 图片压缩参数由服务端下发
+        this.compressor = ImageCompressor.fromPage();
         // 初始化页面元素
         this.initElements();
         // 绑定事件监听器
@@ -60,26 +200,34 @@ class DepositModule {
         }
     }
 
-    // 文件选择变化
-    handleFileChange() {
-        if (this.imageInput.files && this.imageInput.files[0]) {
-            this.showImagePreview(this.imageInput.files[0]);
+    // 文件选择变化：先在浏览器中压缩，表单提交时上传压缩后的图片
+    async handleFileChange() {
+        if (!(this.imageInput.files && this.imageInput.files[0])) {
+            return;
+        }
+        const original = this.imageInput.files[0];
+        this.uploadHint.classList.add('hidden');
+        const file = await this.compressor.compress(original);
+        if (file !== original) {
+            ImageCompressor.replaceInputFile(this.imageInput, file);
         }
+        this.showImagePreview(file);
     }
 
     // 显示图片预览
     showImagePreview(file) {
         if (!file.type.match('image.*')) {
+            this.uploadHint.classList.remove('hidden');
             return;
         }
         
-        const reader = new FileReader();
-        reader.onload = (e) => {
-            this.previewImg.src = e.target.result;
-            this.imagePreview.classList.remove('hidden');
-            this.uploadHint.classList.add('hidden');
+        // 对象URL无需把整张图片读成 base64 字符串
+        if (this.previewImg.src.startsWith('blob:')) {
+            URL.revokeObjectURL(this.previewImg.src);
         }
-        reader.readAsDataURL(file);
+        this.previewImg.src = URL.createObjectURL(file);
+        this.imagePreview.classList.remove('hidden');
+        this.uploadHint.classList.add('hidden');
     }
 
     // 移除图片
@@ -118,6 +266,10 @@ class DepositModule {
         // 创建FormData并发送请求到后端
         const formData = new FormData();
         formData.append('name', name);
+        // 已保存的物品按编号生成标签（标签由服务端渲染并缓存）
+        if (this.depositForm.elements.item_code) {
+            formData.append('item_code', this.depositForm.elements.item_code.value);
+        }
         
         // 调用后端API获取标签数据
         fetch('/items/generate_tag/', {
@@ -209,10 +361,14 @@ class DepositModule {
 
 // 当DOM加载完成后初始化模块
 document.addEventListener('DOMContentLoaded', () => {
-    // 检查是否存在必要的DOM元素（针对独立页面）
-    if (document.getElementById('image_upload_area')) {
+    // 检查是否存在必要的DOM元素（针对带标签生成的独立页面）
+    if (document.getElementById('image_upload_area') && document.getElementById('generateTagBtn')) {
         const depositModule = new DepositModule();
         // 暴露到全局以便外部调用
         window.depositModule = depositModule;
     }
-});
\ No newline at end of file
+});
+
+// 暴露到全局，供物品录入页等其他页面使用
+window.ImageCompressor = ImageCompressor;
+window.submitFormWithProgress = submitFormWithProgress;